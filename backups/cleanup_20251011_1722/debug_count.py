@@ -4,37 +4,43 @@ import sys
 sys.path.insert(0, 'src')
 os.environ['DB_PATH'] = tempfile.mkstemp(suffix='.db')[1]
 
-from src.core.dao import get_key, set_key, delete_key, list_keys, get_kv_count
-
-# Add some keys
-set_key('count_test_1', 'value1', 'test', 'lowercase')
-set_key('count_test_2', 'value2', 'test', 'lowercase')
+from src.core.dao import set_key, delete_key, get_kv_count
+from src.core.db import get_db
 
-print('After setting 2 keys:')
-keys = list_keys()
-print(f'List keys count: {len(keys)}')
-for k in keys:
-    print(f'Key: {k.key}, Value: "{k.value}"')
+def snapshot(conn):
+    """Every row plus the live (non-tombstone) count, in one query."""
+    return conn.execute(
+        "SELECT key, value, COUNT(CASE WHEN value != '' THEN 1 END) OVER () FROM kv WHERE user_id = ?",
+        ('default',)
+    ).fetchall()
+
+def show(title, rows):
+    live = [(k, v) for k, v, _ in rows if v != '']
+    print(title)
+    print(f'List keys count: {rows[0][2] if rows else 0}')
+    for key, value in live:
+        print(f'Key: {key}, Value: "{value}"')
+
+# One connection for every write and read: no reopen per call, and all
+# steps see a consistent view of the same transaction
+with get_db() as conn:
+    # Add some keys
+    set_key('default', 'count_test_1', 'value1', 'test', 'lowercase', conn=conn)
+    set_key('default', 'count_test_2', 'value2', 'test', 'lowercase', conn=conn)
 
-# Delete one (tombstone)
-delete_key('count_test_1')
+    show('After setting 2 keys:', snapshot(conn))
 
-print('\nAfter deleting count_test_1:')
-keys = list_keys()
-print(f'List keys count: {len(keys)}')
-for k in keys:
-    print(f'Key: {k.key}, Value: "{k.value}"')
+    # Delete one (tombstone)
+    delete_key('default', 'count_test_1', conn=conn)
 
-count = get_kv_count()
-print(f'\nKV Count result: {count}')
+    rows = snapshot(conn)
+    show('\nAfter deleting count_test_1:', rows)
 
-# Let's also check what's actually in the database
-from src.core.db import get_db
+    print(f'\nKV Count result: {get_kv_count("default", conn=conn)}')
 
-with get_db() as conn:
-    cursor = conn.cursor()
-    cursor.execute("SELECT key, value FROM kv")
-    rows = cursor.fetchall()
+    # Let's also check what's actually in the database
     print("\nActual DB contents:")
-    for row in rows:
-        print(f"Key: {row[0]}, Value: '{row[1]}'")
+    for key, value, _ in rows:
+        print(f"Key: {key}, Value: '{value}'")
+
+    conn.commit()
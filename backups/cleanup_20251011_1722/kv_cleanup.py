@@ -10,11 +10,23 @@ import sys
 import os
 from pathlib import Path
 
-# Add the src directory to path to import modules
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-
-from src.core import dao
-from src.core.config import DB_PATH
+# Exact keys to remove (known test artifacts and malformed entries)
+LITERAL_KEYS = frozenset({
+    "",                    # Empty key
+    "what",               # String fragment from parsing error
+    "displayname",        # Lowercase duplicate of displayName
+    "test1",             # Generic test key
+    "test2",             # Generic test key
+    "test_key",          # Generic test key
+    "loose_mode_key_1",  # Test scaffolding
+    "loose_mode_key_2",  # Test scaffolding
+    "loose_mode_key_3",  # Test scaffolding
+})
+
+# Key prefixes for bulk removal, all matched in one SQL pass
+PATTERN_PREFIXES = (
+    "lose_mode_key_",
+)
 
 def cleanup_kv_store():
     """
@@ -23,60 +35,47 @@ def cleanup_kv_store():
     This script handles the specific known problematic keys from the
     memory system's development and testing phases.
     """
+    # Add the src directory to path to import modules (deferred until cleanup runs)
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+    from src.core import dao
+    from src.core.config import DB_PATH
+    from src.core.db import write_transaction
+
     print("🧹 Starting KV Store Cleanup...")
     print(f"📍 Database: {DB_PATH}")
 
-    # Keys to remove (known test artifacts and malformed entries)
-    keys_to_remove = [
-        "",                    # Empty key
-        "what",               # String fragment from parsing error
-        "displayname",        # Lowercase duplicate of displayName
-        "test1",             # Generic test key
-        "test2",             # Generic test key
-        "test_key",          # Generic test key
-        "loose_mode_key_1",  # Test scaffolding
-        "loose_mode_key_2",  # Test scaffolding
-        "loose_mode_key_3",  # Test scaffolding
-        "lose_mode_key_*",   # Pattern for bulk removal
-    ]
-
-    removed_count = 0
     errors = []
 
     # Default user cleanup first
     user_id = "default"
 
-    for key in keys_to_remove:
-        try:
-            # Try to delete the key
-            success = dao.delete_key(user_id, key)
-            if success:
-                print(f"✅ Removed: {key}")
-                removed_count += 1
-            else:
-                print(f"⚠️  Not found: {key}")
-        except Exception as e:
-            errors.append(f"Error removing {key}: {e}")
-
-    # Check for pattern-based keys (like lose_mode_key_*)
+    # One BEGIN IMMEDIATE transaction covers every delete: a single commit/WAL flush
+    removed_count = 0
+    live_keys = None
     try:
-        all_keys = dao.list_keys(user_id)
-        pattern_keys = [k for k in all_keys if k.key.startswith("lose_mode_key_")]
-
-        for key_obj in pattern_keys:
-            try:
-                success = dao.delete_key(user_id, key_obj.key)
-                if success:
-                    print(f"✅ Removed pattern match: {key_obj.key}")
-                    removed_count += 1
-            except Exception as e:
-                errors.append(f"Error removing pattern key {key_obj.key}: {e}")
-
+        with write_transaction() as conn:
+            # Counted inside the transaction, so remaining = live - removed is exact
+            live_keys = dao.get_kv_count(user_id, conn=conn)
+            if live_keys:
+                # Literal keys in one batched statement
+                removed_count += dao.delete_keys(user_id, LITERAL_KEYS, conn=conn)
+                # Pattern-based keys (like lose_mode_key_*) are matched inside SQLite
+                removed_count += dao.delete_keys_like(
+                    user_id, [f"{prefix}*" for prefix in PATTERN_PREFIXES], conn=conn
+                )
     except Exception as e:
-        errors.append(f"Error during pattern cleanup: {e}")
+        errors.append(f"Error removing keys: {e}")
+        removed_count = 0
+
+    if live_keys == 0:
+        print("✨ KV store is empty - nothing to clean")
+        return 0, errors
+
+    print(f"✅ Removed {removed_count} keys")
 
     # Summary
-    remaining_keys = len(dao.list_keys(user_id))
+    remaining_keys = live_keys - removed_count if live_keys is not None else dao.get_kv_count(user_id)
     print(f"\n📊 Cleanup Summary:")
     print(f"   Removed: {removed_count} keys")
     print(f"   Errors: {len(errors)}")
@@ -28,10 +28,9 @@ def test_embeddings():
     print(f"Version: {version}")
     assert version, "Version should not be empty"
 
-    # Test determinism (same text should give same embedding)
-    embedding1 = service.embed_texts(["Hello world"])
-    embedding2 = service.embed_texts(["Hello world"])
-    np.testing.assert_array_equal(embedding1, embedding2, "Embeddings should be deterministic")
+    # Test determinism (same text should give same embedding) in a single batch
+    out = service.embed_texts(["Hello world", "Hello world"])
+    np.testing.assert_array_equal(out[0], out[1], "Embeddings should be deterministic")
 
     print("✅ All embeddings tests passed")
 
@@ -7,14 +7,27 @@ Command-line backup utility with privacy controls and encryption.
 """
 
 import argparse
+import subprocess
 import sys
 import os
 from pathlib import Path
 
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.core.backup import create_backup, BackupError
+def start_background_backup(backup_path: str) -> Path:
+    """Re-run this script detached without --async; return the pending marker path."""
+    pending_marker = Path(backup_path).with_suffix('.pending')
+    pending_marker.parent.mkdir(parents=True, exist_ok=True)
+    pending_marker.write_text(f"started: {backup_path}\n")
+
+    argv = [arg for arg in sys.argv[1:] if arg != "--async"]
+    subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), *argv, "--pending-marker", str(pending_marker)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+    return pending_marker
 
 
 def main():
@@ -26,12 +39,16 @@ Examples:
   %(prog)s my_backup                # Create basic backup
   %(prog)s my_backup --encrypt      # Create encrypted backup
   %(prog)s my_backup --dry-run      # Validate backup without creating
+  %(prog)s my_backup --async        # Run backup in the background
   %(prog)s my_backup --include-sensitive --admin-confirmed  # Include sensitive data
 
 Backup creates two files:
 - my_backup (encrypted backup data + SQLite database)
 - my_backup.manifest.json (unencrypted manifest with metadata)
 
+With --async, my_backup.pending exists while the backup runs; it is removed
+once the manifest is written, or left holding the error if the backup fails.
+
 Environment variables:
 - BACKUP_ENABLED=true (required)
 - BACKUP_ENCRYPTION_ENABLED=true (default true)
@@ -81,6 +98,16 @@ Environment variables:
         help="Show detailed backup information"
     )
 
+    parser.add_argument(
+        "--async",
+        dest="run_async",
+        action="store_true",
+        help="Run the backup in a background process and return immediately"
+    )
+
+    # Set by --async on the detached worker; not for direct use
+    parser.add_argument("--pending-marker", help=argparse.SUPPRESS)
+
     args = parser.parse_args()
 
     # Validate arguments
@@ -98,6 +125,19 @@ Environment variables:
         print("This operation will be logged and audited.")
         return 1
 
+    if args.run_async and not args.dry_run:
+        pending_marker = start_background_backup(args.backup_path)
+        manifest_path = Path(args.backup_path).with_suffix('.manifest.json')
+        print(f"Backup started in background: {args.backup_path}")
+        print(f"Pending marker: {pending_marker}")
+        print(f"Manifest (when complete): {manifest_path}")
+        return 0
+
+    # Import the backup stack only once arguments are valid, so --help and
+    # usage errors don't pay for DB init, config loading and vector imports
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from src.core.backup import create_backup, BackupError
+
     try:
         # Create the backup
         manifest = create_backup(
@@ -107,35 +147,54 @@ Environment variables:
             dry_run=args.dry_run
         )
 
+        # Collect the report and emit it with a single write/flush
         if args.dry_run:
-            print("DRY RUN - Backup validation completed successfully")
-            print(f"Backup Type: {manifest.backup_type}")
-            print(f"Expected Size: {manifest.total_size:,} bytes")
-            print(f"Estimated Files: {manifest.file_count}")
-            if manifest.includes_sensitive:
-                print("WARNING: This backup includes sensitive data")
-            else:
-                print("Privacy: Sensitive data will be redacted")
+            lines = [
+                "DRY RUN - Backup validation completed successfully",
+                f"Backup Type: {manifest.backup_type}",
+                f"Expected Size: {manifest.total_size:,} bytes",
+                f"Estimated Files: {manifest.file_count}",
+                "WARNING: This backup includes sensitive data" if manifest.includes_sensitive
+                else "Privacy: Sensitive data will be redacted",
+            ]
         else:
-            print(f"Backup created successfully: {args.backup_path}")
-            print(f"Backup ID: {manifest.backup_id}")
-            print(f"Type: {manifest.backup_type}")
-            print(f"Size: {manifest.total_size:,} bytes")
-            print(f"Encrypted: {manifest.encrypted}")
+            lines = [
+                f"Backup created successfully: {args.backup_path}",
+                f"Backup ID: {manifest.backup_id}",
+                f"Type: {manifest.backup_type}",
+                f"Size: {manifest.total_size:,} bytes",
+                f"Encrypted: {manifest.encrypted}",
+            ]
             if args.verbose:
-                print(f"Created: {manifest.created_at}")
-                print(f"Files: {manifest.file_count}")
-                print("Manifest: {args.backup_path}.manifest.json")
+                lines += [
+                    f"Created: {manifest.created_at}",
+                    f"Files: {manifest.file_count}",
+                    f"Manifest: {args.backup_path}.manifest.json",
+                ]
+
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+        if args.pending_marker:
+            Path(args.pending_marker).unlink(missing_ok=True)
 
         return 0
 
     except BackupError as e:
         print(f"ERROR: Backup failed: {e}")
+        _mark_failed(args.pending_marker, e)
         return 1
     except Exception as e:
         print(f"ERROR: Unexpected error: {e}")
+        _mark_failed(args.pending_marker, e)
         return 1
 
 
+def _mark_failed(pending_marker, error) -> None:
+    """Leave the pending marker behind with the failure reason for background runs."""
+    if pending_marker:
+        Path(pending_marker).write_text(f"failed: {error}\n")
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -1,18 +1,33 @@
 import asyncio
 import re
-from src.core.dao import DAO
 
 INVALID_KEYS = {"", "what"}
 DUPLICATES = {"displayname"}  # duplicated variant of displayName
-PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
+BAD_KEYS = frozenset(INVALID_KEYS | DUPLICATES)
+PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9_]*")
+USER_ID = "default"
+
+def find_bad_keys():
+    """Stream key names and keep only the invalid ones (runs on a worker thread)."""
+    from src.core.dao import iter_keys
+    is_valid = PATTERN.fullmatch
+    return [k for k in iter_keys(USER_ID) if k in BAD_KEYS or not is_valid(k)]
+
+def tombstone_keys(keys):
+    """Tombstone keys on one connection in a single transaction (runs on a worker thread)."""
+    from src.core.dao import delete_keys
+    from src.core.db import write_transaction
+    with write_transaction() as conn:
+        return delete_keys(USER_ID, keys, conn=conn)
 
 async def main():
-    dao = DAO()
-    items = await dao.list_keys()
-    for i in items:
-        if i.key in INVALID_KEYS or i.key in DUPLICATES or not PATTERN.match(i.key):
-            print("Deleting:", i.key)
-            await dao.delete_key(i.key)
+    # sqlite3 is blocking; keep it off the event loop
+    bad = await asyncio.to_thread(find_bad_keys)
+    for key in bad:
+        print("Deleting:", key)
+    if bad:
+        removed = await asyncio.to_thread(tombstone_keys, bad)
+        print(f"Removed {removed} keys")
 
 if __name__ == "__main__":
     asyncio.run(main())
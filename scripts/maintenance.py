@@ -12,6 +12,18 @@ import json
 from pathlib import Path
 from typing import List
 
+# orjson is optional; it serializes large full-maintenance reports much faster
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str
+        ).decode()
+except ImportError:
+    def _dumps(obj) -> str:
+        return json.dumps(obj, indent=2, default=str)
+
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -20,6 +32,7 @@ from src.core.maintenance import (
     validate_vector_index,
     cleanup_orphaned_data,
     rebuild_vector_index,
+    optimize_database,
     perform_full_maintenance,
     MaintenanceReport,
     MaintenanceError
@@ -28,52 +41,53 @@ from src.core.maintenance import (
 
 def format_report(report: MaintenanceReport) -> str:
     """Format a maintenance report for display."""
-    lines = []
+    lines = [f"Operation: {report.operation}"]
+    append = lines.append
+    extend = lines.extend
 
-    lines.append(f"Operation: {report.operation}")
     if report.completed_at and report.started_at:
         duration = report.completed_at - report.started_at
-        lines.append(f"Duration: {duration.total_seconds():.2f} seconds")
+        append(f"Duration: {duration.total_seconds():.2f} seconds")
+
+    errors = report.errors
+    issues_found = report.issues_found
+    actions_taken = report.actions_taken
 
     # Status summary
-    if report.errors:
-        lines.append(f"Status: FAILED ({len(report.errors)} errors)")
-    elif report.issues_found > 0:
-        lines.append(f"Status: ISSUES FOUND ({report.issues_found} issues)")
+    if errors:
+        append(f"Status: FAILED ({len(errors)} errors)")
+    elif issues_found > 0:
+        append(f"Status: ISSUES FOUND ({issues_found} issues)")
     else:
-        lines.append("Status: SUCCESS")
+        append("Status: SUCCESS")
 
     # Key metrics
-    if report.issues_found > 0:
-        lines.append(f"Issues Found: {report.issues_found}")
+    if issues_found > 0:
+        append(f"Issues Found: {issues_found}")
     if report.issues_resolved > 0:
-        lines.append(f"Issues Resolved: {report.issues_resolved}")
-    if report.actions_taken:
-        lines.append(f"Actions Taken: {len(report.actions_taken)}")
+        append(f"Issues Resolved: {report.issues_resolved}")
+    if actions_taken:
+        append(f"Actions Taken: {len(actions_taken)}")
 
     # Metadata
     if report.metadata:
-        lines.append("Details:")
-        for key, value in report.metadata.items():
-            lines.append(f"  {key}: {value}")
+        append("Details:")
+        extend(f"  {key}: {value}" for key, value in report.metadata.items())
 
     # Errors
-    if report.errors:
-        lines.append("Errors:")
-        for error in report.errors:
-            lines.append(f"  - {error}")
+    if errors:
+        append("Errors:")
+        extend(f"  - {error}" for error in errors)
 
     # Recommendations
     if report.recommendations:
-        lines.append("Recommendations:")
-        for rec in report.recommendations:
-            lines.append(f"  - {rec}")
+        append("Recommendations:")
+        extend(f"  - {rec}" for rec in report.recommendations)
 
     # Actions taken (detailed)
-    if report.actions_taken and len(report.actions_taken) <= 5:  # Don't flood output
-        lines.append("Actions Taken:")
-        for action in report.actions_taken:
-            lines.append(f"  - {action}")
+    if actions_taken and len(actions_taken) <= 5:  # Don't flood output
+        append("Actions Taken:")
+        extend(f"  - {action}" for action in actions_taken)
 
     return "\n".join(lines)
 
@@ -88,6 +102,7 @@ Examples:
   %(prog)s --validate-vectors        # Validate vector index
   %(prog)s --cleanup-orphans         # Clean up orphaned data
   %(prog)s --rebuild-index           # Rebuild vector index
+  %(prog)s --optimize                # Refresh query planner statistics
   %(prog)s --full-maintenance        # Run all maintenance operations
   %(prog)s --full-maintenance --json # Output results as JSON
 
@@ -96,6 +111,7 @@ Maintenance Operations:
   vector_validation  - Vector index consistency and health checks
   orphaned_cleanup   - Remove orphaned vectors and old tombstones
   index_rebuild      - Rebuild vector index from canonical data
+  database_optimize  - PRAGMA optimize (ANALYZE only stale tables)
 
 Environment variables:
 - MAINTENANCE_ENABLED=true (required)
@@ -134,6 +150,12 @@ Environment variables:
         help="Force vector index rebuild even if validation passes"
     )
 
+    parser.add_argument(
+        "--optimize", "-o",
+        action="store_true",
+        help="Run PRAGMA optimize to refresh stale query planner statistics"
+    )
+
     parser.add_argument(
         "--full-maintenance", "-f",
         action="store_true",
@@ -166,13 +188,14 @@ Environment variables:
         args.validate_vectors or
         args.cleanup_orphans or
         args.rebuild_index or
+        args.optimize or
         args.full_maintenance
     )
 
     if not operations_specified:
         parser.error("Must specify at least one maintenance operation")
 
-    if args.full_maintenance and any([args.check_integrity, args.validate_vectors, args.cleanup_orphans, args.rebuild_index]):
+    if args.full_maintenance and any([args.check_integrity, args.validate_vectors, args.cleanup_orphans, args.rebuild_index, args.optimize]):
         parser.error("--full-maintenance cannot be combined with individual operations")
 
     try:
@@ -212,6 +235,24 @@ Environment variables:
                     backup_first=backup_first
                 ))
 
+            if args.optimize:
+                if not args.quiet:
+                    print("Optimizing database...")
+                reports.append(optimize_database())
+
+        # Aggregate totals in a single pass over the reports
+        total_issues = total_resolved = total_errors = 0
+        has_error = has_issue = False
+        for r in reports:
+            total_issues += r.issues_found
+            total_resolved += r.issues_resolved
+            error_count = len(r.errors)
+            total_errors += error_count
+            if error_count:
+                has_error = True
+            if r.issues_found > 0:
+                has_issue = True
+
         # Output results
         if args.json:
             # JSON output
@@ -219,20 +260,16 @@ Environment variables:
                 "maintenance_run": {
                     "timestamp": str(reports[0].started_at) if reports else None,
                     "operations": len(reports),
-                    "total_issues_found": sum(r.issues_found for r in reports),
-                    "total_issues_resolved": sum(r.issues_resolved for r in reports),
-                    "errors": sum(len(r.errors) for r in reports)
+                    "total_issues_found": total_issues,
+                    "total_issues_resolved": total_resolved,
+                    "errors": total_errors
                 },
                 "reports": [report.to_dict() for report in reports]
             }
-            print(json.dumps(json_output, indent=2, default=str))
+            print(_dumps(json_output))
 
         else:
             # Human-readable output
-            total_issues = sum(r.issues_found for r in reports)
-            total_resolved = sum(r.issues_resolved for r in reports)
-            total_errors = sum(len(r.errors) for r in reports)
-
             if not args.quiet:
                 print(f"\nMaintenance completed: {len(reports)} operations")
                 print(f"Total issues found: {total_issues}")
@@ -263,9 +300,9 @@ Environment variables:
                     print("All systems validated and healthy.")
 
         # Return appropriate exit code
-        if any(r.errors for r in reports):
+        if has_error:
             return 1  # Errors occurred
-        elif any(r.issues_found > 0 for r in reports):
+        elif has_issue:
             return 2  # Issues found but no errors
         else:
             return 0  # Success
@@ -7,19 +7,217 @@ Index Rebuild Utility
 Rebuilds vector index from canonical SQLite KV state after data corruption/lost vectors.
 """
 
+import argparse
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
 
+import numpy as np
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.core.dao import list_keys
+from src.core.dao import iter_kv_records, list_keys_updated_since, get_kv_count, get_vector_meta, set_vector_meta
 from src.core.config import get_vector_store, get_embedding_provider, are_vector_features_enabled
 from src.core.db import init_db
+from src.vector.types import VectorRecord
+
+# KV pairs embedded per provider call during rebuild
+REBUILD_BATCH_SIZE = int(os.getenv("REBUILD_BATCH_SIZE", "128"))
+
+# Batches embedded concurrently when the provider is remote (network-bound)
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "8"))
+
+# Minimum seconds between progress lines, and failed batches listed in the summary
+PROGRESS_INTERVAL_SECONDS = 1.0
+MAX_REPORTED_ERRORS = 10
+
+# Above this share of changed keys an incremental rebuild falls back to a full one
+INCREMENTAL_MAX_DELTA_RATIO = float(os.getenv("REBUILD_INCREMENTAL_MAX_DELTA", "0.2"))
+
+# vector_meta entry holding the CURRENT_TIMESTAMP-format start time of the last rebuild
+LAST_REBUILD_META = "last_rebuild_ts"
+
+
+def _utc_timestamp() -> str:
+    """Current time in SQLite CURRENT_TIMESTAMP format, comparable with kv.updated_at."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _timestamp_text(updated_at) -> str:
+    """SQLite hands back updated_at as text already; only real datetimes need isoformat()."""
+    return updated_at.isoformat() if isinstance(updated_at, datetime) else str(updated_at)
+
+
+def _embed_batch(embedding_provider, batch):
+    """Embed one batch of KV pairs; returns the embeddings, or the exception raised."""
+    # Create content to embed (key:value format), once per batch, as the
+    # list[str] handed straight to the batched embedder
+    texts = [f"{kv.key}: {kv.value}" for kv in batch]
+
+    # Generate embeddings for the whole batch in one provider call, as one
+    # contiguous (batch, dim) float32 array the vector store can take as-is
+    try:
+        return np.asarray(embedding_provider.embed_texts(texts), dtype=np.float32)
+    except Exception as e:
+        return e
+
+
+def _embedded_batches(embedding_provider, batches):
+    """
+    Yield (batch, embeddings) pairs in input order.
+
+    Remote providers are network-bound, so up to EMBED_CONCURRENCY batches are
+    embedded concurrently; local providers are already CPU/GPU-bound and run serially.
+    """
+    if not getattr(embedding_provider, "is_remote", False):
+        for batch in batches:
+            yield batch, _embed_batch(embedding_provider, batch)
+        return
+
+    with ThreadPoolExecutor(max_workers=EMBED_CONCURRENCY) as executor:
+        while True:
+            window = list(islice(batches, EMBED_CONCURRENCY))
+            if not window:
+                return
+            # map() keeps results aligned with the window's order
+            results = executor.map(lambda batch: _embed_batch(embedding_provider, batch), window)
+            yield from zip(window, results)
+
+
+def embed_and_add(vector_store, embedding_provider, pairs):
+    """
+    Embed KV pairs in REBUILD_BATCH_SIZE batches and add them to the store.
+
+    `pairs` may be any iterable (e.g. a streaming cursor); only one batch (or one
+    window of EMBED_CONCURRENCY batches for remote providers) is held in memory.
+
+    Returns (count added, last embedding added or None), so callers can verify
+    the index with a real in-distribution vector instead of embedding a probe.
+    """
+    embedded_count = 0
+    last_embedding = None
+    errors = []
+    last_progress = time.monotonic()
+    pairs = iter(pairs)
+    batches = iter(lambda: list(islice(pairs, REBUILD_BATCH_SIZE)), [])
+    # Local bindings for the per-row record construction below
+    make_record = VectorRecord
+    timestamp_text = _timestamp_text
+
+    for batch, embeddings in _embedded_batches(embedding_provider, batches):
+        if isinstance(embeddings, Exception):
+            errors.append(f"Failed to embed batch of {len(batch)} KV pairs starting at {batch[0].key}: {embeddings}")
+            continue
+
+        # Each record owns its metadata, so a fresh dict per row is unavoidable; a
+        # dict literal (one BUILD_CONST_KEY_MAP) is cheaper than copying a template
+        records = [
+            make_record(
+                id=kv.key,
+                vector=embedding,
+                metadata={
+                    'source': kv.source,
+                    'casing': kv.casing,
+                    'updated_at': timestamp_text(kv.updated_at)
+                }
+            )
+            for kv, embedding in zip(batch, embeddings)
+        ]
+
+        # Add the whole batch to the vector store in one call
+        try:
+            vector_store.batch_add(records)
+        except Exception as e:
+            errors.append(f"Failed to add batch of {len(records)} KV pairs starting at {batch[0].key}: {e}")
+            continue
+
+        embedded_count += len(records)
+        last_embedding = records[-1].vector
 
-def main():
+        # Throttled progress: at most one line per interval instead of one per batch
+        now = time.monotonic()
+        if now - last_progress >= PROGRESS_INTERVAL_SECONDS:
+            print(f"  ... embedded {embedded_count} entries", flush=True)
+            last_progress = now
+
+    # Failures are summarized once at the end rather than interleaved with progress
+    for error in errors[:MAX_REPORTED_ERRORS]:
+        print(f"ERROR: {error}")
+    if len(errors) > MAX_REPORTED_ERRORS:
+        print(f"ERROR: ... and {len(errors) - MAX_REPORTED_ERRORS} more failed batches")
+
+    return embedded_count, last_embedding
+
+
+def incremental_rebuild(vector_store, embedding_provider, since: str) -> bool:
+    """
+    Re-embed only keys changed since the last rebuild, upserting by key.
+
+    Returns False when a full rebuild is needed instead: too many keys changed,
+    or the store cannot delete stale vectors.
+    """
+    changed = list_keys_updated_since('default', since)
+    total = get_kv_count('default')
+    delta_ratio = len(changed) / total if total else 1.0
+    print(f"Found {len(changed)} KV pairs changed since {since} ({delta_ratio:.0%} of {total})")
+
+    if not changed:
+        print("✓ Vector index already up to date")
+        return True
+
+    if delta_ratio > INCREMENTAL_MAX_DELTA_RATIO:
+        print(f"Delta exceeds {INCREMENTAL_MAX_DELTA_RATIO:.0%}; falling back to full rebuild")
+        return False
+
+    # Upsert = delete then add; tombstoned and sensitive keys are only deleted
+    try:
+        for kv in changed:
+            vector_store.delete(kv.key)
+    except NotImplementedError:
+        print("Vector store does not support deletion; falling back to full rebuild")
+        return False
+
+    to_embed = [kv for kv in changed if kv.value and not kv.sensitive]
+    embedded_count, _ = embed_and_add(vector_store, embedding_provider, to_embed)
+    print(f"✓ Incrementally updated index: {embedded_count} re-embedded, "
+          f"{len(changed) - len(to_embed)} removed")
+    return True
+
+
+def index_is_healthy(vector_store, embedding_provider) -> bool:
+    """
+    Run maintenance vector validation on the store being rebuilt and report whether
+    a full rebuild can be skipped.
+
+    An index that was never rebuilt is treated as unhealthy, since an empty store
+    validates cleanly. Validation that cannot run (maintenance disabled) is too.
+    """
+    if get_vector_meta(LAST_REBUILD_META) is None:
+        print("No previous rebuild recorded; rebuild required")
+        return False
+
+    from src.core.maintenance import validate_vector_index, MaintenanceError
+    try:
+        report = validate_vector_index(vector_store, embedding_provider)
+    except MaintenanceError as e:
+        print(f"Skipping index validation ({e}); rebuilding")
+        return False
+
+    if report.issues_found or report.errors:
+        detail = f": {report.errors[0]}" if report.errors else ""
+        print(f"Index validation found {report.issues_found} issues, {len(report.errors)} errors{detail}; "
+              "rebuild required")
+        return False
+    return True
+
+
+def main(incremental: bool = False, force: bool = False):
     """Rebuild vector index from SQLite KV store."""
     if not are_vector_features_enabled():
         print("ERROR: Vector features disabled. Set VECTOR_ENABLED=true")
@@ -38,6 +236,21 @@ def main():
         print("ERROR: Vector store or embedding provider not available")
         sys.exit(1)
 
+    # Watermark taken before reading, so writes racing the rebuild are picked up next time
+    rebuild_started = _utc_timestamp()
+
+    if incremental:
+        last_rebuild = get_vector_meta(LAST_REBUILD_META)
+        if last_rebuild is None:
+            print("No previous rebuild recorded; running full rebuild")
+        elif incremental_rebuild(vector_store, embedding_provider, last_rebuild):
+            set_vector_meta(LAST_REBUILD_META, rebuild_started)
+            print("Index rebuild complete!")
+            return
+    elif not force and index_is_healthy(vector_store, embedding_provider):
+        print("✓ Vector index validated OK; skipping rebuild (use --force to rebuild anyway)")
+        return
+
     # Clear existing index
     try:
         vector_store.clear()
@@ -45,60 +258,30 @@ def main():
     except Exception as e:
         print(f"WARNING: Failed to clear existing index: {e}")
 
-    # Get all active KV pairs
-    kv_pairs = list_keys('default')
-    print(f"Found {len(kv_pairs)} KV pairs in canonical store")
+    # Count once in SQL; the rows themselves are streamed below
+    total_pairs = get_kv_count('default')
+    print(f"Found {total_pairs} KV pairs in canonical store")
 
-    # Filter out sensitive keys (re-embedding policy)
-    non_sensitive_pairs = [kv for kv in kv_pairs if not kv.sensitive]
-    print(f"Re-embedding {len(non_sensitive_pairs)} non-sensitive KV pairs")
-
-    if not non_sensitive_pairs:
+    if not total_pairs:
+        set_vector_meta(LAST_REBUILD_META, rebuild_started)
         print("No entries to rebuild. Exiting.")
         return
 
-    # Rebuild index
-    embedded_count = 0
-
-    for kv in non_sensitive_pairs:
-        try:
-            # Create content to embed (key:value format)
-            content_to_embed = f"{kv.key}: {kv.value}"
-
-            # Generate embedding
-            embedding = embedding_provider.embed_text(content_to_embed)
-
-            # Create vector record
-            vector_record = type('VectorRecord', (), {
-                'id': kv.key,
-                'vector': embedding,
-                'metadata': {
-                    'source': kv.source,
-                    'casing': kv.casing,
-                    'updated_at': kv.updated_at.isoformat() if hasattr(kv.updated_at, 'isoformat') else str(kv.updated_at)
-                }
-            })()
-
-            # Add to vector store
-            vector_store.add(vector_record)
-            embedded_count += 1
-
-            if embedded_count % 10 == 0:
-                print(f"  ... embedded {embedded_count}/{len(non_sensitive_pairs)} entries")
-
-        except Exception as e:
-            print(f"ERROR: Failed to embed KV pair {kv.key}: {e}")
-            continue
+    # Rebuild index from a streaming cursor; sensitive keys are filtered in
+    # SQL (re-embedding policy), so only one batch is in memory at a time
+    print("Re-embedding non-sensitive KV pairs")
+    non_sensitive_pairs = iter_kv_records('default', include_sensitive=False)
+    embedded_count, last_embedding = embed_and_add(vector_store, embedding_provider, non_sensitive_pairs)
+    set_vector_meta(LAST_REBUILD_META, rebuild_started)
 
     print(f"✓ Successfully rebuilt index with {embedded_count} vectors")
 
     # Verify index
     try:
-        # Quick smoke test - search for something
-        if non_sensitive_pairs:
-            test_query = "test"
-            test_embedding = embedding_provider.embed_text(test_query)
-            results = vector_store.search(test_embedding, k=min(3, embedded_count))
+        # Quick smoke test - search with the last vector just added, which costs
+        # no extra model inference and should find its own record
+        if embedded_count:
+            results = vector_store.search(last_embedding, top_k=min(3, embedded_count))
             print(f"✓ Verification search returned {len(results)} results")
         else:
             print("✓ No entries to verify (empty index)")
@@ -108,4 +291,16 @@ def main():
     print("Index rebuild complete!")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Rebuild the vector index from the canonical SQLite KV store")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-embed keys changed since the last rebuild (falls back to full when the delta is large)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild even when vector index validation passes"
+    )
+    args = parser.parse_args()
+    main(incremental=args.incremental, force=args.force)
@@ -7,6 +7,7 @@ Command-line restore utility with validation and conflict resolution.
 """
 
 import argparse
+import json
 import sys
 import os
 from pathlib import Path
@@ -14,7 +15,8 @@ from pathlib import Path
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.core.backup import restore_backup, RestoreError
+# Manifests are a handful of scalar fields (~1 KB); anything far larger is not one
+MAX_MANIFEST_BYTES = 1024 * 1024
 
 
 def main():
@@ -99,9 +101,18 @@ Safety features:
         print(f"ERROR: Backup file not found: {backup_path}")
         return 1
 
+    # Reject oversized files before parsing, so a wrong path (e.g. the backup
+    # itself) fails fast instead of being loaded into memory
+    manifest_size = manifest_path.stat().st_size
+    if manifest_size > MAX_MANIFEST_BYTES:
+        print(f"ERROR: Invalid manifest file: {manifest_path} is {manifest_size} bytes")
+        return 1
+
+    # Deferred so --help and bad-path errors don't pay for loading the backup stack
+    from src.core.backup import restore_backup, RestoreError
+
     # Read and display manifest information
     try:
-        import json
         with open(manifest_path, 'r') as f:
             manifest_data = json.load(f)
 
@@ -10,9 +10,6 @@ from pathlib import Path
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from core.heartbeat import register_task, start, stop, get_status
-from core.config import get_heartbeat_interval, are_heartbeat_features_enabled
-
 
 def drift_audit_task():
     """
@@ -65,6 +62,11 @@ def drift_audit_task():
 
 def main():
     """Main entry point for heartbeat script."""
+    # Imported here rather than at module level so importing this script
+    # (e.g. for drift_audit_task) doesn't start loading the heartbeat stack
+    from core.heartbeat import register_task, start, stop
+    from core.config import get_heartbeat_interval, are_heartbeat_features_enabled
+
     try:
         if not are_heartbeat_features_enabled():
             print("❌ Heartbeat requires VECTOR_ENABLED=true and HEARTBEAT_ENABLED=true")
@@ -5,12 +5,14 @@ Starts a local HTTP server that serves the web directory on port 3000.
 """
 
 import os
+import posixpath
 import sys
 import http.server
-import socketserver
+import urllib.parse
 import webbrowser
 from pathlib import Path
 import argparse
+from functools import lru_cache
 
 # Add the parent directory to sys.path to import our modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -18,61 +20,170 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from src.core.config import DEBUG
 
 
+# Placeholder in the UI's HTML that is replaced with the configured API URL
+API_URL_PLACEHOLDER = b'const API_BASE_URL = "http://localhost:8000";'
+
+
+def _api_url_line(api_url: str) -> bytes:
+    """Build the replacement for API_URL_PLACEHOLDER, encoded once per server."""
+    return f'const API_BASE_URL = "{api_url}";'.encode('utf-8')
+
+
+@lru_cache(maxsize=64)
+def _render_html(file_path: str, mtime_ns: int, api_url_line: bytes) -> bytes:
+    """
+    Read an HTML file and inject the API URL line, without decoding it.
+
+    mtime_ns is part of the cache key, so an edited file is re-rendered on
+    its next request while unchanged files are served from memory.
+    """
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    return content.replace(API_URL_PLACEHOLDER, api_url_line)
+
+
 class QuietHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     """Custom request handler that suppresses logs in production."""
 
+    # Set TCP_NODELAY on each connection so small responses are not held back
+    disable_nagle_algorithm = True
+
     # Store API URL for injection into HTML
     api_url = "http://localhost:8000"
+    api_url_line = _api_url_line(api_url)
 
     def log_message(self, format, *args):
         if DEBUG:
             super().log_message(format, *args)
         # Suppress logs in production
 
+    # Resolved web directory, set once at startup; None falls back to the stdlib
+    # path translation relative to the handler's directory
+    web_root = None
+
+    # ETag of the static file being served by the current request, if any
+    _etag = None
+
+    # Fixed per-response headers, encoded once: CORS plus the cache policy for
+    # revalidated static files (with an ETag) or never-stored responses
+    _CORS_HEADERS = (
+        b'Access-Control-Allow-Origin: *\r\n'
+        b'Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n'
+        b'Access-Control-Allow-Headers: *\r\n'
+    )
+    _REVALIDATE_HEADERS = _CORS_HEADERS + b'Cache-Control: no-cache\r\n'
+    _NO_STORE_HEADERS = _CORS_HEADERS + (
+        b'Cache-Control: no-cache, no-store, must-revalidate\r\n'
+        b'Pragma: no-cache\r\n'
+        b'Expires: 0\r\n'
+    )
+
     def end_headers(self):
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', '*')
-        self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
-        self.send_header('Pragma', 'no-cache')
-        self.send_header('Expires', '0')
+        # Same guard as send_header: HTTP/0.9 responses carry no headers
+        if self.request_version != 'HTTP/0.9':
+            if not hasattr(self, '_headers_buffer'):
+                self._headers_buffer = []
+            if self._etag:
+                # Static files may be cached but must be revalidated, so edits
+                # still show up on the next load while unchanged files get a 304
+                self.send_header('ETag', self._etag)
+                self._headers_buffer.append(self._REVALIDATE_HEADERS)
+            else:
+                self._headers_buffer.append(self._NO_STORE_HEADERS)
+        # Appends the blank line and flushes the whole header block in one write
         super().end_headers()
 
+    def translate_path(self, path):
+        """Map a URL path onto web_root with string operations only."""
+        root = self.web_root
+        if root is None:
+            return super().translate_path(path)
+
+        original_path = path
+        path = path.split('?', 1)[0].split('#', 1)[0]
+        trailing_slash = path.rstrip().endswith('/')
+        try:
+            path = urllib.parse.unquote(path, errors='surrogatepass')
+        except UnicodeDecodeError:
+            path = urllib.parse.unquote(path)
+        # Normalizing from '/' collapses any '..' before it can climb above the root
+        path = posixpath.normpath('/' + path.lstrip('/'))
+        result = os.path.join(root, *[part for part in path.split('/') if part])
+        if result != root and not result.startswith(root + os.sep):
+            # e.g. a drive or backslash component on Windows; the stdlib filters those
+            return super().translate_path(original_path)
+        if trailing_slash:
+            result += '/'
+        return result
+
+    def send_head(self):
+        """Serve static files with a strong ETag, answering a matching If-None-Match with 304."""
+        self._etag = None
+        path = self.translate_path(self.path)
+        if not self.path.endswith('/') and os.path.isfile(path):
+            st = os.stat(path)
+            self._etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+            if self._etag_matches(self.headers.get('If-None-Match')):
+                self.send_response(304)
+                self.end_headers()
+                return None
+        # Falls through to the standard handler, which also honours If-Modified-Since
+        return super().send_head()
+
+    def _etag_matches(self, if_none_match):
+        """Whether an If-None-Match header value covers the current ETag."""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or self._etag in tags
+
+    def copyfile(self, source, outputfile):
+        """Send static file bodies with sendfile(2) instead of copying through Python buffers."""
+        if outputfile is self.wfile:
+            # socket.sendfile() loops over partial sends and falls back to
+            # send() on platforms without sendfile
+            self.connection.sendfile(source)
+        else:
+            super().copyfile(source, outputfile)
+
     def do_OPTIONS(self):
         self.send_response(200)
         self.end_headers()
 
     def do_GET(self):
         """Override to inject API_BASE_URL into HTML files."""
-        if self.path == '/' or self.path.endswith('.html') or not '.' in self.path.split('/')[-1]:
-            # This is likely an HTML file request
-            content = self._get_file_content()
-            if content and (self.path.endswith('.html') or self.path == '/'):
-                # Inject the API URL
-                content = content.replace(
-                    'const API_BASE_URL = "http://localhost:8000";',
-                    f'const API_BASE_URL = "{self.api_url}";'
-                )
-                # Send the modified content
+        self._etag = None
+        if self.path == '/' or self.path.endswith('.html'):
+            body = self._get_html_body()
+            if body is not None:
+                # Send the injected content (cached per file mtime)
                 self.send_response(200)
                 self.send_header('Content-Type', 'text/html')
+                self.send_header('Content-Length', str(len(body)))
                 self.end_headers()
-                self.wfile.write(content.encode('utf-8'))
+                self.wfile.write(body)
                 return
 
         # Default behavior for non-HTML files
         return super().do_GET()
 
-    def _get_file_content(self):
-        """Get file content for modification."""
+    def _get_html_body(self):
+        """Get the injected HTML for the requested path, or None if it is not a file."""
         try:
             file_path = self.translate_path(self.path)
-            if os.path.isfile(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return f.read()
-        except Exception:
-            pass
-        return None
+            if os.path.isdir(file_path):
+                file_path = os.path.join(file_path, 'index.html')
+            st = os.stat(file_path)
+            return _render_html(file_path, st.st_mtime_ns, self.api_url_line)
+        except OSError:
+            return None
+
+
+class UIServer(http.server.ThreadingHTTPServer):
+    """Thread-per-connection server, so one slow browser doesn't stall other asset fetches."""
+
+    allow_reuse_address = True
+    request_queue_size = 128
 
 
 def main():
@@ -97,15 +208,17 @@ def main():
 
     # Change to web directory
     os.chdir(web_dir)
+    QuietHTTPRequestHandler.web_root = os.path.realpath(web_dir)
 
     # Configure the server
     Handler = QuietHTTPRequestHandler
 
     try:
-        with socketserver.TCPServer((args.host, args.port), Handler) as httpd:
+        with UIServer((args.host, args.port), Handler) as httpd:
             server_url = f"http://{args.host}:{args.port}"
             api_url = args.api_url or f"http://{args.host}:8000"
             Handler.api_url = api_url  # Inject the API URL into the handler
+            Handler.api_url_line = _api_url_line(api_url)
 
             print("🧠 Memory Stages Chat UI Server")
             print("=" * 50)
@@ -8,6 +8,8 @@ from dataclasses import dataclass
 from datetime import datetime
 from abc import ABC, abstractmethod
 
+from ..core.clock import iso_timestamp
+
 
 @dataclass
 class AgentMessage:
@@ -40,7 +42,7 @@ class AgentResponse:
         if self.metadata is None:
             self.metadata = {}
         if self.audit_info is None:
-            self.audit_info = {"timestamp": datetime.now().isoformat()}
+            self.audit_info = {"timestamp": iso_timestamp()}
 
 
 @dataclass
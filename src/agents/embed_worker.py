@@ -0,0 +1,209 @@
+"""
+Stage 2: Embedding worker process for FaissRetriever ingests.
+Encodes text in a dedicated process so request threads don't run the model inline.
+"""
+
+import atexit
+import itertools
+import multiprocessing as mp
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Most texts one worker encode call takes; requests arriving within the batch
+# window are coalesced up to this size
+MAX_BATCH = 64
+
+# Longest a caller waits for its vectors before giving up
+RESULT_TIMEOUT_SEC = 60.0
+
+# How often the reader thread checks that the worker process is still running
+LIVENESS_POLL_SEC = 1.0
+
+
+def _load_worker_model(model_name: str):
+    """Load the worker's own SentenceTransformer (called inside the worker process)."""
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(model_name)
+    model.eval()
+    if model.device.type == "cuda":
+        model.half()
+    return model
+
+
+def _embed_worker(in_q, out_q, model_name: str, batch_window: float) -> None:
+    """
+    Worker loop: coalesce requests arriving within batch_window seconds into one encode.
+
+    Requests are (request_id, texts, batch_size); replies are (request_id, vectors, error).
+    A coalesced encode uses the largest batch_size among its requests.
+    A None request stops the worker.
+    """
+    model = _load_worker_model(model_name)
+    stopping = False
+    while not stopping:
+        request = in_q.get()
+        if request is None:
+            break
+        batch = [request]
+        size = len(request[1])
+        deadline = time.monotonic() + batch_window
+        while size < MAX_BATCH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = in_q.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                stopping = True
+                break
+            batch.append(request)
+            size += len(request[1])
+
+        texts = [text for _, request_texts, _ in batch for text in request_texts]
+        try:
+            vectors = model.encode(
+                texts, batch_size=max(batch_size for _, _, batch_size in batch), convert_to_numpy=True,
+                normalize_embeddings=True, show_progress_bar=False
+            )
+            vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        except Exception as e:
+            for request_id, _, _ in batch:
+                out_q.put((request_id, None, repr(e)))
+            continue
+
+        offset = 0
+        for request_id, request_texts, _ in batch:
+            out_q.put((request_id, vectors[offset:offset + len(request_texts)], None))
+            offset += len(request_texts)
+
+
+class EmbeddingWorkerDied(RuntimeError):
+    """The embedding worker process exited or was closed before replying."""
+
+
+class EmbeddingWorker:
+    """
+    Client for one embedding worker process.
+
+    Thread-safe: any thread may call encode(); a reader thread matches replies
+    to the waiting callers by request id. If the process exits (model load
+    failure, OOM kill), pending and later requests fail at once with
+    EmbeddingWorkerDied instead of waiting out RESULT_TIMEOUT_SEC.
+    """
+
+    def __init__(self, model_name: str, batch_window_ms: int):
+        # spawn, not fork: CUDA can't be initialized in a forked child
+        ctx = mp.get_context("spawn")
+        self._in_q = ctx.Queue()
+        self._out_q = ctx.Queue()
+        self._process = ctx.Process(
+            target=_embed_worker,
+            args=(self._in_q, self._out_q, model_name, batch_window_ms / 1000),
+            name=f"embedding-worker-{model_name}",
+            daemon=True
+        )
+        self._process.start()
+
+        self._pending: Dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._stopped = False  # Set once the process is gone or closed; guarded by _pending_lock
+        self._request_ids = itertools.count()
+        self._reader = threading.Thread(target=self._read_results, name="embedding-results", daemon=True)
+        self._reader.start()
+
+    @property
+    def alive(self) -> bool:
+        """Whether the worker process is still running and accepting requests."""
+        return not self._stopped and self._process.is_alive()
+
+    def submit(self, texts: List[str], batch_size: int = MAX_BATCH) -> Future:
+        """Queue texts for encoding; the future resolves to an (n, dim) float32 array."""
+        return self._enqueue(texts, batch_size)[1]
+
+    def _enqueue(self, texts: List[str], batch_size: int) -> Tuple[Optional[int], Future]:
+        """Queue a request and return (request_id, future); request_id is None if it was rejected."""
+        future = Future()
+        with self._pending_lock:
+            if self._stopped or not self._process.is_alive():
+                future.set_exception(EmbeddingWorkerDied(f"Embedding worker {self._process.name} is not running"))
+                return None, future
+            request_id = next(self._request_ids)
+            self._pending[request_id] = future
+        self._in_q.put((request_id, list(texts), batch_size))
+        return request_id, future
+
+    def encode(self, texts: List[str], batch_size: int = MAX_BATCH) -> np.ndarray:
+        """
+        Encode texts in the worker and wait for the unit-length vectors.
+
+        Raises concurrent.futures.TimeoutError after RESULT_TIMEOUT_SEC; the request
+        is forgotten then, so a late reply is dropped by the reader thread.
+        """
+        request_id, future = self._enqueue(texts, batch_size)
+        try:
+            return future.result(timeout=RESULT_TIMEOUT_SEC)
+        except FutureTimeoutError:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+            raise
+
+    def _fail_pending(self, reason: str) -> None:
+        """Stop accepting requests and fail every request still waiting for a reply."""
+        with self._pending_lock:
+            self._stopped = True
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(EmbeddingWorkerDied(reason))
+
+    def _read_results(self) -> None:
+        """Resolve pending futures as the worker replies; fail them if the process exits."""
+        while True:
+            try:
+                reply = self._out_q.get(timeout=LIVENESS_POLL_SEC)
+            except queue.Empty:
+                if self._process.is_alive():
+                    continue
+                self._fail_pending(
+                    f"Embedding worker {self._process.name} exited with code {self._process.exitcode}"
+                )
+                break
+            if reply is None:
+                self._fail_pending("Embedding worker closed")
+                break
+            request_id, vectors, error = reply
+            with self._pending_lock:
+                future = self._pending.pop(request_id, None)
+            if future is None:
+                continue
+            if error is not None:
+                future.set_exception(RuntimeError(f"Embedding worker failed: {error}"))
+            else:
+                future.set_result(vectors)
+
+    def close(self) -> None:
+        """Stop the worker process and the reader thread."""
+        self._in_q.put(None)
+        self._process.join(timeout=5)
+        self._out_q.put(None)
+
+
+# One worker per model name, started on first use
+_workers: Dict[str, EmbeddingWorker] = {}
+_workers_lock = threading.Lock()
+
+
+def get_embedding_worker(model_name: str, batch_window_ms: int) -> EmbeddingWorker:
+    """Return the shared worker for model_name, starting it (and its atexit shutdown) on first use."""
+    with _workers_lock:
+        worker = _workers.get(model_name)
+        if worker is None:
+            worker = _workers[model_name] = EmbeddingWorker(model_name, batch_window_ms)
+            atexit.register(worker.close)
+        return worker
@@ -3,12 +3,20 @@ Stage 2: FAISS Vector Store Agent
 Semantic memory search using FAISS for fuzzy/semantic recall.
 """
 
+import atexit
+import functools
+import json
 import os
 import pickle
+import weakref
+from array import array
 from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
 from .agent import BaseAgent, AgentMessage, AgentResponse
-from ..core.config import debug_enabled, get_vector_store
+from ..core.config import (
+    debug_enabled, get_vector_store, FAISS_INDEX_TYPE, EMBED_WORKER_ENABLED, EMBED_WORKER_BATCH_WINDOW_MS
+)
+from ..core.db import get_conn
 from datetime import datetime
 
 # Try to import sentence-transformers, fallback gracefully
@@ -21,6 +29,51 @@ except ImportError:
     print("DEBUG: sentence-transformers not available, using random embeddings for testing")
 
 
+# Texts per forward pass when ingest_chunks encodes a batch
+ENCODE_BATCH_SIZE = 64
+
+# Larger forward passes for rebuild_index, which re-encodes the whole store at once
+REBUILD_ENCODE_BATCH_SIZE = 256
+
+# Distinct query strings whose embeddings search() keeps per retriever
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+
+# FAISS_INDEX_TYPE=ivfpq: the retriever starts on an exact flat index and retrains
+# into the next quantized IVF tier each time the corpus grows past its size.
+# Entries are (min_vectors, nlist, index_factory spec), largest first; each tier
+# keeps ~39 training vectors per IVF list, the minimum FAISS asks for.
+IVF_INDEX_TIERS = (
+    (40_000, 1024, "IVF1024,PQ16x8"),  # 16-byte PQ codes per vector (1.5 KB as float32 at 384 dims)
+    (2_500, 64, "IVF64,SQ8"),  # 1-byte int8 codes per component
+)
+
+# IVF lists scanned per query; more lists trade search time for recall
+IVF_NPROBE = 8
+
+# Per-chunk fields kept in their own metadata columns; other keys are caller metadata
+COLUMN_FIELDS = ('text', 'ingested_at', 'vector_norm', 'text_length')
+
+# Live retrievers, saved by one atexit handler instead of each one saving in __del__
+_open_retrievers: "weakref.WeakSet[FaissRetriever]" = weakref.WeakSet()
+
+def _close_open_retrievers() -> None:
+    """Save every retriever still alive at interpreter exit."""
+    for retriever in list(_open_retrievers):
+        retriever.close()
+
+atexit.register(_close_open_retrievers)
+
+@functools.lru_cache(maxsize=4)
+def _load_embedding_model(name: str):
+    """Load a SentenceTransformer once per process; every retriever using the same model shares it."""
+    model = SentenceTransformer(name)
+    model.eval()
+    if model.device.type == "cuda":
+        # Half-precision weights on GPU; outputs still come back as float32 numpy
+        model.half()
+    return model
+
+
 class FaissRetriever(BaseAgent):
     """
     FAISS-based vector retrieval agent for semantic search on ingested memories.
@@ -32,6 +85,14 @@ class FaissRetriever(BaseAgent):
     - Maintaining metadata association for retrieved results
     """
 
+    # get_index_stats entries that never change, merged into each stats snapshot
+    _STATIC_INDEX_STATS = {
+        'implementation_status': 'active',
+        'stage': 'stage_2_complete',
+        'embedding_model': 'sentence-transformers',
+        'supports_deletion': False,  # FAISS IndexFlatIP doesn't support deletion
+    }
+
     def __init__(self, agent_id: str = "faiss_retriever", embedding_model: str = "all-MiniLM-L6-v2"):
         """
         Initialize FAISS retriever with embedding model.
@@ -44,7 +105,7 @@ class FaissRetriever(BaseAgent):
 
         # Initialize embedding model
         try:
-            self.embedding_model = SentenceTransformer(embedding_model)
+            self.embedding_model = _load_embedding_model(embedding_model)
             self.embedding_dim = self.embedding_model.get_sentence_embedding_dimension()
             print(f"DEBUG: FAISS embedding model loaded: {embedding_model} (dim: {self.embedding_dim})")
         except Exception as e:
@@ -53,48 +114,173 @@ class FaissRetriever(BaseAgent):
             self.embedding_model = None
             self.embedding_dim = 384  # Default for all-MiniLM-L6-v2
 
+        # Ingests encode in a shared worker process when enabled, started by the
+        # first ingest; queries stay in-process, where the query embedding cache
+        # already absorbs repeats. Cleared if the worker dies, so ingests fall
+        # back to the in-process model.
+        self._embed_worker_model = (
+            embedding_model if EMBED_WORKER_ENABLED and self.embedding_model is not None else None
+        )
+
+        # Repeat queries skip the forward pass; the model is fixed for the
+        # retriever's lifetime, so entries never go stale
+        self._embed_query = functools.lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)(self._encode_query)
+
         # Initialize FAISS index (lazy load)
         self.index = None
         self.index_file = os.path.join(os.path.dirname(__file__), "../../data/faiss_index.idx")
 
-        # Metadata storage
-        self.metadata_store = []
+        # Metadata storage: one parallel column per field, indexed by FAISS id, so
+        # search reads only the rows it returns and stats never walk per-chunk dicts.
+        # Persisted as one SQLite row per chunk so a save only writes new chunks.
+        self._clear_metadata()
+        self.metadata_db = os.path.join(os.path.dirname(__file__), "../../data/faiss_metadata.db")
+        self._persisted_count = 0  # Leading chunks already in metadata_db
+        # Pre-SQLite pickle of the whole list; read once if metadata_db doesn't exist yet
         self.metadata_file = os.path.join(os.path.dirname(__file__), "../../data/faiss_metadata.pkl")
 
+        # Set by ingests, cleared by a successful save; close() is a no-op while clean
+        self._dirty = False
+
         # Load existing index if available
         self._load_index()
+        _open_retrievers.add(self)
+
+    def _clear_metadata(self):
+        """Empty every metadata column."""
+        self._texts: List[str] = []
+        self._ingested_at: List[Optional[str]] = []
+        self._text_lengths = array('l')
+        self._vector_norms = array('f')
+        self._meta_extra: List[Dict[str, Any]] = []
+
+    def _append_metadata(self, text: str, metadata: Optional[Dict[str, Any]],
+                         ingested_at: Optional[str], vector_norm: float):
+        """Append one chunk to the metadata columns."""
+        self._texts.append(text)
+        self._ingested_at.append(ingested_at)
+        self._text_lengths.append(len(text))
+        self._vector_norms.append(vector_norm)
+        self._meta_extra.append({k: v for k, v in (metadata or {}).items() if k not in COLUMN_FIELDS})
+
+    def _chunk_metadata(self, idx: int) -> Dict[str, Any]:
+        """Metadata dict for chunk idx (everything but its text), as search results return it."""
+        metadata = dict(self._meta_extra[idx])
+        metadata.update({
+            'ingested_at': self._ingested_at[idx],
+            'vector_norm': float(self._vector_norms[idx]),
+            'text_length': self._text_lengths[idx]
+        })
+        return metadata
+
+    @property
+    def metadata_store(self) -> List[Dict[str, Any]]:
+        """One dict per chunk, including 'text'; built from the columns on each access."""
+        return [{'text': text, **self._chunk_metadata(idx)} for idx, text in enumerate(self._texts)]
+
+    @metadata_store.setter
+    def metadata_store(self, entries):
+        """Replace all metadata with the given per-chunk dicts."""
+        self._clear_metadata()
+        for entry in entries:
+            self._append_metadata(entry.get('text', ''), entry, entry.get('ingested_at'),
+                                  float(entry.get('vector_norm') or 0.0))
 
     def _ensure_index(self):
         """Lazy initialization of FAISS index."""
         if self.index is None:
             try:
                 import faiss
-                self.index = faiss.IndexFlatL2(self.embedding_dim)
+                # Inner product over unit-length vectors is cosine similarity
+                if FAISS_INDEX_TYPE == "hnsw":
+                    from ..vector.faiss_store import HNSW_M, HNSW_EF_SEARCH
+                    self.index = faiss.IndexHNSWFlat(self.embedding_dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+                    self.index.hnsw.efSearch = HNSW_EF_SEARCH
+                else:
+                    # Also the starting point for ivfpq, which needs vectors to train on
+                    # and is only built once the corpus reaches the first IVF tier
+                    self.index = faiss.IndexFlatIP(self.embedding_dim)
                 print(f"DEBUG: Initialized FAISS index with dimension {self.embedding_dim}")
             except ImportError:
                 raise RuntimeError("FAISS not installed. Run: pip install faiss-cpu")
 
     def _load_index(self):
         """Load existing FAISS index and metadata from disk."""
+        stale_metric = False
         try:
             if os.path.exists(self.index_file):
                 import faiss
                 self.index = faiss.read_index(self.index_file)
                 print(f"DEBUG: Loaded FAISS index with {self.index.ntotal} vectors")
+                if hasattr(self.index, 'nprobe'):
+                    self.index.nprobe = IVF_NPROBE
+                # Indexes saved before the switch to inner product hold raw L2 vectors
+                stale_metric = self.index.metric_type != faiss.METRIC_INNER_PRODUCT
             else:
                 print("DEBUG: No existing FAISS index found, will create new one")
 
-            if os.path.exists(self.metadata_file):
+            if os.path.exists(self.metadata_db):
+                rows = get_conn(self.metadata_db).execute(
+                    "SELECT text, meta FROM faiss_meta ORDER BY idx"
+                ).fetchall()
+                self.metadata_store = ({'text': text, **json.loads(meta)} for text, meta in rows)
+                self._persisted_count = len(self._texts)
+                print(f"DEBUG: Loaded {len(self._texts)} metadata entries")
+            elif os.path.exists(self.metadata_file):
+                # Legacy pickle: the next save copies every entry into metadata_db
                 with open(self.metadata_file, 'rb') as f:
                     self.metadata_store = pickle.load(f)
-                print(f"DEBUG: Loaded {len(self.metadata_store)} metadata entries")
+                self._dirty = True
+                print(f"DEBUG: Loaded {len(self._texts)} legacy metadata entries")
             else:
                 print("DEBUG: No existing metadata found")
 
         except Exception as e:
             print(f"DEBUG: Failed to load existing index: {e}")
             self.index = None
-            self.metadata_store = []
+            self._clear_metadata()
+            self._persisted_count = 0
+            return
+
+        if stale_metric:
+            print("DEBUG: FAISS index uses L2 distance, rebuilding for inner product")
+            self.rebuild_index()
+
+    def _maybe_quantize_index(self):
+        """
+        Under FAISS_INDEX_TYPE=ivfpq, retrain into the largest IVF tier the index has reached.
+
+        The current vectors (exact from the flat index, approximate from a
+        smaller IVF tier) train the new index's centroids and codes and are
+        re-added to it. A failure keeps the current index.
+        """
+        if FAISS_INDEX_TYPE != "ivfpq" or self.index is None:
+            return
+        count = self.index.ntotal
+        current_nlist = getattr(self.index, 'nlist', 0)
+        for min_vectors, nlist, spec in IVF_INDEX_TIERS:
+            if count >= min_vectors:
+                break
+        else:
+            return
+        if nlist <= current_nlist:
+            return
+
+        try:
+            import faiss
+            if current_nlist:
+                # IVF indexes only reconstruct by id through a direct map
+                self.index.make_direct_map()
+            vectors = self.index.reconstruct_n(0, count)
+            index = faiss.index_factory(self.embedding_dim, spec, faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+            index.add(vectors)
+            index.nprobe = IVF_NPROBE
+            self.index = index
+            self._dirty = True
+            print(f"DEBUG: Retrained FAISS index as {spec} over {count} vectors")
+        except Exception as e:
+            print(f"DEBUG: Failed to quantize FAISS index as {spec}: {e}")
 
     def _save_index(self):
         """Save FAISS index and metadata to disk."""
@@ -106,14 +292,55 @@ class FaissRetriever(BaseAgent):
                 faiss.write_index(self.index, self.index_file)
                 print(f"DEBUG: Saved FAISS index with {self.index.ntotal} vectors")
 
-            if self.metadata_store:
-                with open(self.metadata_file, 'wb') as f:
-                    pickle.dump(self.metadata_store, f)
-                print(f"DEBUG: Saved {len(self.metadata_store)} metadata entries")
+            self._save_metadata()
+            self._dirty = False
 
         except Exception as e:
             print(f"DEBUG: Failed to save index: {e}")
 
+    def close(self):
+        """Save the index and metadata if anything changed since the last save."""
+        if self._dirty:
+            self._save_index()
+
+    def _save_metadata(self):
+        """Write metadata entries added since the last save to metadata_db in one transaction."""
+        count = len(self._texts)
+        reset = self._persisted_count > count
+        if reset:
+            # The store was replaced with a shorter one; rewrite it from the start
+            self._persisted_count = 0
+        start = self._persisted_count
+        if start == count and not reset:
+            return
+
+        rows = [
+            (idx, self._texts[idx], json.dumps(self._chunk_metadata(idx), default=str), self._ingested_at[idx])
+            for idx in range(start, count)
+        ]
+
+        conn = get_conn(self.metadata_db)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS faiss_meta (
+                idx INTEGER PRIMARY KEY,
+                text TEXT,
+                meta TEXT,
+                ingested_at TEXT
+            )
+        """)
+        # Take the write lock up front so the delete and inserts commit as one WAL flush
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Rows past the persisted prefix belong to a previous store (after a reset)
+            conn.execute("DELETE FROM faiss_meta WHERE idx >= ?", (self._persisted_count,))
+            conn.executemany("INSERT INTO faiss_meta (idx, text, meta, ingested_at) VALUES (?, ?, ?, ?)", rows)
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+        self._persisted_count = count
+        print(f"DEBUG: Saved {count - start} new metadata entries ({count} total)")
+
     def ingest_chunk(self, text: str, metadata: Dict[str, Any] = None) -> bool:
         """
         Convert text chunk to vector and add to FAISS index.
@@ -132,29 +359,31 @@ class FaissRetriever(BaseAgent):
             # Ensure index is initialized
             self._ensure_index()
 
-            # Generate embedding
-            if self.embedding_model:
-                vector = self.embedding_model.encode(text, convert_to_numpy=True)
+            # Generate unit-length embedding
+            vectors = self._encode_in_worker([text], ENCODE_BATCH_SIZE)
+            if vectors is not None:
+                vector = vectors[0]
+            elif self.embedding_model:
+                vector = self.embedding_model.encode(text, convert_to_numpy=True, normalize_embeddings=True)
             else:
                 # Fallback for testing - random vector
                 vector = np.random.randn(self.embedding_dim).astype(np.float32)
+                vector /= np.linalg.norm(vector)
+            # FAISS copies any input that isn't C-contiguous float32; convert once
+            # here instead (a no-op for the usual float32 model output)
+            vector = np.ascontiguousarray(vector, dtype=np.float32)
 
             # Add to FAISS index
             vector_reshaped = vector.reshape(1, -1)
             self.index.add(vector_reshaped)
+            self._dirty = True
+            self._maybe_quantize_index()
 
             # Store metadata
-            chunk_metadata = metadata or {}
-            chunk_metadata.update({
-                'text': text,
-                'ingested_at': datetime.now().isoformat(),
-                'vector_norm': float(np.linalg.norm(vector)),
-                'text_length': len(text)
-            })
-            self.metadata_store.append(chunk_metadata)
+            self._append_metadata(text, metadata, datetime.now().isoformat(), float(np.linalg.norm(vector)))
 
             # Save periodically (every 100 chunks)
-            if len(self.metadata_store) % 100 == 0:
+            if len(self._texts) % 100 == 0:
                 self._save_index()
 
             if debug_enabled():
@@ -166,6 +395,100 @@ class FaissRetriever(BaseAgent):
             print(f"DEBUG: Failed to ingest chunk: {e}")
             return False
 
+    def ingest_chunks(self, texts: List[str], metadatas: Optional[List[Dict[str, Any]]] = None,
+                      batch_size: int = ENCODE_BATCH_SIZE, autosave: bool = True) -> int:
+        """
+        Convert many text chunks to vectors with one batched encode and one index add.
+
+        Args:
+            texts: Text contents to ingest; empty or whitespace-only entries are skipped
+            metadatas: Optional metadata dicts, parallel to texts
+            batch_size: Texts per embedding forward pass
+            autosave: Save when the batch crosses a multiple of 100 chunks; callers
+                that save once themselves afterwards pass False
+
+        Returns:
+            Number of chunks ingested
+        """
+        try:
+            metadatas = metadatas or [None] * len(texts)
+            pairs = [(text, metadata) for text, metadata in zip(texts, metadatas) if text and text.strip()]
+            if not pairs:
+                return 0
+
+            # Ensure index is initialized
+            self._ensure_index()
+
+            # Generate all embeddings at once: per-call model overhead is paid once per batch
+            batch_texts = [text for text, _ in pairs]
+            vectors = self._encode_in_worker(batch_texts, batch_size)
+            if vectors is None and self.embedding_model:
+                vectors = self.embedding_model.encode(
+                    batch_texts, batch_size=batch_size, convert_to_numpy=True,
+                    normalize_embeddings=True, show_progress_bar=False
+                )
+            elif vectors is None:
+                # Fallback for testing - random vectors
+                vectors = np.random.randn(len(batch_texts), self.embedding_dim)
+                vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+            # Add to FAISS index
+            self.index.add(vectors)
+            self._dirty = True
+            self._maybe_quantize_index()
+
+            # Store metadata
+            ingested_at = datetime.now().isoformat()
+            norms = np.linalg.norm(vectors, axis=1)
+            saved_before = len(self._texts) // 100
+            for (text, metadata), norm in zip(pairs, norms.tolist()):
+                self._append_metadata(text, metadata, ingested_at, norm)
+
+            # Save periodically (whenever the batch crosses a multiple of 100 chunks)
+            if autosave and len(self._texts) // 100 > saved_before:
+                self._save_index()
+
+            if debug_enabled():
+                print(f"DEBUG: Ingested {len(pairs)} chunks (vector shape: {vectors.shape})")
+
+            return len(pairs)
+
+        except Exception as e:
+            print(f"DEBUG: Failed to ingest chunks: {e}")
+            return 0
+
+    def _encode_in_worker(self, texts: List[str], batch_size: int) -> Optional[np.ndarray]:
+        """
+        Encode ingest texts in the shared embedding worker, starting it on first use.
+
+        Returns None when the worker is disabled, has died, timed out or failed
+        the batch; the caller then encodes in-process. Once the worker has died,
+        later ingests skip it.
+        """
+        if self._embed_worker_model is None:
+            return None
+        from concurrent.futures import TimeoutError as FutureTimeoutError
+        from .embed_worker import get_embedding_worker, EmbeddingWorkerDied
+        try:
+            worker = get_embedding_worker(self._embed_worker_model, EMBED_WORKER_BATCH_WINDOW_MS)
+            return worker.encode(texts, batch_size)
+        except EmbeddingWorkerDied as e:
+            print(f"DEBUG: {e}; encoding ingests in-process from now on")
+            self._embed_worker_model = None
+            return None
+        except (FutureTimeoutError, RuntimeError) as e:
+            print(f"DEBUG: Embedding worker request failed ({e!r}); encoding this batch in-process")
+            return None
+
+    def _encode_query(self, query: str) -> np.ndarray:
+        """Embed a query string at unit length; cached through self._embed_query, so the result is read-only."""
+        vector = self.embedding_model.encode(query, convert_to_numpy=True, normalize_embeddings=True)
+        # Converted once per distinct query, so FAISS never copies a cached vector
+        vector = np.ascontiguousarray(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        return vector
+
     def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """
         Search for most similar text chunks to the query.
@@ -187,32 +510,24 @@ class FaissRetriever(BaseAgent):
 
             # Generate query embedding
             if self.embedding_model:
-                query_vector = self.embedding_model.encode(query, convert_to_numpy=True)
+                query_vector = self._embed_query(query.strip())
             else:
                 # Fallback for testing - random vector
                 query_vector = np.random.randn(self.embedding_dim).astype(np.float32)
+                query_vector /= np.linalg.norm(query_vector)
 
-            # Search FAISS index
+            # Search FAISS index; with unit-length vectors the scores are cosine similarities
             query_reshaped = query_vector.reshape(1, -1)
-            distances, indices = self.index.search(query_reshaped, min(top_k, self.index.ntotal))
-
-            # Convert to cosine similarity scores (lower distance = higher similarity)
-            # distances are L2 squared distances, convert to similarity scores
-            max_distance = np.max(distances) if distances.size > 0 else 1.0
-            similarities = 1.0 - (distances / (max_distance + 1e-6))  # Normalize to [0, 1]
+            similarities, indices = self.index.search(query_reshaped, min(top_k, self.index.ntotal))
 
             results = []
-            for i, (distance, similarity, idx) in enumerate(zip(distances[0], similarities[0], indices[0])):
-                if idx < len(self.metadata_store):
-                    metadata = self.metadata_store[idx].copy()
-                    text = metadata.pop('text', '')
-
+            for i, (similarity, idx) in enumerate(zip(similarities[0].tolist(), indices[0].tolist())):
+                if 0 <= idx < len(self._texts):
                     result = {
-                        'text': text,
-                        'metadata': metadata,
-                        'score': float(similarity),
-                        'distance': float(distance),
-                        'index': int(idx),
+                        'text': self._texts[idx],
+                        'metadata': self._chunk_metadata(idx),
+                        'score': similarity,
+                        'index': idx,
                         'rank': i + 1
                     }
                     results.append(result)
@@ -306,22 +621,27 @@ class FaissRetriever(BaseAgent):
             'vector_count': self.index.ntotal if self.index else 0,
             'embedding_dimension': self.embedding_dim,
             'embedding_model': 'sentence-transformers',
-            'metadata_entries': len(self.metadata_store),
+            'metadata_entries': len(self._texts),
             'index_size_mb': self._get_index_size_mb(),
             'stage': 'stage_2_semantic_memory'
         })
         return status
 
-    def _get_index_size_mb(self) -> float:
-        """Get approximate size of FAISS index in MB."""
-        try:
-            if self.index and os.path.exists(self.index_file):
-                size_bytes = os.path.getsize(self.index_file)
-                return round(size_bytes / (1024 * 1024), 2)
-        except Exception:
-            pass
+    def _get_index_size_mb(self, size_bytes: Optional[int] = None) -> float:
+        """Get approximate size of FAISS index in MB (size_bytes: an already stat'ed file size)."""
+        if size_bytes is None:
+            size_bytes = self._index_file_size()
+        if self.index and size_bytes is not None:
+            return round(size_bytes / (1024 * 1024), 2)
         return 0.0
 
+    def _index_file_size(self) -> Optional[int]:
+        """Size of the saved index file in bytes, or None if it doesn't exist."""
+        try:
+            return os.stat(self.index_file).st_size
+        except OSError:
+            return None
+
     def get_index_stats(self) -> Dict[str, Any]:
         """
         Get detailed statistics about the current FAISS index.
@@ -329,20 +649,20 @@ class FaissRetriever(BaseAgent):
         Returns:
             Dict with comprehensive index statistics
         """
-        return {
-            'implementation_status': 'active',
-            'stage': 'stage_2_complete',
+        # One stat answers both whether the index file exists and how big it is
+        index_file_size = self._index_file_size()
+        stats = dict(self._STATIC_INDEX_STATS)
+        stats.update({
             'vector_count': self.index.ntotal if self.index else 0,
             'dimensions': self.embedding_dim,
-            'embedding_model': 'sentence-transformers',
-            'metadata_entries': len(self.metadata_store),
-            'index_file_exists': os.path.exists(self.index_file),
-            'metadata_file_exists': os.path.exists(self.metadata_file),
-            'index_size_mb': self._get_index_size_mb(),
+            'metadata_entries': len(self._texts),
+            'index_file_exists': index_file_size is not None,
+            'metadata_file_exists': os.path.exists(self.metadata_db),
+            'index_size_mb': self._get_index_size_mb(index_file_size),
             'is_metric_l2': hasattr(self.index, 'metric_type') if self.index else False,
-            'supports_deletion': False,  # FAISS IndexFlatL2 doesn't support deletion
-            'last_ingested': self.metadata_store[-1].get('ingested_at') if self.metadata_store else None
-        }
+            'last_ingested': self._ingested_at[-1] if self._ingested_at else None
+        })
+        return stats
 
     def rebuild_index(self) -> bool:
         """
@@ -353,32 +673,24 @@ class FaissRetriever(BaseAgent):
             True if rebuild successful, False otherwise
         """
         try:
-            print(f"DEBUG: Rebuilding FAISS index from {len(self.metadata_store)} chunks...")
+            print(f"DEBUG: Rebuilding FAISS index from {len(self._texts)} chunks...")
 
-            # Create new index
+            # Start from an empty index and re-encode every stored chunk in one batch
+            texts, metadatas = self._texts, self._meta_extra
+            self.index = None
+            self._clear_metadata()
+            self._persisted_count = 0
             self._ensure_index()
-            new_index = type(self.index)()  # Create same type of index
-
-            # Re-ingest all chunks
-            successful_ingests = 0
-            for metadata in self.metadata_store:
-                text = metadata.get('text', '')
-                if text and self.ingest_chunk(text, metadata):
-                    successful_ingests += 1
+            successful_ingests = self.ingest_chunks(
+                texts, metadatas, batch_size=REBUILD_ENCODE_BATCH_SIZE, autosave=False
+            )
 
-            # Save rebuilt index
+            # Save rebuilt index and metadata once
             self._save_index()
 
-            print(f"DEBUG: Index rebuild complete: {successful_ingests}/{len(self.metadata_store)} chunks")
-            return successful_ingests == len(self.metadata_store)
+            print(f"DEBUG: Index rebuild complete: {successful_ingests}/{len(texts)} chunks")
+            return successful_ingests == len(texts)
 
         except Exception as e:
             print(f"DEBUG: Index rebuild failed: {e}")
             return False
-
-    def __del__(self):
-        """Save index on destruction."""
-        try:
-            self._save_index()
-        except Exception:
-            pass  # Silent cleanup
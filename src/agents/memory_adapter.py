@@ -9,7 +9,6 @@ All memory access must go through this privacy gatekeeper.
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import re
-import json
 from ..core import dao
 from ..core.config import debug_enabled
 
@@ -155,7 +154,7 @@ class MemoryAdapter:
                 user_id="system",
                 actor="memory_adapter",
                 action="sensitive_data_detected",
-                payload=json.dumps({
+                payload=dao.dump_payload({
                     "text_length": len(text),
                     "patterns_detected": len(detected_patterns),
                     "pattern_types": list(set([p['type'] for p in detected_patterns]))
@@ -386,7 +385,7 @@ class MemoryAdapter:
             user_id=user_id or "system",
             actor="memory_adapter",
             action=f"memory_{operation}",
-            payload=json.dumps(log_entry)
+            payload=dao.dump_payload(log_entry)
         )
 
     def is_ready(self) -> bool:
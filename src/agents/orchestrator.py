@@ -100,7 +100,7 @@ class OrchestratorService:
 
             # Step 2: Planning phase
             timeline.append(await self._create_timeline_event("planning", "Creating execution plan"))
-            plan = await self.planning_agent.create_plan(request.content)
+            plan = self.planning_agent.create_plan(request.content)
             self.working_memory.set("plan", plan)
             timeline.append(await self._create_timeline_event("plan_complete", f"Plan created: {plan.steps[:1]}..."))
 
@@ -5,7 +5,6 @@ Manages agent swarm lifecycle and provides agent discovery/services.
 
 from typing import Dict, List, Any, Optional
 from datetime import datetime
-import json
 from .agent import BaseAgent
 from .ollama_agent import OllamaAgent
 from .mock_agent import MockAgent
@@ -72,7 +71,7 @@ class AgentRegistry:
             user_id="system",
             actor="agent_registry",
             action="agent_created",
-            payload=json.dumps({
+            payload=dao.dump_payload({
                 'agent_id': agent_id,
                 'model': model_name,
                 'swarm_size': len(self.agents)
@@ -126,7 +125,7 @@ class AgentRegistry:
             user_id="system",
             actor="agent_registry",
             action="mock_agent_created",
-            payload=json.dumps({
+            payload=dao.dump_payload({
                 'agent_id': agent_id,
                 'model': model_name,
                 'swarm_size': len(self.agents),
@@ -230,7 +229,7 @@ class AgentRegistry:
                 user_id="system",
                 actor="agent_registry",
                 action="agent_removed",
-                payload=json.dumps({
+                payload=dao.dump_payload({
                     'agent_id': agent_id,
                     'remaining_swarm_size': len(self.agents)
                 })
@@ -347,7 +346,7 @@ class AgentRegistry:
                     user_id="system",
                     actor="agent_registry",
                     action="swarm_initialization_critical_error",
-                    payload=json.dumps({
+                    payload=dao.dump_payload({
                         'agent_id': agent_id,
                         'error': str(e),
                         'unexpected_failure': True
@@ -376,7 +375,7 @@ class AgentRegistry:
             user_id="system",
             actor="agent_registry",
             action="swarm_initialized_always_activated",
-            payload=json.dumps({
+            payload=dao.dump_payload({
                 'agent_count': len(created_agents),
                 'model': model_name,
                 'agent_types': agent_types,
@@ -406,7 +405,7 @@ class AgentRegistry:
             user_id="system",
             actor="agent_registry",
             action="swarm_shutdown",
-            payload=json.dumps({'removed_agents': removed_count})
+            payload=dao.dump_payload({'removed_agents': removed_count})
         )
 
         return removed_count
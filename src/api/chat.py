@@ -14,7 +14,6 @@ from typing import Dict, Any, Optional, List
 import uuid
 import os
 from datetime import datetime
-import json
 try:
     import re
 except ImportError:
@@ -254,7 +253,7 @@ async def send_chat_message(
                 user_id=user_id,
                 actor="chat_api",
                 action="system_identity_query",
-                payload=json.dumps({"query": content, "answer": system_answer, "source": identity_response['source']}),
+                payload=dao.dump_payload({"query": content, "answer": system_answer, "source": identity_response['source']}),
                 session_id=session_id,
                 event_type="system_identity_query",
                 message=f"System identity query: '{content}' -> '{system_answer}'",
@@ -321,7 +320,7 @@ async def send_chat_message(
                         user_id=user_id,
                         actor="chat_api",
                         action="preference_detected",
-                        payload=json.dumps({
+                        payload=dao.dump_payload({
                             "preference_type": preference_type,
                             "value": value,
                             "polarity": polarity
@@ -341,7 +340,7 @@ async def send_chat_message(
             user_id=user_id,
             actor="user",
             action="message_sent",
-            payload=json.dumps({
+            payload=dao.dump_payload({
                 "content": req.content,
                 "preference_tags": preference_tags,
                 "session_id": session_id
@@ -380,7 +379,7 @@ async def send_chat_message(
                 user_id=user_id,
                 actor="chat_api",
                 action="memory_write",
-                payload=json.dumps({
+                payload=dao.dump_payload({
                     "key": write_intent['key'],
                     "value": write_intent['value'],
                     "session_id": session_id
@@ -503,7 +502,7 @@ async def send_chat_message(
             user_id=user_id,
             actor="chat_api",
             action="ai_response",
-            payload=json.dumps({
+            payload=dao.dump_payload({
                 "response": result.content[:500],
                 "agent_id": result.metadata.get('agent_id', 'orchestrator') if result.metadata else 'unknown',
                 "session_id": session_id
@@ -571,7 +570,7 @@ async def get_chat_health() -> ChatHealthResponse:
             user_id="system",
             actor="chat_api",
             action="health_check",
-            payload=json.dumps({
+            payload=dao.dump_payload({
                 "overall_status": overall_status,
                 "ollama_healthy": ollama_healthy,
                 "agent_count": health_response.agent_count,
@@ -588,7 +587,7 @@ async def get_chat_health() -> ChatHealthResponse:
             user_id="system",
             actor="chat_api_error",
             action="health_check_failed",
-            payload=json.dumps({"error": str(e)})
+            payload=dao.dump_payload({"error": str(e)})
         )
 
         return ChatHealthResponse(
@@ -843,7 +842,7 @@ def _process_memory_intents(content: str, user_id: str) -> Dict[str, Any]:
                     user_id=user_id,
                     actor="chat_api",
                     action="memory_write",
-                    payload=json.dumps({
+                    payload=dao.dump_payload({
                         "key": write_intent["key"],
                         "value": write_intent["value"],
                         "user_id": user_id,
@@ -861,7 +860,7 @@ def _process_memory_intents(content: str, user_id: str) -> Dict[str, Any]:
                 user_id=user_id,
                 actor="chat_api_error",
                 action="memory_write_failed",
-                payload=json.dumps({
+                payload=dao.dump_payload({
                     "key": write_intent.get("key"),
                     "error": str(e),
                     "user_id": user_id
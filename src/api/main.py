@@ -3,11 +3,20 @@ Stage 1 Implementation - SQLite Foundation Only
 DO NOT IMPLEMENT BEYOND STAGE 1 SCOPE
 """
 
-from fastapi import FastAPI, HTTPException, Depends, Body
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Depends, Body, Query
+from fastapi.responses import JSONResponse, Response
+# orjson is optional; when present every response is encoded with it
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    DefaultResponse = JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Dict, Any, Optional
 import logging
+import re
+import threading
+import time
 from datetime import datetime
 from pydantic import BaseModel, field_validator
 
@@ -60,7 +69,8 @@ from ..core.approval import (
     list_pending_requests
 )
 from ..core.db import health_check
-from ..core.config import VERSION, debug_enabled, SEARCH_API_ENABLED, CHAT_API_ENABLED, get_vector_store, get_embedding_provider, are_vector_features_enabled
+from ..core.clock import iso_timestamp
+from ..core.config import VERSION, debug_enabled, SEARCH_API_ENABLED, CHAT_API_ENABLED, SEMANTIC_ENABLED, get_vector_store, get_embedding_provider, are_vector_features_enabled
 
 # Temporary debug log for CHAT_API_ENABLED
 print(f"DEBUG: CHAT_API_ENABLED={CHAT_API_ENABLED}")
@@ -69,13 +79,21 @@ print(f"DEBUG: CHAT_API_ENABLED={CHAT_API_ENABLED}")
 
 from ..core.search_service import semantic_search
 
+# Debug mode is fixed for the process lifetime (like config.DEBUG), so the
+# debug-dependent branches on hot paths are chosen once here, not per request
+_DEBUG = debug_enabled()
+
+# Outside debug mode /kv/list redacts sensitive values inside SQLite
+_KV_LIST_REDACTED = not _DEBUG
+
 # Initialize the FastAPI application
 app = FastAPI(
     title="Memory Scaffold API",
     version=VERSION,
     description="Local-first multi-agent memory scaffold with SQLite backend",
-    docs_url="/docs" if debug_enabled() else None,
-    redoc_url="/redoc" if debug_enabled() else None
+    docs_url="/docs" if _DEBUG else None,
+    redoc_url="/redoc" if _DEBUG else None,
+    default_response_class=DefaultResponse
 )
 
 # Add CORS middleware to allow frontend connections
@@ -87,41 +105,78 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.get("/health", response_model=HealthResponse)
+def _iso_timestamp(value) -> str:
+    """Render a KV timestamp as ISO 8601, as the Pydantic response models did."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value).replace(" ", "T", 1)
+
+def _kv_item(record) -> Dict[str, Any]:
+    """KVGetResponse-shaped dict for a DAO record; DAO output is trusted, so no re-validation."""
+    return {
+        "key": record.key,
+        "value": record.value,
+        "casing": getattr(record, "casing", "preserve"),
+        "source": getattr(record, "source", "unknown"),
+        "updated_at": _iso_timestamp(record.updated_at),
+        "sensitive": bool(getattr(record, "sensitive", False)),
+    }
+
+# /health's KV count is reused for this long; probes from load balancers and
+# monitors then cost at most one COUNT(*) per interval however often they hit
+HEALTH_COUNT_TTL_SECONDS = 1.0
+_kv_count_cache = {"at": float("-inf"), "value": 0}
+_kv_count_lock = threading.Lock()
+
+def _cached_kv_count() -> int:
+    """KV count for /health, refreshed at most once per HEALTH_COUNT_TTL_SECONDS."""
+    with _kv_count_lock:
+        now = time.monotonic()
+        if now - _kv_count_cache["at"] >= HEALTH_COUNT_TTL_SECONDS:
+            _kv_count_cache["value"] = get_kv_count()
+            _kv_count_cache["at"] = now
+        return _kv_count_cache["value"]
+
+# Hot read endpoints below return plain dicts with response_model=None, skipping a
+# per-response Pydantic validation pass; request bodies are still validated. The
+# response schemas stay in the OpenAPI docs through `responses`.
+@app.get("/health", response_model=None, responses={200: {"model": HealthResponse}})
 def health_check_endpoint():
     """Check system health."""
     db_health = health_check()
-    kv_count = get_kv_count()
+    kv_count = _cached_kv_count()
     
-    return HealthResponse(
-        status="healthy" if db_health else "unhealthy",
-        version=VERSION,
-        db_health=db_health,
-        kv_count=kv_count
-    )
+    return {
+        "status": "healthy" if db_health else "unhealthy",
+        "version": VERSION,
+        "db_health": db_health,
+        "kv_count": kv_count
+    }
+
+@app.head("/health")
+def health_check_head_endpoint():
+    """Liveness probe: answers HEAD /health without counting keys or building a body."""
+    return Response(status_code=200 if health_check() else 503)
+
+# /kv/list page sizes: default and the most a client may ask for
+KV_LIST_PAGE_SIZE = 500
+KV_LIST_MAX_PAGE_SIZE = 5000
 
 # Define /kv/list endpoint BEFORE /kv/{key} to avoid path parameter conflict
-@app.get("/kv/list", response_model=KVListResponse)
-async def list_keys_endpoint(dao: DAO = Depends(DAO.dep)):
-    items = await dao.list_keys()
-    return KVListResponse(
-        items=[
-            KVGetResponse(
-                key=i.key,
-                value=i.value,
-                casing=getattr(i, "casing", "preserve"),
-                source=getattr(i, "source", "unknown"),
-                updated_at=i.updated_at,
-                sensitive=bool(getattr(i, "sensitive", False)),
-            )
-            for i in items
-        ]
-    )
+@app.get("/kv/list", response_model=None, responses={200: {"model": KVListResponse}})
+async def list_keys_endpoint(user_id: str = "default", after: Optional[str] = None,
+                             limit: int = Query(KV_LIST_PAGE_SIZE, ge=1, le=KV_LIST_MAX_PAGE_SIZE),
+                             dao: DAO = Depends(DAO.dep)):
+    """List a user's keys in key order, one page at a time; pass next_after back as `after`."""
+    items, next_after = await dao.list_keys_page(user_id, after=after, limit=limit, redacted=_KV_LIST_REDACTED)
+    return {"keys": [_kv_item(i) for i in items], "next_after": next_after}
+
+# Keys accepted by PUT /kv, compiled once at import
+KV_KEY_PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
 
 @app.put("/kv", response_model=KVSetRequest)
 async def put_kv(req: KVSetRequest, dao: DAO = Depends(DAO.dep)):
-    import re
-    if not re.match(r"^[A-Za-z][A-Za-z0-9_]*$", req.key):
+    if not KV_KEY_PATTERN.match(req.key):
         raise HTTPException(status_code=400, detail=f"Invalid key: {req.key}")
 
     await dao.set_key(
@@ -139,21 +194,14 @@ async def put_kv(req: KVSetRequest, dao: DAO = Depends(DAO.dep)):
         updated_at=rec.updated_at, sensitive=rec.sensitive
     )
 
-@app.get("/kv/{key}", response_model=KVGetResponse)
+@app.get("/kv/{key}", response_model=None, responses={200: {"model": KVGetResponse}})
 def get_key_endpoint(key: str, user_id: str = "default"):
     """Get a single key-value pair for a user."""
     kv_pair = get_key(user_id, key)
     if not kv_pair:
         raise HTTPException(status_code=404, detail="Key not found")
 
-    return KVGetResponse(
-        key=kv_pair.key,
-        value=kv_pair.value,
-        casing=kv_pair.casing,
-        source=kv_pair.source,
-        updated_at=kv_pair.updated_at,
-        sensitive=kv_pair.sensitive
-    )
+    return _kv_item(kv_pair)
 
 def _extract_user_id(request_data: Dict[str, Any] = None, headers: Dict[str, Any] = None) -> str:
     """Extract user_id from request data, headers, or default to 'default'.
@@ -171,7 +219,7 @@ def _extract_user_id(request_data: Dict[str, Any] = None, headers: Dict[str, Any
 
     return 'default'
 
-@app.post("/episodic", response_model=EpisodicResponse)
+@app.post("/episodic", response_model=None, responses={200: {"model": EpisodicResponse}})
 def add_episodic_event(request: EpisodicRequest, request_data: Dict[str, Any] = Body(...)):
     """Add a custom episodic event with user scoping."""
     # Extract user_id from request body or default
@@ -185,7 +233,7 @@ def add_episodic_event(request: EpisodicRequest, request_data: Dict[str, Any] =
     )
 
     # Note: We don't have the ID of inserted record, so we'll return a generic response
-    return EpisodicResponse(success=success, id=0)  # Placeholder
+    return {"success": success, "id": 0}  # Placeholder
 
 @app.get("/debug/memory-insights", response_model=List[Dict[str, Any]])
 def debug_memory_insights_endpoint(user_id: str = "default", limit: int = 20):
@@ -590,7 +638,6 @@ async def swarm_chat_endpoint(request: SwarmMessageRequest):
 def semantic_index_endpoint(request: SemanticIndexRequest):
     """Index documents into semantic memory with provenance tracking."""
     from ..vector.semantic_memory import SemanticMemoryService
-    from ..core.config import SEMANTIC_ENABLED
 
     if not SEMANTIC_ENABLED:
         raise HTTPException(status_code=404, detail="Semantic memory features disabled")
@@ -618,7 +665,6 @@ def semantic_index_endpoint(request: SemanticIndexRequest):
 def semantic_query_endpoint(request: SemanticQueryRequest):
     """Query semantic memory and return relevant results."""
     from ..vector.semantic_memory import SemanticMemoryService
-    from ..core.config import SEMANTIC_ENABLED
 
     if not SEMANTIC_ENABLED:
         raise HTTPException(status_code=404, detail="Semantic memory features disabled")
@@ -651,7 +697,6 @@ def semantic_query_endpoint(request: SemanticQueryRequest):
 def semantic_health_endpoint():
     """Get semantic memory system health status."""
     from ..vector.semantic_memory import SemanticMemoryService
-    from ..core.config import SEMANTIC_ENABLED
 
     if not SEMANTIC_ENABLED:
         return SemanticHealthResponse(
@@ -662,7 +707,7 @@ def semantic_health_endpoint():
             stale=False,
             embeddings_enabled=False,
             sensitive_exclusion=False,
-            last_checked=datetime.now().isoformat()
+            last_checked=iso_timestamp()
         )
 
     try:
@@ -681,7 +726,7 @@ def semantic_health_endpoint():
             embeddings_enabled=False,
             sensitive_exclusion=False,
             error=str(e),
-            last_checked=datetime.now().isoformat()
+            last_checked=iso_timestamp()
         )
 
 
@@ -692,7 +737,7 @@ async def global_exception_handler(request, exc):
     """Handle all unhandled exceptions."""
     logging.error(f"Unhandled exception: {exc}")
     content = {"detail": "Internal server error"}
-    if debug_enabled():
+    if _DEBUG:
         content["debug"] = str(exc)
     status_code = 500
     return JSONResponse(
@@ -8,6 +8,10 @@ from pydantic import BaseModel, field_validator, ConfigDict
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
+# Response-only models are never mutated after construction; freezing them
+# keeps handlers from editing a response in place.
+FROZEN_RESPONSE = ConfigDict(frozen=True)
+
 class KVSetRequest(BaseModel):
     key: str
     value: str
@@ -46,10 +50,14 @@ class KVSetRequest(BaseModel):
         return v
 
 class KVResponse(BaseModel):
+    model_config = FROZEN_RESPONSE
+
     success: bool
     key: str
 
 class KVGetResponse(BaseModel):
+    model_config = FROZEN_RESPONSE
+
     key: str
     value: str
     casing: str
@@ -58,7 +66,10 @@ class KVGetResponse(BaseModel):
     sensitive: bool
 
 class KVListResponse(BaseModel):
+    model_config = FROZEN_RESPONSE
+
     keys: List[KVGetResponse]
+    next_after: Optional[str] = None  # last key of a full page; None on the final page
 
 class EpisodicRequest(BaseModel):
     actor: str
@@ -80,6 +91,8 @@ class EpisodicRequest(BaseModel):
         return v
 
 class EpisodicResponse(BaseModel):
+    model_config = FROZEN_RESPONSE
+
     success: bool
     id: int
 
@@ -87,6 +100,8 @@ class EpisodicListResponse(BaseModel):
     events: List[dict]  # Will be filled with actual event data in response
 
 class HealthResponse(BaseModel):
+    model_config = FROZEN_RESPONSE
+
     status: str
     version: str
     db_health: bool
@@ -97,6 +112,8 @@ class DebugResponse(BaseModel):
     timestamp: datetime
 
 class SearchResult(BaseModel):
+    model_config = FROZEN_RESPONSE
+
     key: str
     value: str
     score: float
@@ -105,6 +122,8 @@ class SearchResult(BaseModel):
     updated_at: datetime
 
 class SearchResponse(BaseModel):
+    model_config = FROZEN_RESPONSE
+
     results: List[SearchResult]
 
 
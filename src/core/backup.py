@@ -15,6 +15,7 @@ import json
 import os
 import hashlib
 import secrets
+import sqlite3
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional, List
@@ -30,10 +31,12 @@ from .config import (
     BACKUP_ENCRYPTION_ENABLED,
     BACKUP_ENABLED,
     BACKUP_INCLUDE_SENSITIVE,
+    BACKUP_VACUUM_MAX_MB,
     DB_PATH,
     are_vector_features_enabled
 )
-from .dao import list_keys, list_events, get_kv_count
+from .dao import list_keys, list_events, get_kv_count, clear_kv_cache
+from .db import get_conn, close_cached_connections
 from .privacy import validate_sensitive_access, redact_sensitive_for_backup
 
 
@@ -138,27 +141,76 @@ def _generate_encryption_key() -> tuple[str, bytes]:
     return encrypted_key.hex(), raw_key, salt.hex()
 
 
+# Pages copied per step by the online backup API before yielding to other connections
+BACKUP_PAGE_STEP = 1024
+
+
 def _read_sqlite_db(db_path: str) -> bytes:
-    """Read SQLite database file as bytes."""
-    try:
-        with open(db_path, 'rb') as f:
-            return f.read()
-    except FileNotFoundError:
+    """
+    Read a consistent snapshot of the SQLite database as bytes.
+
+    VACUUM INTO writes a compacted copy (including pages still in the WAL) from
+    a single read transaction, instead of copying a live file that may be
+    mid-write. Databases above BACKUP_VACUUM_MAX_MB go through the online
+    backup API instead, which copies BACKUP_PAGE_STEP pages at a time rather
+    than rebuilding the whole file in one long statement.
+    """
+    if not Path(db_path).exists():
         raise BackupError(f"Database file not found: {db_path}")
-    except PermissionError:
-        raise BackupError(f"Permission denied reading database: {db_path}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        snapshot_path = os.path.join(tmp_dir, "snapshot.db")
+        try:
+            source = get_conn(db_path)
+            if os.path.getsize(db_path) > BACKUP_VACUUM_MAX_MB * 1024 * 1024:
+                target = sqlite3.connect(snapshot_path)
+                try:
+                    source.backup(target, pages=BACKUP_PAGE_STEP)
+                finally:
+                    target.close()
+            else:
+                source.execute("VACUUM INTO ?", (snapshot_path,))
+            with open(snapshot_path, 'rb') as f:
+                return f.read()
+        except PermissionError:
+            raise BackupError(f"Permission denied reading database: {db_path}")
+        except sqlite3.Error as e:
+            raise BackupError(f"Failed to snapshot database {db_path}: {e}")
 
 
 def _write_sqlite_db(db_path: str, data: bytes) -> None:
-    """Write SQLite database file from bytes."""
+    """
+    Restore the SQLite database at db_path from snapshot bytes.
+
+    The snapshot is copied into the live database with the online backup API
+    rather than by overwriting the file: the copy goes through SQLite's own
+    locking and WAL, so other open connections see the restored contents and
+    a leftover -wal file cannot replay old pages over them.
+    """
     # Ensure directory exists
     Path(db_path).parent.mkdir(parents=True, exist_ok=True)
 
-    try:
-        with open(db_path, 'wb') as f:
-            f.write(data)
-    except PermissionError:
-        raise RestoreError(f"Permission denied writing database: {db_path}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        snapshot_path = os.path.join(tmp_dir, "restore.db")
+        try:
+            with open(snapshot_path, 'wb') as f:
+                f.write(data)
+        except PermissionError:
+            raise RestoreError(f"Permission denied staging database restore in {tmp_dir}")
+
+        source = sqlite3.connect(snapshot_path)
+        try:
+            # One step, so concurrent writers never see a half-restored database
+            source.backup(get_conn(db_path))
+        except sqlite3.Error as e:
+            raise RestoreError(f"Failed to restore database {db_path}: {e}")
+        finally:
+            source.close()
+
+    # Pooled connections may hold prepared statements against the old schema,
+    # and cached reads describe the old contents
+    close_cached_connections()
+    clear_kv_cache()
 
 
 def _export_vector_data() -> Dict[str, Any]:
@@ -360,9 +412,15 @@ def create_backup(backup_path: str, include_sensitive: bool = False, encrypt: bo
             f.write(b'\n---DB_DATA---\n')
             f.write(final_db_data)
 
-        # Write manifest (always unencrypted for easy inspection)
-        with open(manifest_file, 'w') as f:
+        # Report what actually landed on disk (encryption and framing included)
+        manifest.total_size = backup_file.stat().st_size
+
+        # Write manifest (always unencrypted for easy inspection); rename into
+        # place so a watcher never sees a half-written manifest
+        tmp_manifest = manifest_file.with_suffix('.json.tmp')
+        with open(tmp_manifest, 'w') as f:
             json.dump(manifest.to_dict(), f, indent=2)
+        os.replace(tmp_manifest, manifest_file)
 
         # Log backup operation
         from util.logging import audit_event
@@ -0,0 +1,19 @@
+"""
+Per-second cached wall-clock timestamps for hot paths (health checks, agent audit info).
+"""
+
+import time
+
+# (second, text) of the last formatted timestamp; replaced as one tuple so
+# concurrent readers never pair a second with another second's text
+_ts_cache = (-1, "")
+
+def iso_timestamp() -> str:
+    """Local ISO 8601 timestamp to the second, formatted at most once per second."""
+    global _ts_cache
+    s = int(time.time())
+    cached_s, text = _ts_cache
+    if s != cached_s:
+        text = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(s))
+        _ts_cache = (s, text)
+    return text
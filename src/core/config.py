@@ -13,6 +13,13 @@ dotenv.load_dotenv()
 # Database path configuration
 DB_PATH = os.getenv("DB_PATH", "./data/memory.db")
 
+# Process-local read-through cache for dao.get_key (0 disables). DAO writes clear
+# it; the TTL bounds how long another process's writes can go unseen.
+KV_CACHE_SIZE = int(os.getenv("KV_CACHE_SIZE", "1024"))
+KV_CACHE_TTL_SEC = float(os.getenv("KV_CACHE_TTL_SEC", "1.0"))
+EPISODIC_WRITE_BATCHING = os.getenv("EPISODIC_WRITE_BATCHING", "false").lower() == "true"
+EPISODIC_FLUSH_INTERVAL_MS = int(os.getenv("EPISODIC_FLUSH_INTERVAL_MS", "50"))
+
 # Debug flag is now a function to be dynamic
 DEBUG = os.getenv("DEBUG", "true").lower() == "true"
 
@@ -52,6 +59,7 @@ BACKUP_ENABLED = os.getenv("BACKUP_ENABLED", "false").lower() == "true"
 BACKUP_ENCRYPTION_ENABLED = os.getenv("BACKUP_ENCRYPTION_ENABLED", "true").lower() == "true"  # Default true when backup enabled
 BACKUP_INCLUDE_SENSITIVE = os.getenv("BACKUP_INCLUDE_SENSITIVE", "false").lower() == "true"
 BACKUP_REDACTION_LEVEL = os.getenv("BACKUP_REDACTION_LEVEL", "standard")  # standard|strict|minimal
+BACKUP_VACUUM_MAX_MB = int(os.getenv("BACKUP_VACUUM_MAX_MB", "1024"))  # Larger databases use the paged online backup API
 MAINTENANCE_ENABLED = os.getenv("MAINTENANCE_ENABLED", "false").lower() == "true"
 MAINTENANCE_SCHEDULE_SEC = int(os.getenv("MAINTENANCE_SCHEDULE_SEC", "86400"))  # Daily maintenance (24 hours)
 
@@ -72,6 +80,10 @@ SEMANTIC_ENABLED = os.getenv("SEMANTIC_ENABLED", "true").lower() == "true"  # De
 EMBED_MODEL_NAME = os.getenv("EMBED_MODEL_NAME", "all-MiniLM-L6-v2")  # SentenceTransformer model
 EMBED_DIM = int(os.getenv("EMBED_DIM", "384"))  # Vector dimension
 FAISS_INDEX_PATH = os.getenv("FAISS_INDEX_PATH", "./data/semantic.index")  # Path to FAISS index
+FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat")  # flat|fp16|sq8 (int8 scalar quantized, 4x smaller)|hnsw (graph ANN, sublinear search)|ivfpq (FaissRetriever only: trained IVF tiers, PQ codes at scale)
+EMBED_WORKER_ENABLED = os.getenv("EMBED_WORKER_ENABLED", "false").lower() == "true"  # Encode FaissRetriever ingests in a dedicated process
+EMBED_WORKER_BATCH_WINDOW_MS = int(os.getenv("EMBED_WORKER_BATCH_WINDOW_MS", "5"))  # Ingests arriving within this window share one encode
+VECTOR_DTYPE = os.getenv("VECTOR_DTYPE", "fp32")  # fp32|fp16|int8 storage precision; non-fp32 overrides FAISS_INDEX_TYPE
 SENSITIVE_EXCLUDE = os.getenv("SENSITIVE_EXCLUDE", "true").lower() == "true"  # Exclude sensitive data
 INDEX_SCHEMA_VERSION = os.getenv("INDEX_SCHEMA_VERSION", "1.0")
 EMBEDDING_MODEL_VERSION = os.getenv("EMBEDDING_MODEL_VERSION", "sentence-transformers-1.0")
@@ -86,19 +98,21 @@ def get_vector_store():
 
     if VECTOR_PROVIDER == "memory":
         from src.vector.index import SimpleInMemoryVectorStore
-        return SimpleInMemoryVectorStore()
+        return SimpleInMemoryVectorStore(dtype=VECTOR_DTYPE)
     elif VECTOR_PROVIDER == "faiss":
         try:
             from src.vector.faiss_store import FaissVectorStore
-            return FaissVectorStore()
+            # FAISS quantizes internally; map the storage precision onto its index type
+            index_type = {"fp16": "fp16", "int8": "sq8"}.get(VECTOR_DTYPE, FAISS_INDEX_TYPE)
+            return FaissVectorStore(index_type=index_type)
         except ImportError:
             # Gracefully degrade to memory store if FAISS not available
             from src.vector.index import SimpleInMemoryVectorStore
-            return SimpleInMemoryVectorStore()
+            return SimpleInMemoryVectorStore(dtype=VECTOR_DTYPE)
     else:
         # Default to memory store for unknown providers
         from src.vector.index import SimpleInMemoryVectorStore
-        return SimpleInMemoryVectorStore()
+        return SimpleInMemoryVectorStore(dtype=VECTOR_DTYPE)
 
 
 def get_embedding_provider():
@@ -4,13 +4,13 @@ Heartbeat and drift correction - maintains vector overlay consistency with canon
 """
 
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import uuid
 from datetime import datetime
 
 from .drift_rules import CorrectionPlan
 from .config import get_correction_mode, get_vector_store, get_embedding_provider, are_vector_features_enabled
-from .dao import get_key, add_event
+from .dao import get_key, add_event, add_events_bulk
 from .approval import create_approval_request, wait_for_approval
 from .config import APPROVAL_ENABLED
 
@@ -53,9 +53,14 @@ def apply_corrections(plans: List[CorrectionPlan]) -> List[CorrectionResult]:
 
     print(f"🔧 Applying {len(plans)} correction plans (mode: {correction_mode})")
 
-    for plan in plans:
-        plan_results = _execute_correction_plan(plan, correction_mode, vector_store, embedding_provider)
-        results.extend(plan_results)
+    # Audit events for the whole run, written in one transaction at the end
+    events = []
+    try:
+        for plan in plans:
+            plan_results = _execute_correction_plan(plan, correction_mode, vector_store, embedding_provider, events)
+            results.extend(plan_results)
+    finally:
+        add_events_bulk("system", events)
 
     successful = sum(1 for r in results if r.success and r.action_taken)
     print(f"✓ Corrections complete: {successful}/{len(results)} successful")
@@ -82,7 +87,7 @@ def revert_correction(plan_id: str) -> Dict[str, Any]:
         "message": "Stage 3 revert limited to logging. Full revert requires manual intervention."
     }
 
-    add_event(user_id="system", actor="correction_system", action="revert_correction", payload=str(event_payload))
+    _record_event(None, "revert_correction", str(event_payload))
 
     print(f"📝 Revert requested for plan {plan_id} (logged, no action taken)")
 
@@ -94,21 +99,31 @@ def revert_correction(plan_id: str) -> Dict[str, Any]:
     }
 
 
-def _execute_correction_plan(plan: CorrectionPlan, mode: str, vector_store, embedding_provider) -> List[CorrectionResult]:
+def _record_event(events: Optional[List[Tuple[str, str, str]]], action: str, payload: str) -> None:
+    """Queue a correction_system audit event on `events`, or write it now when there is no queue."""
+    if events is None:
+        add_event(user_id="system", actor="correction_system", action=action, payload=payload)
+    else:
+        events.append(("correction_system", action, payload))
+
+
+def _execute_correction_plan(plan: CorrectionPlan, mode: str, vector_store, embedding_provider,
+                             events: Optional[List[Tuple[str, str, str]]] = None) -> List[CorrectionResult]:
     """Execute one correction plan's actions."""
     results = []
 
     # Log the correction attempt
-    _log_correction_plan(plan, mode)
+    _log_correction_plan(plan, mode, events)
 
     for i, action in enumerate(plan.actions):
-        result = _execute_correction_action(plan.id, i, action, mode, vector_store, embedding_provider)
+        result = _execute_correction_action(plan.id, i, action, mode, vector_store, embedding_provider, events)
         results.append(result)
 
     return results
 
 
-def _execute_correction_action(plan_id: str, action_index: int, action, mode: str, vector_store, embedding_provider) -> CorrectionResult:
+def _execute_correction_action(plan_id: str, action_index: int, action, mode: str, vector_store, embedding_provider,
+                               events: Optional[List[Tuple[str, str, str]]] = None) -> CorrectionResult:
     """Execute a single correction action."""
     result = CorrectionResult(
         plan_id=plan_id,
@@ -127,14 +142,14 @@ def _execute_correction_action(plan_id: str, action_index: int, action, mode: st
 
         elif mode == "propose":
             # Propose mode: Write episodic event, no database changes
-            _log_correction_proposal(plan_id, action)
+            _log_correction_proposal(plan_id, action, events)
             result.success = True
             result.action_taken = False
             result.details["message"] = "Correction proposed (logged only)"
 
         elif mode == "apply":
             # Apply mode: Execute the correction, but wait for approval if enabled
-            success, message = _apply_correction_with_approval(plan_id, action, vector_store, embedding_provider)
+            success, message = _apply_correction_with_approval(plan_id, action, vector_store, embedding_provider, events)
             result.success = success
             result.action_taken = success
             result.details["message"] = message
@@ -149,7 +164,7 @@ def _execute_correction_action(plan_id: str, action_index: int, action, mode: st
         result.details["message"] = f"Correction failed: {e}"
 
         # Log failed correction
-        _log_correction_failure(plan_id, action, e)
+        _log_correction_failure(plan_id, action, e, events)
 
     return result
 
@@ -169,7 +184,8 @@ def _apply_correction_action(action, vector_store, embedding_provider):
         raise ValueError(f"Unknown correction action type: {action.type}")
 
 
-def _apply_correction_with_approval(plan_id: str, action, vector_store, embedding_provider) -> tuple[bool, str]:
+def _apply_correction_with_approval(plan_id: str, action, vector_store, embedding_provider,
+                                    events: Optional[List[Tuple[str, str, str]]] = None) -> tuple[bool, str]:
     """Apply a correction action with approval workflow if enabled."""
     if APPROVAL_ENABLED:
         # Create approval request
@@ -191,8 +207,7 @@ def _apply_correction_with_approval(plan_id: str, action, vector_store, embeddin
             return False, "Approval system disabled unexpectedly"
 
         # Log approval request creation
-        add_event(user_id="system", actor="correction_system", action="approval_requested",
-                  payload=f"Correction approval requested: {approval_req.id}")
+        _record_event(events, "approval_requested", f"Correction approval requested: {approval_req.id}")
 
         # Wait for approval (in real implementation, this might be async)
         status = wait_for_approval(approval_req.id)
@@ -201,13 +216,13 @@ def _apply_correction_with_approval(plan_id: str, action, vector_store, embeddin
             return False, f"Correction not approved (status: {status})"
 
         # Log approval received
-        add_event(user_id="system", actor="correction_system", action="correction_approved",
-                  payload=f"Correction approved for {plan_id}: {action.type} on '{action.key}'")
+        _record_event(events, "correction_approved",
+                      f"Correction approved for {plan_id}: {action.type} on '{action.key}'")
 
     # Execute the correction
     try:
         _apply_correction_action(action, vector_store, embedding_provider)
-        _log_correction_application(plan_id, action)
+        _log_correction_application(plan_id, action, events)
         return True, f"Applied {action.type} for key '{action.key}'"
     except Exception as e:
         return False, f"Correction execution failed: {e}"
@@ -227,15 +242,16 @@ def _apply_add_vector(key: str, vector_store, embedding_provider):
     embedding = embedding_provider.embed_text(content_to_embed)
 
     # Create vector record
-    vector_record = type('VectorRecord', (), {
-        'id': key,
-        'vector': embedding,
-        'metadata': {
+    from ..vector.types import VectorRecord
+    vector_record = VectorRecord(
+        id=key,
+        vector=embedding,
+        metadata={
             'source': kv_entry.source,
             'casing': kv_entry.casing,
             'updated_at': kv_entry.updated_at.isoformat()
         }
-    })()
+    )
 
     # Add to vector store
     vector_store.add(vector_record)
@@ -272,7 +288,7 @@ def _apply_remove_vector(key: str, vector_store):
     vector_store.delete(key)
 
 
-def _log_correction_plan(plan: CorrectionPlan, mode: str):
+def _log_correction_plan(plan: CorrectionPlan, mode: str, events: Optional[List[Tuple[str, str, str]]] = None):
     """Log correction plan execution attempt."""
     event_payload = {
         "event_type": "correction_plan_execution",
@@ -286,10 +302,10 @@ def _log_correction_plan(plan: CorrectionPlan, mode: str):
         "timestamp": datetime.now().isoformat()
     }
 
-    add_event(user_id="system", actor="correction_system", action="correction_plan_started", payload=str(event_payload))
+    _record_event(events, "correction_plan_started", str(event_payload))
 
 
-def _log_correction_proposal(plan_id: str, action):
+def _log_correction_proposal(plan_id: str, action, events: Optional[List[Tuple[str, str, str]]] = None):
     """Log correction proposal."""
     event_payload = {
         "event_type": "correction_proposed",
@@ -300,10 +316,10 @@ def _log_correction_proposal(plan_id: str, action):
         "timestamp": datetime.now().isoformat()
     }
 
-    add_event(user_id="system", actor="correction_system", action="correction_proposed", payload=str(event_payload))
+    _record_event(events, "correction_proposed", str(event_payload))
 
 
-def _log_correction_application(plan_id: str, action):
+def _log_correction_application(plan_id: str, action, events: Optional[List[Tuple[str, str, str]]] = None):
     """Log successful correction application."""
     event_payload = {
         "event_type": "correction_applied",
@@ -314,10 +330,11 @@ def _log_correction_application(plan_id: str, action):
         "timestamp": datetime.now().isoformat()
     }
 
-    add_event(user_id="system", actor="correction_system", action="correction_applied", payload=str(event_payload))
+    _record_event(events, "correction_applied", str(event_payload))
 
 
-def _log_correction_failure(plan_id: str, action, error: Exception):
+def _log_correction_failure(plan_id: str, action, error: Exception,
+                            events: Optional[List[Tuple[str, str, str]]] = None):
     """Log correction failure."""
     event_payload = {
         "event_type": "correction_failed",
@@ -328,7 +345,7 @@ def _log_correction_failure(plan_id: str, action, error: Exception):
         "timestamp": datetime.now().isoformat()
     }
 
-    add_event(user_id="system", actor="correction_system", action="correction_failed", payload=str(event_payload))
+    _record_event(events, "correction_failed", str(event_payload))
 
 
 # Stage 4 stub function for audit testing
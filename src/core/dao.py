@@ -4,12 +4,20 @@ Stage 4 Extension: Schema validation and typed results
 DO NOT IMPLEMENT BEYOND STAGE 4 SCOPE
 """
 
+import atexit
+import copy
+import json
+import queue
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, asynccontextmanager
 from datetime import datetime
-from typing import Optional, List, Tuple, Union, Dict, Any
+from typing import Optional, List, Tuple, Union, Dict, Any, Iterator
 from pydantic import ValidationError
-from .db import get_db, init_db
-from .config import debug_enabled, get_vector_store, get_embedding_provider, are_vector_features_enabled, SCHEMA_VALIDATION_STRICT
+from .db import get_db, init_db, write_transaction, call_after_commit
+from .config import debug_enabled, get_vector_store, get_embedding_provider, are_vector_features_enabled, SCHEMA_VALIDATION_STRICT, KV_CACHE_SIZE, KV_CACHE_TTL_SEC, EPISODIC_WRITE_BATCHING, EPISODIC_FLUSH_INTERVAL_MS
 from .schema import KVRecord, VectorRecord, EpisodicEvent as SchemaEpisodicEvent
 from ..api.schemas import KVSetRequest, EpisodicRequest
 
@@ -36,6 +44,22 @@ except ImportError:
         return True
     PRIVACY_ENFORCEMENT_ENABLED = False
 
+# Episodic payloads are parsed on every event listing and serialized on every
+# logged event; use orjson when installed. Both parsers raise ValueError
+# subclasses on malformed input.
+try:
+    import orjson
+    from orjson import loads as _json_loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+def dump_payload(data: Any) -> str:
+    """Serialize an episodic payload to compact JSON text (no whitespace between tokens)."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, separators=(',', ':'))
+
 # Import config module to access KEY_NORMALIZATION_STRICT dynamically
 from . import config as config_module
 
@@ -107,6 +131,17 @@ def _normalize_key(key: str) -> str:
     # For unmapped keys, return as-is (no normalization applied)
     return key
 
+@contextmanager
+def _use_connection(conn: Optional[sqlite3.Connection] = None):
+    """Yield the caller's connection (caller owns the transaction) or a fresh one committed on exit."""
+    if conn is not None:
+        yield conn
+        return
+
+    with get_db() as own_conn:
+        yield own_conn
+        own_conn.commit()
+
 class KVPair:
     """Data class for key-value pairs."""
     def __init__(self, key: str, value: str, casing: str, source: str, 
@@ -127,35 +162,90 @@ class EpisodicEvent:
         self.action = action
         self.payload = payload
 
-def get_key(user_id: str, key: str) -> Optional[KVRecord]:
+# Read-through cache for get_key: {(user_id, key, normalization flag): (expires_at, KVRecord)}.
+# Only live, non-sensitive rows read on the DAO's own connection are cached, so
+# tombstones, privacy audits and uncommitted reads always go to SQLite. DAO
+# writes clear it; the TTL bounds staleness from writes by other processes.
+_kv_cache: "OrderedDict[Tuple[str, str, bool], Tuple[float, KVRecord]]" = OrderedDict()
+_kv_cache_lock = threading.Lock()
+# Bumped on every clear, so a read that raced a write does not repopulate the cache
+_kv_cache_generation = 0
+
+def clear_kv_cache() -> None:
+    """Drop every cached get_key result (called after each kv write)."""
+    global _kv_cache_generation
+    with _kv_cache_lock:
+        _kv_cache.clear()
+        _kv_cache_generation += 1
+
+def _after_write(conn: Optional[sqlite3.Connection], callback) -> None:
+    """
+    Run a write's follow-up now, or after COMMIT when the write ran in a caller's write_transaction.
+
+    Clearing the cache before the caller commits would let a concurrent get_key
+    re-cache the old row under the new generation.
+    """
+    if conn is None or not call_after_commit(conn, callback):
+        callback()
+
+def _kv_cache_get(cache_key: Tuple[str, str, bool]) -> Optional[KVRecord]:
+    """Return a copy of a fresh cached record, or None on a miss."""
+    with _kv_cache_lock:
+        entry = _kv_cache.get(cache_key)
+        if entry is None:
+            return None
+        expires_at, record = entry
+        if time.monotonic() >= expires_at:
+            del _kv_cache[cache_key]
+            return None
+        _kv_cache.move_to_end(cache_key)
+    # KVRecord is mutable; callers must not be able to edit the cached copy
+    return copy.copy(record)
+
+def _kv_cache_put(cache_key: Tuple[str, str, bool], record: KVRecord, generation: int) -> None:
+    """Cache a record read under `generation`, evicting the least recently used entry when full."""
+    with _kv_cache_lock:
+        if generation != _kv_cache_generation:
+            return
+        _kv_cache[cache_key] = (time.monotonic() + KV_CACHE_TTL_SEC, copy.copy(record))
+        _kv_cache.move_to_end(cache_key)
+        if len(_kv_cache) > KV_CACHE_SIZE:
+            _kv_cache.popitem(last=False)
+
+# Columns in KVRecord field order, so a fetched row constructs a record with KVRecord(*row)
+_GET_KEY_SQL = "SELECT key, value, source, casing, sensitive, updated_at FROM kv WHERE user_id = ? AND key = ?"
+
+def get_key(user_id: str, key: str, conn: Optional[sqlite3.Connection] = None) -> Optional[KVRecord]:
     """Get a key-value pair by user_id and key with typed result and case-insensitive lookup support."""
     try:
         if not user_id or not user_id.strip() or not key or not key.strip():
             return None
 
-        with get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT key, value, casing, source, updated_at, sensitive FROM kv WHERE user_id = ? AND key = ?",
-                (user_id.strip(), key.strip())
-            )
+        cache_key = None
+        if conn is None and KV_CACHE_SIZE > 0:
+            cache_key = (user_id.strip(), key.strip(), config_module.KEY_NORMALIZATION_STRICT)
+            cached = _kv_cache_get(cache_key)
+            if cached is not None:
+                return cached
+            generation = _kv_cache_generation
+
+        with _use_connection(conn) as db:
+            cursor = db.cursor()
+            cursor.execute(_GET_KEY_SQL, (user_id.strip(), key.strip()))
             row = cursor.fetchone()
 
             # Stage 6: If exact match fails and key normalization is enabled, try normalized lookup
             if not row and config_module.KEY_NORMALIZATION_STRICT:
                 normalized_key = _normalize_key(key)
                 if normalized_key != key:  # Only try lookup if normalization actually changed something
-                    cursor.execute(
-                        "SELECT key, value, casing, source, updated_at, sensitive FROM kv WHERE user_id = ? AND key = ?",
-                        (user_id.strip(), normalized_key)
-                    )
+                    cursor.execute(_GET_KEY_SQL, (user_id.strip(), normalized_key))
                     row = cursor.fetchone()
 
             if row:
-                key_val, value, casing, source, updated_at, sensitive = row
+                record = KVRecord(*row)
 
                 # Privacy check: Validate access to sensitive data
-                if sensitive and PRIVACY_ENFORCEMENT_ENABLED:
+                if record.sensitive and PRIVACY_ENFORCEMENT_ENABLED:
                     access_granted = validate_sensitive_access(
                         accessor="dao_get_key",
                         data_type="kv_sensitive_value",
@@ -166,21 +256,17 @@ def get_key(user_id: str, key: str) -> Optional[KVRecord]:
                         return None
                     logger.info(f"Privacy access granted for sensitive key {key}")
 
-                return KVRecord(
-                    key=key_val,
-                    value=value,
-                    source=source,
-                    casing=casing,
-                    sensitive=sensitive,
-                    updated_at=updated_at
-                )
+                if cache_key is not None and record.value and not record.sensitive:
+                    _kv_cache_put(cache_key, record, generation)
+                return record
             return None
     except Exception as e:
         logger.error(f"Failed to get key '{key}' for user '{user_id}': {e}")
         return None
 
-def set_key(user_id: str, key: str, value: str, source: str, casing: str, sensitive: bool = False) -> Union[bool, Exception]:
-    """Set a key-value pair with conditional schema validation."""
+def set_key(user_id: str, key: str, value: str, source: str, casing: str, sensitive: bool = False,
+            conn: Optional[sqlite3.Connection] = None) -> Union[bool, Exception]:
+    """Set a key-value pair with conditional schema validation. Pass `conn` to write inside a caller-owned transaction."""
     if SCHEMA_VALIDATION_STRICT:
         try:
             # Validate input using pydantic model when strict validation enabled
@@ -192,13 +278,38 @@ def set_key(user_id: str, key: str, value: str, source: str, casing: str, sensit
     # Stage 6: Normalize key for canonical storage when enabled
     normalized_key = _normalize_key(key) if config_module.KEY_NORMALIZATION_STRICT else key
 
+    # The prior row only matters for the vector update and the sensitive-access
+    # audit in get_key; without either (and with no whitespace for get_key to
+    # strip), one UPSERT replaces the lookup plus UPDATE/INSERT pair
+    needs_existing = (
+        PRIVACY_ENFORCEMENT_ENABLED
+        or (not sensitive and are_vector_features_enabled())
+        or user_id != user_id.strip()
+        or normalized_key != normalized_key.strip()
+    )
+    if not needs_existing:
+        try:
+            with _use_connection(conn) as db:
+                db.execute(
+                    "INSERT INTO kv (user_id, key, value, casing, source, sensitive) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(user_id, key) DO UPDATE SET value = excluded.value, casing = excluded.casing, "
+                    "source = excluded.source, updated_at = CURRENT_TIMESTAMP, sensitive = excluded.sensitive",
+                    (user_id, normalized_key, value, casing, source, sensitive)
+                )
+        except Exception as db_error:
+            logger.error(f"Database error during set_key operation for user '{user_id}': {db_error}")
+            return db_error
+        finally:
+            _after_write(conn, clear_kv_cache)
+        return True
+
     try:
-        with get_db() as conn:
-            cursor = conn.cursor()
+        with _use_connection(conn) as db:
+            cursor = db.cursor()
 
             # Check if the key already exists for this user (use normalized key for lookup)
             lookup_key = normalized_key if config_module.KEY_NORMALIZATION_STRICT else key
-            existing = get_key(user_id, lookup_key)
+            existing = get_key(user_id, lookup_key, conn=db)
             updated_at = datetime.now()
 
             if existing:
@@ -214,11 +325,11 @@ def set_key(user_id: str, key: str, value: str, source: str, casing: str, sensit
                     (user_id, normalized_key, value, casing, source, sensitive)
                 )
 
-            conn.commit()
-
     except Exception as db_error:
         logger.error(f"Database error during set_key operation for user '{user_id}': {db_error}")
         return db_error
+    finally:
+        _after_write(conn, clear_kv_cache)
 
     # For vector operations, continue trying even if database write failed
     # Vector operations (Stage 2) - conditionally embed non-sensitive keys
@@ -273,50 +384,231 @@ def set_key(user_id: str, key: str, value: str, source: str, casing: str, sensit
 
     return True
 
-def list_keys(user_id: str) -> List[KVRecord]:
-    """List all non-tombstone key-value pairs for a user with typed results."""
+def _page_clause(user_id: str, after: Optional[str], limit: Optional[int]) -> Tuple[str, tuple]:
+    """
+    SQL suffix and parameters for a keyset page of a user's kv rows.
+
+    Pages are ordered by key and start strictly after `after`, so each page is a
+    range scan of the (user_id, key) primary key rather than an OFFSET skip.
+    """
+    sql, params = "", (user_id.strip(),)
+    if after is not None:
+        sql += " AND key > ?"
+        params += (after,)
+    if limit is not None:
+        sql += " ORDER BY key LIMIT ?"
+        params += (limit,)
+    return sql, params
+
+def list_keys(user_id: str, conn: Optional[sqlite3.Connection] = None,
+              after: Optional[str] = None, limit: Optional[int] = None) -> List[KVRecord]:
+    """
+    List non-tombstone key-value pairs for a user with typed results.
+
+    With `limit`, returns one page in key order starting after the key `after`.
+    Sensitive rows denied by the privacy check are dropped, so a page may be
+    shorter than `limit` with more keys still to come; use list_keys_page to
+    page through every key.
+    """
+    return list_keys_page(user_id, after=after, limit=limit, conn=conn)[0]
+
+def list_keys_page(user_id: str, after: Optional[str] = None, limit: Optional[int] = None,
+                   redacted: bool = False,
+                   conn: Optional[sqlite3.Connection] = None) -> Tuple[List[KVRecord], Optional[str]]:
+    """
+    One page of list_keys (or of list_keys_redacted) plus the `after` cursor for the next page.
+
+    The cursor is the last key the page's query read, so rows dropped by the
+    privacy check never end pagination early. It is None on the last page.
+    """
+    if redacted:
+        records = list_keys_redacted(user_id, conn=conn, after=after, limit=limit)
+        next_after = records[-1].key if limit is not None and len(records) == limit else None
+        return records, next_after
+
+    try:
+        if not user_id or not user_id.strip():
+            return [], None
+
+        page_sql, params = _page_clause(user_id, after, limit)
+        with _use_connection(conn) as db:
+            # Exclude tombstone entries (where value is empty). Columns follow
+            # KVRecord's field order so each row unpacks straight into it.
+            rows = db.execute(
+                "SELECT key, value, source, casing, sensitive, updated_at FROM kv WHERE user_id = ? AND value != ''" + page_sql,
+                params
+            ).fetchall()
+        next_after = rows[-1][0] if limit is not None and len(rows) == limit else None
+        if not PRIVACY_ENFORCEMENT_ENABLED:
+            return [KVRecord(*row) for row in rows], next_after
+
+        records = []
+        for row in rows:
+            key_val, sensitive = row[0], row[4]
+
+            # Privacy check: Validate access to sensitive data in list operations
+            if sensitive:
+                access_granted = validate_sensitive_access(
+                    accessor="dao_list_keys",
+                    data_type="kv_sensitive_list",
+                    reason=f"List operation including sensitive key {key_val} (user: {user_id})"
+                )
+                if not access_granted:
+                    logger.warning(f"Privacy access denied for sensitive key {key_val}")
+                    continue  # Skip this sensitive record
+                logger.info(f"Privacy access granted for sensitive key {key_val} in list operation")
+
+            records.append(KVRecord(*row))
+        return records, next_after
+    except Exception as e:
+        logger.error(f"Failed to list keys for user '{user_id}': {e}")
+        return [], None
+
+# Placeholder returned instead of sensitive values in redacted listings
+REDACTED_VALUE = "***REDACTED***"
+
+def list_keys_redacted(user_id: str, conn: Optional[sqlite3.Connection] = None,
+                       after: Optional[str] = None, limit: Optional[int] = None) -> List[KVRecord]:
+    """
+    List non-tombstone key-value pairs for a user, with sensitive values redacted.
+
+    Tombstone filtering and redaction both happen in SQL, so sensitive values never
+    leave SQLite and no per-row privacy check is needed. Paging works as in list_keys.
+    """
     try:
         if not user_id or not user_id.strip():
             return []
 
-        with get_db() as conn:
-            cursor = conn.cursor()
-            # Exclude tombstone entries (where value is empty)
-            cursor.execute(
-                "SELECT key, value, casing, source, updated_at, sensitive FROM kv WHERE user_id = ? AND value != ''",
-                (user_id.strip(),)
+        page_sql, params = _page_clause(user_id, after, limit)
+        with _use_connection(conn) as db:
+            cursor = db.execute(
+                "SELECT key, CASE WHEN sensitive THEN ? ELSE value END, source, casing, sensitive, updated_at "
+                "FROM kv WHERE user_id = ? AND value != ''" + page_sql,
+                (REDACTED_VALUE, *params)
             )
-            rows = cursor.fetchall()
+            return [KVRecord(*row) for row in cursor]
+    except Exception as e:
+        logger.error(f"Failed to list redacted keys for user '{user_id}': {e}")
+        return []
 
-            records = []
-            for row in rows:
-                key_val, value, casing, source, updated_at, sensitive = row
+def list_keys_updated_since(user_id: str, since: str, conn: Optional[sqlite3.Connection] = None) -> List[KVRecord]:
+    """
+    List keys written or tombstoned at or after `since` (a CURRENT_TIMESTAMP string).
 
-                # Privacy check: Validate access to sensitive data in list operations
-                if sensitive and PRIVACY_ENFORCEMENT_ENABLED:
-                    access_granted = validate_sensitive_access(
-                        accessor="dao_list_keys",
-                        data_type="kv_sensitive_list",
-                        reason=f"List operation including sensitive key {key_val} (user: {user_id})"
-                    )
-                    if not access_granted:
-                        logger.warning(f"Privacy access denied for sensitive key {key_val}")
-                        continue  # Skip this sensitive record
-                    logger.info(f"Privacy access granted for sensitive key {key_val} in list operation")
-
-                records.append(KVRecord(
-                    key=key_val,
-                    value=value,
-                    source=source,
-                    casing=casing,
-                    sensitive=sensitive,
-                    updated_at=updated_at
-                ))
-            return records
+    Tombstones are included with an empty value. Sensitive values are never
+    returned (value is blanked), since callers only need to know the key changed.
+    """
+    try:
+        if not user_id or not user_id.strip():
+            return []
+
+        with _use_connection(conn) as db:
+            cursor = db.cursor()
+            cursor.execute(
+                "SELECT key, CASE WHEN sensitive THEN '' ELSE value END, source, casing, sensitive, updated_at "
+                "FROM kv WHERE user_id = ? AND updated_at >= ?",
+                (user_id.strip(), since)
+            )
+            return [KVRecord(*row) for row in cursor]
     except Exception as e:
-        logger.error(f"Failed to list keys for user '{user_id}': {e}")
+        logger.error(f"Failed to list keys updated since {since} for user '{user_id}': {e}")
         return []
 
+def get_vector_meta(name: str) -> Optional[str]:
+    """Read a vector index bookkeeping value (e.g. the last rebuild watermark)."""
+    try:
+        with get_db() as conn:
+            row = conn.execute("SELECT value FROM vector_meta WHERE name = ?", (name,)).fetchone()
+            return row[0] if row else None
+    except Exception as e:
+        logger.error(f"Failed to read vector meta '{name}': {e}")
+        return None
+
+def set_vector_meta(name: str, value: str) -> bool:
+    """Write a vector index bookkeeping value."""
+    try:
+        with get_db() as conn:
+            conn.execute(
+                "INSERT INTO vector_meta (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+                (name, value)
+            )
+            conn.commit()
+        return True
+    except Exception as e:
+        logger.error(f"Failed to write vector meta '{name}': {e}")
+        return False
+
+def _glob_escape(text: str) -> str:
+    """Escape GLOB metacharacters so text matches literally."""
+    return "".join(f"[{c}]" if c in "*?[" else c for c in text)
+
+def iter_keys(user_id: str, prefix: Optional[str] = None, batch_size: int = 1000) -> Iterator[str]:
+    """
+    Yield non-tombstone key names for a user without materializing the full list.
+
+    Rows are pulled with fetchmany(batch_size). An optional prefix is matched
+    case-sensitively inside SQLite so it can use the (user_id, key) index.
+    """
+    if not user_id or not user_id.strip():
+        return
+
+    query = "SELECT key FROM kv WHERE user_id = ? AND value != ''"
+    params = [user_id.strip()]
+    if prefix:
+        query += " AND key GLOB ?"
+        params.append(_glob_escape(prefix) + "*")
+
+    try:
+        with get_db() as conn:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for (key_val,) in rows:
+                    yield key_val
+    except Exception as e:
+        logger.error(f"Failed to iterate keys for user '{user_id}': {e}")
+
+def iter_kv_records(user_id: str, include_sensitive: bool = False, batch_size: int = 1000) -> Iterator[KVRecord]:
+    """
+    Yield non-tombstone KV records for a user without materializing the full list.
+
+    Sensitive rows are filtered out inside SQLite unless include_sensitive is
+    set, in which case they go through the same privacy check as list_keys.
+    """
+    if not user_id or not user_id.strip():
+        return
+
+    # Unary + keeps idx_kv_user_live (sized for counts) from displacing the
+    # sensitive-row filtering index below
+    query = "SELECT key, value, source, casing, sensitive, updated_at FROM kv WHERE user_id = ? AND +value != ''"
+    if not include_sensitive:
+        # Must match idx_kv_user_nonsensitive's predicate verbatim for the planner to use it
+        query += " AND NOT sensitive"
+
+    try:
+        with get_db() as conn:
+            cursor = conn.execute(query, (user_id.strip(),))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    if row[4] and PRIVACY_ENFORCEMENT_ENABLED:
+                        access_granted = validate_sensitive_access(
+                            accessor="dao_iter_kv_records",
+                            data_type="kv_sensitive_list",
+                            reason=f"Iterate sensitive key {row[0]} (user: {user_id})"
+                        )
+                        if not access_granted:
+                            logger.warning(f"Privacy access denied for sensitive key {row[0]}")
+                            continue
+                    yield KVRecord(*row)
+    except Exception as e:
+        logger.error(f"Failed to iterate KV records for user '{user_id}': {e}")
+
 # Backward compatibility function for existing code
 def list_all_keys() -> List[KVRecord]:
     """DEPRECATED: List all non-tombstone key-value pairs for all users (for migration compatibility)."""
@@ -325,75 +617,181 @@ def list_all_keys() -> List[KVRecord]:
             cursor = conn.cursor()
             # Exclude tombstone entries (where value is empty)
             cursor.execute(
-                "SELECT key, value, casing, source, updated_at, sensitive FROM kv WHERE value != ''"
+                "SELECT key, value, source, casing, sensitive, updated_at FROM kv WHERE value != ''"
             )
-            rows = cursor.fetchall()
-
-            records = []
-            for row in rows:
-                key_val, value, casing, source, updated_at, sensitive = row
-                records.append(KVRecord(
-                    key=key_val,
-                    value=value,
-                    source=source,
-                    casing=casing,
-                    sensitive=sensitive,
-                    updated_at=updated_at
-                ))
-            return records
+            return [KVRecord(*row) for row in cursor]
     except Exception as e:
         logger.error(f"Failed to list all keys: {e}")
         return []
 
-def delete_key(user_id: str, key: str) -> bool:
+def _remove_key_vectors(user_id: str, keys: List[str]) -> None:
+    """Remove tombstoned keys from the vector index; never breaks SQLite operations."""
+    if not keys or not are_vector_features_enabled():
+        return
+
+    try:
+        vector_store = get_vector_store()
+        if not vector_store:
+            return
+
+        for key in keys:
+            # Use user-scoped key for vector operations
+            vector_key = f"{user_id}:{key}"
+            try:
+                vector_store.delete(vector_key)
+                # Log vector operation
+                logger.log_vector_operation("deleted", vector_key, {
+                    "provider": vector_store.__class__.__name__,
+                    "reason": "tombstone"
+                })
+            except NotImplementedError:
+                # FAISS doesn't support direct deletion - log but continue
+                logger.log_vector_operation("delete_skipped", vector_key, {
+                    "provider": vector_store.__class__.__name__,
+                    "reason": "not_implemented"
+                })
+            except Exception as e:
+                # Log other vector deletion errors but don't fail
+                logger.log_vector_operation("delete_failed", vector_key, {
+                    "provider": vector_store.__class__.__name__,
+                    "error": str(e)[:100]
+                })
+
+    except Exception as e:
+        # Vector operations should never break SQLite functionality
+        logger.warning(f"Vector deletion failed for {len(keys)} key(s) user '{user_id}': {e}")
+
+def delete_key(user_id: str, key: str, conn: Optional[sqlite3.Connection] = None) -> bool:
     """Delete a key by setting its value to empty string (tombstone) for a specific user."""
     try:
-        with get_db() as conn:
-            cursor = conn.cursor()
+        with _use_connection(conn) as db:
+            cursor = db.cursor()
             # Set value to empty string instead of deleting (tombstone approach)
             cursor.execute(
-                "UPDATE kv SET value = '' WHERE user_id = ? AND key = ?",
+                "UPDATE kv SET value = '', updated_at = CURRENT_TIMESTAMP WHERE user_id = ? AND key = ?",
                 (user_id, key)
             )
-            conn.commit()
     except Exception as e:
         logger.error(f"Database error during delete_key operation for user '{user_id}': {e}")
         return False
+    finally:
+        _after_write(conn, clear_kv_cache)
 
-    # Vector operations (Stage 2) - remove from vector index on tombstone
-    if are_vector_features_enabled():
-        try:
-            vector_store = get_vector_store()
-            if vector_store:
-                # Try to delete from vector store
-                # Use user-scoped key for vector operations
-                vector_key = f"{user_id}:{key}"
-                try:
-                    vector_store.delete(vector_key)
-                    # Log vector operation
-                    logger.log_vector_operation("deleted", vector_key, {
-                        "provider": vector_store.__class__.__name__,
-                        "reason": "tombstone"
-                    })
-                except NotImplementedError:
-                    # FAISS doesn't support direct deletion - log but continue
-                    logger.log_vector_operation("delete_skipped", vector_key, {
-                        "provider": vector_store.__class__.__name__,
-                        "reason": "not_implemented"
-                    })
-                except Exception as e:
-                    # Log other vector deletion errors but don't fail
-                    logger.log_vector_operation("delete_failed", vector_key, {
-                        "provider": vector_store.__class__.__name__,
-                        "error": str(e)[:100]
-                    })
-
-        except Exception as e:
-            # Vector operations should never break SQLite functionality
-            logger.warning(f"Vector deletion failed for key '{key}' user '{user_id}': {e}")
+    # Vector operations (Stage 2) - remove from vector index on tombstone, once it commits
+    _after_write(conn, lambda: _remove_key_vectors(user_id, [key]))
 
     return True
 
+# Stay well below SQLite's SQLITE_MAX_VARIABLE_NUMBER (999 on older builds)
+DELETE_BATCH_SIZE = 500
+FALLBACK_DELETE_BATCH_SIZE = 128
+
+# UPDATE ... RETURNING needs SQLite 3.35+; older libraries take the executemany path
+_SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+def _tombstone_each(cursor: sqlite3.Cursor, user_id: str, keys: List[str]) -> None:
+    """Tombstone already-selected live keys with one executemany per fallback chunk."""
+    for start in range(0, len(keys), FALLBACK_DELETE_BATCH_SIZE):
+        chunk = keys[start:start + FALLBACK_DELETE_BATCH_SIZE]
+        cursor.executemany(
+            "UPDATE kv SET value = '', updated_at = CURRENT_TIMESTAMP WHERE user_id = ? AND key = ?",
+            ((user_id, key) for key in chunk)
+        )
+
+def delete_keys(user_id: str, keys: List[str], conn: Optional[sqlite3.Connection] = None) -> int:
+    """
+    Tombstone many keys for a user with one batched UPDATE per chunk and a single commit.
+
+    Returns the number of keys actually tombstoned; missing or already tombstoned
+    keys are not counted. Pass `conn` to run inside a caller-owned transaction.
+    """
+    unique_keys = list(dict.fromkeys(keys))
+    if not user_id or not user_id.strip() or not unique_keys:
+        return 0
+
+    removed_keys = []
+    try:
+        with _use_connection(conn) as db:
+            cursor = db.cursor()
+            for start in range(0, len(unique_keys), DELETE_BATCH_SIZE):
+                chunk = unique_keys[start:start + DELETE_BATCH_SIZE]
+                placeholders = ", ".join("?" * len(chunk))
+                if _SQLITE_HAS_RETURNING:
+                    cursor.execute(
+                        f"UPDATE kv SET value = '', updated_at = CURRENT_TIMESTAMP WHERE user_id = ? AND value != '' AND key IN ({placeholders}) RETURNING key",
+                        (user_id, *chunk)
+                    )
+                    removed_keys.extend(row[0] for row in cursor.fetchall())
+                else:
+                    cursor.execute(
+                        f"SELECT key FROM kv WHERE user_id = ? AND value != '' AND key IN ({placeholders})",
+                        (user_id, *chunk)
+                    )
+                    live_keys = [row[0] for row in cursor.fetchall()]
+                    _tombstone_each(cursor, user_id, live_keys)
+                    removed_keys.extend(live_keys)
+    except Exception as e:
+        logger.error(f"Database error during delete_keys operation for user '{user_id}': {e}")
+        return 0
+    finally:
+        _after_write(conn, clear_kv_cache)
+
+    # A rolled-back caller transaction keeps both the rows and their vectors
+    _after_write(conn, lambda: _remove_key_vectors(user_id, removed_keys))
+
+    return len(removed_keys)
+
+def delete_keys_like(user_id: str, pattern: Union[str, List[str]], conn: Optional[sqlite3.Connection] = None) -> int:
+    """
+    Tombstone every live key for a user matching a GLOB pattern (e.g. "lose_mode_key_*").
+
+    Several patterns may be given as a list; they are OR-ed into one statement
+    so every pattern is classified in a single pass. GLOB is case-sensitive, so
+    SQLite turns each literal prefix into a range scan on the (user_id, key)
+    primary key instead of reading every row into Python.
+    Returns the number of keys tombstoned. Pass `conn` to run inside a
+    caller-owned transaction.
+    """
+    patterns = [pattern] if isinstance(pattern, str) else list(pattern)
+    patterns = [p for p in patterns if p]
+    if not user_id or not user_id.strip() or not patterns:
+        return 0
+
+    glob_clause = " OR ".join("key GLOB ?" for _ in patterns)
+    try:
+        with _use_connection(conn) as db:
+            cursor = db.cursor()
+            if _SQLITE_HAS_RETURNING:
+                cursor.execute(
+                    f"UPDATE kv SET value = '', updated_at = CURRENT_TIMESTAMP WHERE user_id = ? AND value != '' AND ({glob_clause}) RETURNING key",
+                    (user_id, *patterns)
+                )
+                removed_keys = [row[0] for row in cursor.fetchall()]
+            else:
+                cursor.execute(
+                    f"SELECT key FROM kv WHERE user_id = ? AND value != '' AND ({glob_clause})",
+                    (user_id, *patterns)
+                )
+                removed_keys = [row[0] for row in cursor.fetchall()]
+                _tombstone_each(cursor, user_id, removed_keys)
+    except Exception as e:
+        logger.error(f"Database error during delete_keys_like operation for user '{user_id}': {e}")
+        return 0
+    finally:
+        _after_write(conn, clear_kv_cache)
+
+    # A rolled-back caller transaction keeps both the rows and their vectors
+    _after_write(conn, lambda: _remove_key_vectors(user_id, removed_keys))
+
+    return len(removed_keys)
+
+SENSITIVE_EVENT_INDICATORS = ('password', 'token', 'auth', 'credentials', 'secret', 'private', 'confidential')
+
+def _has_sensitive_indicator(content: Optional[str]) -> bool:
+    """Whether event text mentions any of SENSITIVE_EVENT_INDICATORS."""
+    lowered = (content or "").lower()
+    return any(indicator in lowered for indicator in SENSITIVE_EVENT_INDICATORS)
+
 def add_event(user_id: str, actor: str, action: str, payload: str, session_id: str = None,
               event_type: str = None, message: str = None, summary: str = None, sensitive: bool = False) -> Union[bool, Exception]:
     """Add an episodic event with Stage 5 temporal memory support."""
@@ -409,10 +807,7 @@ def add_event(user_id: str, actor: str, action: str, payload: str, session_id: s
     is_sensitive = sensitive
     if not is_sensitive and PRIVACY_ENFORCEMENT_ENABLED:
         # Check message content for sensitive indicators
-        sensitive_content = message or payload or ""
-        sensitive_indicators = ['password', 'token', 'auth', 'credentials', 'secret', 'private', 'confidential']
-
-        if any(indicator.lower() in sensitive_content.lower() for indicator in sensitive_indicators):
+        if _has_sensitive_indicator(message or payload):
             is_sensitive = True
             # Log privacy detection
             logger.info(f"Stage 5: Automatically flagged sensitive episodic content for user {user_id}")
@@ -423,46 +818,134 @@ def add_event(user_id: str, actor: str, action: str, payload: str, session_id: s
         logger.warning(f"Invalid event_type '{event_type}', using default")
         event_type = None
 
+    row = (user_id, session_id, actor, action, payload, event_type, message, summary, is_sensitive)
+    if EPISODIC_WRITE_BATCHING:
+        # Written by the background writer; ids and ts are assigned at flush time
+        _enqueue_event(row)
+        return True
+
     try:
         with get_db() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO episodic (user_id, session_id, actor, action, payload, event_type, message, summary, sensitive)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (user_id, session_id, actor, action, payload, event_type, message, summary, is_sensitive))
+            cursor.execute(_INSERT_EVENT_SQL, row)
             conn.commit()
             return True
     except Exception as e:
         logger.error(f"Database error during add_event operation for user '{user_id}': {e}")
         return e
 
+# Most events one background flush writes in a single transaction
+EVENT_BATCH_MAX = 500
+
+_INSERT_EVENT_SQL = """
+    INSERT INTO episodic (user_id, session_id, actor, action, payload, event_type, message, summary, sensitive)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Pending add_event rows when EPISODIC_WRITE_BATCHING is on, drained by one writer thread
+_event_queue: "queue.Queue[tuple]" = queue.Queue()
+_event_writer: Optional[threading.Thread] = None
+_event_writer_lock = threading.Lock()
+
+def _enqueue_event(row: tuple) -> None:
+    """Queue an episodic row, starting the background writer on first use."""
+    global _event_writer
+    if _event_writer is None:
+        with _event_writer_lock:
+            if _event_writer is None:
+                _event_writer = threading.Thread(target=_event_writer_loop, name="episodic-writer", daemon=True)
+                _event_writer.start()
+                atexit.register(flush_events)
+    _event_queue.put(row)
+
+def _event_writer_loop() -> None:
+    """Collect queued events for up to EPISODIC_FLUSH_INTERVAL_MS (or EVENT_BATCH_MAX) and insert them in one transaction."""
+    interval = EPISODIC_FLUSH_INTERVAL_MS / 1000
+    while True:
+        batch = [_event_queue.get()]
+        deadline = time.monotonic() + interval
+        while len(batch) < EVENT_BATCH_MAX:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_event_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            with get_db() as conn:
+                conn.executemany(_INSERT_EVENT_SQL, batch)
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Database error while writing {len(batch)} queued episodic events: {e}")
+        finally:
+            for _ in batch:
+                _event_queue.task_done()
+
+def flush_events() -> None:
+    """Block until every event queued by add_event has been written (no-op when nothing is pending)."""
+    if _event_queue.unfinished_tasks:
+        _event_queue.join()
+
+def add_events_bulk(user_id: str, events: List[Tuple[str, str, str]],
+                    conn: Optional[sqlite3.Connection] = None) -> int:
+    """
+    Add many (actor, action, payload) episodic events with one executemany and a single commit.
+
+    Applies the same privacy flagging as add_event. Returns the number of events
+    written, or 0 on error. Pass `conn` to run inside a caller-owned transaction.
+    """
+    if not user_id or not events:
+        return 0
+
+    flag_sensitive = PRIVACY_ENFORCEMENT_ENABLED
+    rows = [
+        (user_id, actor, action, payload, flag_sensitive and _has_sensitive_indicator(payload))
+        for actor, action, payload in events
+    ]
+
+    try:
+        with _use_connection(conn) as db:
+            db.executemany(
+                "INSERT INTO episodic (user_id, actor, action, payload, sensitive) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+    except Exception as e:
+        logger.error(f"Database error during add_events_bulk operation for user '{user_id}': {e}")
+        return 0
+
 def list_events(user_id: str, limit: int = 100) -> List[SchemaEpisodicEvent]:
     """List recent events for a user with typed results."""
+    flush_events()
     try:
         if limit <= 0 or not user_id or not user_id.strip():
             return []
 
         with get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
+            cursor = conn.execute('''
                 SELECT id, ts, actor, action, payload
                 FROM episodic
                 WHERE user_id = ?
                 ORDER BY ts DESC
                 LIMIT ?
             ''', (user_id.strip(), limit))
-            rows = cursor.fetchall()
 
             events = []
-            for row in rows:
-                event_id, ts, actor, action, payload = row
+            for event_id, ts, actor, action, payload in cursor:
+
+                # Parse the payload once; both the privacy check and the result use it
+                try:
+                    parsed_payload = _json_loads(payload) if payload else {}
+                    payload_is_json = True
+                except ValueError:
+                    parsed_payload = {"raw_data": payload}
+                    payload_is_json = False
 
                 # Privacy check: Validate access to potentially sensitive event payload data
                 skip_event = False
                 if PRIVACY_ENFORCEMENT_ENABLED:
-                    try:
-                        import json
-                        parsed_payload = json.loads(payload) if payload else {}
+                    if payload_is_json:
                         # Check if payload contains sensitive indicators
                         payload_text = str(parsed_payload).lower()
                         sensitive_indicators = ['value', 'data', 'secret', 'password', 'token', 'auth', 'credentials']
@@ -479,9 +962,9 @@ def list_events(user_id: str, limit: int = 100) -> List[SchemaEpisodicEvent]:
                             else:
                                 logger.info(f"Privacy access granted for event {event_id}")
 
-                    except (json.JSONDecodeError, ValueError):
+                    else:
                         # If payload parsing fails, check raw payload
-                        if any(word in payload.lower() for word in ['sensitive', 'value', 'secret', 'password']) if payload else False:
+                        if any(word in payload.lower() for word in ['sensitive', 'value', 'secret', 'password']):
                             access_granted = validate_sensitive_access(
                                 accessor="dao_list_events",
                                 data_type="episodic_raw_sensitive",
@@ -496,20 +979,7 @@ def list_events(user_id: str, limit: int = 100) -> List[SchemaEpisodicEvent]:
                 if skip_event:
                     continue
 
-                # Parse payload as dict for final result
-                try:
-                    import json
-                    parsed_payload = json.loads(payload) if payload else {}
-                except (json.JSONDecodeError, ValueError):
-                    parsed_payload = {"raw_data": payload}
-
-                events.append(SchemaEpisodicEvent(
-                    id=event_id,
-                    ts=ts,
-                    actor=actor,
-                    action=action,
-                    payload=parsed_payload
-                ))
+                events.append(SchemaEpisodicEvent(event_id, ts, actor, action, parsed_payload))
             return events
     except Exception as e:
         logger.error(f"Failed to list events for user '{user_id}': {e}")
@@ -518,6 +988,7 @@ def list_events(user_id: str, limit: int = 100) -> List[SchemaEpisodicEvent]:
 def list_episodic_events_stage5(user_id: str, session_id: str = None, event_type: str = None,
                                since: str = None, limit: int = 50) -> List[Dict[str, Any]]:
     """Stage 5: Advanced episodic event listing with temporal memory filters."""
+    flush_events()
     try:
         if not user_id or not user_id.strip():
             return []
@@ -614,10 +1085,9 @@ def list_episodic_events_stage5(user_id: str, session_id: str = None, event_type
                     event["content"] = msg
                 elif payload:
                     try:
-                        import json
-                        parsed = json.loads(payload)
+                        parsed = _json_loads(payload)
                         event["content"] = parsed.get("content", payload)
-                    except (json.JSONDecodeError, ValueError):
+                    except ValueError:
                         event["content"] = payload
                 else:
                     event["content"] = ""
@@ -633,6 +1103,7 @@ def list_episodic_events_stage5(user_id: str, session_id: str = None, event_type
 def summarize_episodic_events(user_id: str, session_id: str = None, since: str = None,
                             limit: int = 100, use_ai: bool = False) -> str:
     """Stage 5: Generate AI-powered summaries of episodic event sequences."""
+    flush_events()
     try:
         if not user_id or not user_id.strip():
             return "No user specified for summarization"
@@ -720,16 +1191,24 @@ def summarize_episodic_events(user_id: str, session_id: str = None, since: str =
         logger.error(f"Failed to summarize episodic events for user '{user_id}': {e}")
         return "Error generating summary"
 
-def get_kv_count(user_id: str = None) -> int:
+def get_kv_count(user_id: str = None, conn: Optional[sqlite3.Connection] = None) -> int:
     """Get count of non-tombstone KV entries for a user or all users."""
     try:
-        with get_db() as conn:
-            cursor = conn.cursor()
+        with _use_connection(conn) as db:
+            cursor = db.cursor()
             if user_id and user_id.strip():
-                # Count for specific user
+                # Count for specific user, answered from idx_kv_user_live alone
                 cursor.execute("SELECT COUNT(*) FROM kv WHERE user_id = ? AND value != ''", (user_id.strip(),))
             else:
-                # Count for all users (for admin/stats)
+                # Count for all users (for admin/stats): one row kept current by triggers
+                try:
+                    cursor.execute("SELECT live_count FROM kv_stats WHERE id = 1")
+                    result = cursor.fetchone()
+                except sqlite3.OperationalError:
+                    result = None
+                if result is not None:
+                    return result[0]
+                # No counter yet (e.g. a restored pre-kv_stats database); scan instead
                 cursor.execute("SELECT COUNT(*) FROM kv WHERE value != ''")
             result = cursor.fetchone()
             return result[0] if result else 0
@@ -764,9 +1243,8 @@ def get_memory_insights(user_id: str, limit: int = 20) -> List[Dict[str, Any]]:
         event_dicts = []
         for event in events:
             try:
-                import json
-                payload_parsed = json.loads(event.payload) if isinstance(event.payload, str) and event.payload else event.payload
-            except (json.JSONDecodeError, ValueError):
+                payload_parsed = _json_loads(event.payload) if isinstance(event.payload, str) and event.payload else event.payload
+            except ValueError:
                 payload_parsed = {"raw_data": str(event.payload)}
 
             event_dicts.append({
@@ -954,11 +1432,25 @@ def _summarize_agent_actions(key: str, value: str, events: List[Dict[str, Any]])
 class DAO:
     """FastAPI dependency injection class for database operations."""
 
+    def __init__(self):
+        # Connection shared by write calls while inside transaction()
+        self._conn: Optional[sqlite3.Connection] = None
+
     @classmethod
     async def dep(cls) -> "DAO":
         """FastAPI dependency function that returns a DAO instance."""
         return cls()
 
+    @asynccontextmanager
+    async def transaction(self):
+        """Share one BEGIN IMMEDIATE transaction (single commit) across the deletes in the block."""
+        with write_transaction() as conn:
+            self._conn = conn
+            try:
+                yield self
+            finally:
+                self._conn = None
+
     async def set_key(self, key: str, value: str, source: str = "api",
                      casing: str = "preserve", sensitive: bool = False, user_id: str = "default") -> bool:
         """Async wrapper for set_key."""
@@ -969,10 +1461,30 @@ class DAO:
         """Async wrapper for get_key."""
         return get_key(user_id, key)
 
-    async def list_keys(self, user_id: str = "default") -> List[KVRecord]:
+    async def list_keys(self, user_id: str = "default", after: Optional[str] = None,
+                        limit: Optional[int] = None) -> List[KVRecord]:
         """Async wrapper for list_keys."""
-        return list_keys(user_id)
+        return list_keys(user_id, after=after, limit=limit)
+
+    async def list_keys_page(self, user_id: str = "default", after: Optional[str] = None,
+                             limit: Optional[int] = None,
+                             redacted: bool = False) -> Tuple[List[KVRecord], Optional[str]]:
+        """Async wrapper for list_keys_page."""
+        return list_keys_page(user_id, after=after, limit=limit, redacted=redacted)
+
+    async def list_keys_redacted(self, user_id: str = "default", after: Optional[str] = None,
+                                 limit: Optional[int] = None) -> List[KVRecord]:
+        """Async wrapper for list_keys_redacted."""
+        return list_keys_redacted(user_id, after=after, limit=limit)
 
     async def delete_key(self, key: str, user_id: str = "default") -> bool:
         """Async wrapper for delete_key."""
-        return delete_key(user_id, key)
+        return delete_key(user_id, key, conn=self._conn)
+
+    async def delete_keys(self, keys: List[str], user_id: str = "default") -> int:
+        """Async wrapper for delete_keys."""
+        return delete_keys(user_id, keys, conn=self._conn)
+
+    async def delete_keys_like(self, pattern: Union[str, List[str]], user_id: str = "default") -> int:
+        """Async wrapper for delete_keys_like."""
+        return delete_keys_like(user_id, pattern, conn=self._conn)
@@ -4,25 +4,228 @@ DO NOT IMPLEMENT BEYOND STAGE 1 SCOPE
 """
 
 import sqlite3
+import threading
 from contextlib import contextmanager
-from typing import Generator
+from typing import Callable, Dict, Generator, List, Optional, Tuple
 from .config import DB_PATH, ensure_db_directory
 
 # Ensure database directory exists
 ensure_db_directory()
 
+# Per-connection tuning; journal_mode=WAL and page_size are persistent and set once by init_db
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA wal_autocheckpoint=1000",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Page size for new database files; SQLite ignores it once tables exist in WAL mode
+DB_PAGE_SIZE = 8192
+
+# Prepared statements kept per connection. sqlite3 keys its cache on the exact SQL
+# text, so hot DAO queries are module-level literals with parameters bound via ?;
+# SQL that varies per call (e.g. IN (?, ?, ...) lists) takes its own slots.
+STATEMENT_CACHE_SIZE = 256
+
+def _apply_pragmas(conn: sqlite3.Connection) -> None:
+    """Apply the standard performance PRAGMAs to a new connection."""
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+def _connect(path: str) -> sqlite3.Connection:
+    """Open a long-lived, PRAGMA-configured connection for get_db() or get_conn()."""
+    # Each connection is still used by one thread at a time; check_same_thread is
+    # off only so close_cached_connections() can close other threads' connections
+    conn = sqlite3.connect(path, cached_statements=STATEMENT_CACHE_SIZE, check_same_thread=False)
+    _apply_pragmas(conn)
+    return conn
+
+# Guards the connection registries below, which close_cached_connections() empties
+# from whichever thread calls it
+_registry_lock = threading.Lock()
+
+# Idle pooled connections for get_db(): {thread_id: {db_path: [conn, ...]}}.
+# Nested get_db() blocks check out separate connections, so one block's commit or
+# rollback never touches another's transaction.
+_idle_pools: Dict[int, Dict[str, List[sqlite3.Connection]]] = {}
+
+# Idle connections kept per thread and database; extras are closed on return
+POOL_MAX_IDLE_PER_DB = 2
+
+# Bumped by close_cached_connections(); connections checked out before then
+# (e.g. across a restore) are closed instead of returned to the pool
+_pool_generation = 0
+
 @contextmanager
 def get_db() -> Generator[sqlite3.Connection, None, None]:
-    """Get a SQLite database connection."""
-    conn = sqlite3.connect(DB_PATH)
+    """
+    Get a SQLite database connection from this thread's pool.
+
+    Connections are opened and PRAGMA-configured once and reused across calls,
+    so short operations skip the open and WAL setup. Anything left uncommitted
+    when the block exits is rolled back, as closing the connection used to do.
+    """
+    path = DB_PATH
+    thread_id = threading.get_ident()
+    with _registry_lock:
+        idle = _idle_pools.get(thread_id, {}).get(path)
+        conn = idle.pop() if idle else None
+        generation = _pool_generation
+    if conn is None:
+        conn = _connect(path)
+
     try:
         yield conn
     finally:
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            reusable = True
+        except sqlite3.ProgrammingError:
+            # Closed by the caller
+            reusable = False
+        if reusable:
+            with _registry_lock:
+                idle = _idle_pools.setdefault(thread_id, {}).setdefault(path, [])
+                reusable = generation == _pool_generation and len(idle) < POOL_MAX_IDLE_PER_DB
+                if reusable:
+                    idle.append(conn)
+        if not reusable:
+            conn.close()
+
+# Long-lived connections for get_conn(): {(thread_id, db_path): conn}
+_cached_connections: Dict[Tuple[int, str], sqlite3.Connection] = {}
+
+def get_conn(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Return this thread's cached connection to db_path (default DB_PATH).
+
+    For CLI and maintenance code that runs several operations in one process:
+    the connection is opened and PRAGMA-configured once, then reused, so later
+    operations skip the cold open. Callers must not close it; use
+    close_cached_connections() before replacing the database file.
+    """
+    key = (threading.get_ident(), db_path or DB_PATH)
+    with _registry_lock:
+        conn = _cached_connections.get(key)
+    if conn is None:
+        conn = _connect(key[1])
+        with _registry_lock:
+            _cached_connections[key] = conn
+    return conn
+
+def close_cached_connections() -> None:
+    """
+    Close every connection get_conn() cached or get_db() pooled, in every thread.
+
+    Pooled connections checked out at the time are closed when their block exits.
+    """
+    global _pool_generation
+    with _registry_lock:
+        _pool_generation += 1
+        retired = list(_cached_connections.values())
+        _cached_connections.clear()
+        for idle_by_path in _idle_pools.values():
+            for idle in idle_by_path.values():
+                retired.extend(idle)
+        _idle_pools.clear()
+
+    for conn in retired:
         conn.close()
 
+# Callbacks waiting for an open write_transaction to commit, keyed by id() of its connection
+_after_commit_callbacks: Dict[int, List[Callable[[], None]]] = {}
+
+def call_after_commit(conn: sqlite3.Connection, callback: Callable[[], None]) -> bool:
+    """
+    Run callback once the write_transaction open on conn commits; it is dropped on rollback.
+
+    Returns False without registering anything if conn is not inside a write_transaction.
+    """
+    callbacks = _after_commit_callbacks.get(id(conn))
+    if callbacks is None:
+        return False
+    callbacks.append(callback)
+    return True
+
+@contextmanager
+def write_transaction() -> Generator[sqlite3.Connection, None, None]:
+    """
+    Run a batch of writes on one connection inside BEGIN IMMEDIATE / COMMIT.
+
+    WAL with synchronous=NORMAL makes the whole batch cost a single WAL flush
+    instead of one fsync per statement. Rolls back if the block raises.
+    Callbacks registered with call_after_commit run after the COMMIT.
+    """
+    with get_db() as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        callbacks = _after_commit_callbacks[id(conn)] = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except Exception:
+                conn.rollback()
+                raise
+            conn.commit()
+        finally:
+            del _after_commit_callbacks[id(conn)]
+        for callback in callbacks:
+            callback()
+
+def _ensure_kv_stats(cursor: sqlite3.Cursor, recount: bool = False) -> None:
+    """
+    Create the trigger-maintained live KV counter (kv_stats) if it is missing.
+
+    The triggers keep kv_stats.live_count equal to COUNT(*) of non-tombstoned
+    rows, so the global count is a single-row read. The counter is seeded
+    from a full count only when first created, or when `recount` is set
+    (after kv has been rebuilt under its triggers).
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS kv_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            live_count INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS kv_stats_insert AFTER INSERT ON kv
+        WHEN NEW.value <> ''
+        BEGIN
+            UPDATE kv_stats SET live_count = live_count + 1 WHERE id = 1;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS kv_stats_delete AFTER DELETE ON kv
+        WHEN OLD.value <> ''
+        BEGIN
+            UPDATE kv_stats SET live_count = live_count - 1 WHERE id = 1;
+        END
+    ''')
+    # COALESCE treats NULL values like tombstones, matching COUNT(*) ... WHERE value != ''
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS kv_stats_update AFTER UPDATE OF value ON kv
+        WHEN COALESCE(NEW.value <> '', 0) <> COALESCE(OLD.value <> '', 0)
+        BEGIN
+            UPDATE kv_stats
+            SET live_count = live_count + COALESCE(NEW.value <> '', 0) - COALESCE(OLD.value <> '', 0)
+            WHERE id = 1;
+        END
+    ''')
+    seed = "INSERT OR REPLACE" if recount else "INSERT OR IGNORE"
+    cursor.execute(f"{seed} INTO kv_stats (id, live_count) VALUES (1, (SELECT COUNT(*) FROM kv WHERE value != ''))")
+
 def init_db():
     """Initialize the database with required tables."""
     with get_db() as conn:
+        # Only takes effect on a fresh file, so it must precede WAL and table creation
+        conn.execute(f"PRAGMA page_size={DB_PAGE_SIZE}")
+        # WAL is stored in the database file, so every later connection inherits it
+        conn.execute("PRAGMA journal_mode=WAL")
+
         cursor = conn.cursor()
 
         # Create kv table with user scoping
@@ -56,8 +259,22 @@ def init_db():
             )
         ''')
 
+        # Vector index bookkeeping (e.g. last rebuild watermark for incremental rebuilds)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS vector_meta (
+                name TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+
         # Create indexes for performance
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_episodic_user_id_ts ON episodic(user_id, ts DESC)')
+        # Partial index so non-sensitive scans (e.g. index rebuild) never touch sensitive rows
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_kv_user_nonsensitive ON kv(user_id) WHERE NOT sensitive')
+        # Covering partial index so per-user live counts skip tombstones without reading rows
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_kv_user_live ON kv(user_id) WHERE value != ''")
+
+        _ensure_kv_stats(cursor)
 
         conn.commit()
 
@@ -73,6 +290,10 @@ def migrate_to_user_scoping():
         if 'user_id' not in kv_columns:
             print("🚀 Migrating database to per-user scoping...")
 
+            # One explicit transaction for both tables: the table rebuilds cost a
+            # single commit, and a failure rolls back the DDL too (no stray kv_new)
+            cursor.execute("BEGIN IMMEDIATE")
+
             # Migrate kv table - assume existing data belongs to 'default' user
             try:
                 # Create new kv table with user_id
@@ -99,6 +320,10 @@ def migrate_to_user_scoping():
                 # Swap tables
                 cursor.execute('DROP TABLE kv')
                 cursor.execute('ALTER TABLE kv_new RENAME TO kv')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_kv_user_nonsensitive ON kv(user_id) WHERE NOT sensitive')
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_kv_user_live ON kv(user_id) WHERE value != ''")
+                # Dropping the old table dropped its counter triggers too
+                _ensure_kv_stats(cursor, recount=True)
 
                 print("✅ Migrated kv table")
 
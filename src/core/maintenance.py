@@ -6,16 +6,17 @@ Automated maintenance routines for database integrity, vector validation, and cl
 """
 
 import os
-import sqlite3
 import time
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 import logging
 
 from .config import DB_PATH, are_vector_features_enabled, MAINTENANCE_ENABLED
-from .dao import get_kv_count, list_keys
+from .dao import get_kv_count, list_all_keys
+from .db import get_conn
 from .privacy import validate_sensitive_access
 
 
@@ -131,13 +132,14 @@ def check_database_integrity() -> MaintenanceReport:
             report.completed_at = datetime.now()
             return report
 
-        # Connect and run integrity check
-        conn = sqlite3.connect(DB_PATH)
+        # Run integrity check on the process's cached connection
+        conn = get_conn(DB_PATH)
         cursor = conn.cursor()
 
         try:
-            # SQLite integrity check
-            cursor.execute("PRAGMA integrity_check")
+            # quick_check skips the index cross-checks that make integrity_check
+            # read every page twice; it still verifies page and record structure
+            cursor.execute("PRAGMA quick_check")
             integrity_result = cursor.fetchone()
 
             if integrity_result and integrity_result[0] == "ok":
@@ -199,7 +201,7 @@ def check_database_integrity() -> MaintenanceReport:
                     report.errors.append("KV table column mismatch")
 
         finally:
-            conn.close()
+            cursor.close()
 
     except Exception as e:
         report.errors.append(f"Database integrity check failed: {e}")
@@ -208,10 +210,14 @@ def check_database_integrity() -> MaintenanceReport:
     return report
 
 
-def validate_vector_index() -> MaintenanceReport:
+def validate_vector_index(vector_store=None, embedding_provider=None) -> MaintenanceReport:
     """
     Validate vector index consistency and data integrity.
 
+    Args:
+        vector_store: Store to validate; defaults to a fresh get_vector_store()
+        embedding_provider: Provider for test queries; defaults to get_embedding_provider()
+
     Returns:
         MaintenanceReport: Vector validation results
     """
@@ -233,8 +239,10 @@ def validate_vector_index() -> MaintenanceReport:
         # Import vector functionality
         from .config import get_vector_store, get_embedding_provider
 
-        vector_store = get_vector_store()
-        embedding_provider = get_embedding_provider()
+        if vector_store is None:
+            vector_store = get_vector_store()
+        if embedding_provider is None:
+            embedding_provider = get_embedding_provider()
 
         if not vector_store or not embedding_provider:
             report.errors.append("Vector store or embedding provider not available")
@@ -244,13 +252,21 @@ def validate_vector_index() -> MaintenanceReport:
         # Basic vector store integrity checks
         report.metadata["provider"] = vector_store.__class__.__name__
 
+        # Record IDs actually present in the index, when the export exposes them
+        indexed_ids = None
+
         # Check if we can export data (test basic functionality)
         try:
             export_data = vector_store.export_data()
             report.metadata["can_export"] = True
 
             # Validate export data structure
-            if "vectors" in export_data and "index" in export_data:
+            if "id_to_vector_index" in export_data:
+                # FAISS stores keep an ID -> row mapping beside the index
+                indexed_ids = set(export_data["id_to_vector_index"])
+                report.metadata["exported_vectors"] = len(indexed_ids)
+            elif "vectors" in export_data and "index" in export_data:
+                indexed_ids = set(export_data.get("vectors", {}))
                 vector_count = len(export_data.get("vectors", {}))
                 index_count = len(export_data.get("index", {}))
                 report.metadata["exported_vectors"] = vector_count
@@ -269,13 +285,26 @@ def validate_vector_index() -> MaintenanceReport:
             report.errors.append(f"Vector export failed: {e}")
             report.metadata["can_export"] = False
 
-        # Cross-validate with KV store
-        kv_keys = {record.key for record in list_keys()}
+        # Cross-validate with KV store (every user's keys); only live non-sensitive
+        # keys are embedded, so those are the ones the index must hold
+        kv_keys = {record.key for record in list_all_keys() if not record.sensitive}
         vector_validation_keys = []  # Keys to validate if possible
 
         # Sample some keys for deeper validation
         sample_keys = list(kv_keys)[:10]  # Check first 10 keys
 
+        if indexed_ids is not None:
+            report.metadata["expected_vectors"] = len(kv_keys)
+            if len(indexed_ids) != len(kv_keys):
+                report.issues_found += 1
+                report.errors.append(
+                    f"Vector count mismatch: {len(indexed_ids)} indexed vs {len(kv_keys)} live KV entries"
+                )
+            missing_keys = [key for key in sample_keys if key not in indexed_ids]
+            if missing_keys:
+                report.issues_found += 1
+                report.errors.append(f"Sampled keys missing from vector index: {', '.join(missing_keys)}")
+
         for key in sample_keys:
             try:
                 # Check if key exists in vector store (if supported)
@@ -331,15 +360,17 @@ def cleanup_orphaned_data() -> MaintenanceReport:
     )
 
     try:
-        # Get current KV keys (non-sensitive for vector cleanup)
-        kv_records = list_keys()
-        current_kv_keys = {record.key for record in kv_records}
-
         cleanup_actions = []
 
         # Clean up vector orphans if vector features enabled
         if are_vector_features_enabled():
             try:
+                # Live keys for every user in one set-based query; vectors are keyed
+                # either by bare key or by user-scoped "user_id:key", so both count
+                live_rows = get_conn(DB_PATH).execute("SELECT user_id, key FROM kv WHERE value != ''").fetchall()
+                current_kv_keys = {key for _, key in live_rows}
+                current_kv_keys.update(f"{user_id}:{key}" for user_id, key in live_rows)
+
                 from .config import get_vector_store
                 vector_store = get_vector_store()
 
@@ -351,23 +382,23 @@ def cleanup_orphaned_data() -> MaintenanceReport:
                     orphaned_vectors = vector_keys - current_kv_keys
 
                     if orphaned_vectors:
-                        # Try to delete orphaned vectors
-                        deleted_count = 0
-                        for key in orphaned_vectors:
-                            try:
-                                # Validate privacy before deletion
-                                validate_sensitive_access("maintenance_system", "vector_cleanup", f"Remove orphaned vector for key: {key}")
+                        # Validate privacy once for the whole orphan set rather than per key
+                        validate_sensitive_access(
+                            "maintenance_system", "vector_cleanup",
+                            f"Remove {len(orphaned_vectors)} orphaned vectors"
+                        )
 
-                                if hasattr(vector_store, 'delete'):
+                        deleted_count = 0
+                        if hasattr(vector_store, 'delete'):
+                            for key in orphaned_vectors:
+                                try:
                                     vector_store.delete(key)
                                     deleted_count += 1
                                     cleanup_actions.append(f"Removed orphaned vector for key: {key}")
-                                else:
-                                    report.recommendations.append("Vector store doesn't support deletion - orphaned vectors not removed")
-                                    break
-
-                            except Exception as e:
-                                report.errors.append(f"Failed to remove orphaned vector for key '{key}': {e}")
+                                except Exception as e:
+                                    report.errors.append(f"Failed to remove orphaned vector for key '{key}': {e}")
+                        else:
+                            report.recommendations.append("Vector store doesn't support deletion - orphaned vectors not removed")
 
                         if deleted_count > 0:
                             report.issues_resolved += deleted_count
@@ -380,34 +411,21 @@ def cleanup_orphaned_data() -> MaintenanceReport:
 
         # Clean up old tombstone records (older than 30 days)
         try:
-            import sqlite3
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-
-            # Find old tombstones
-            thirty_days_ago = (datetime.now() - timedelta(days=30)).isoformat()
-            cursor.execute(
-                "SELECT COUNT(*) FROM kv WHERE value = '' AND updated_at < ?",
-                (thirty_days_ago,)
-            )
-            old_tombstone_count = cursor.fetchone()[0]
-
-            if old_tombstone_count > 0:
-                # Actually delete old tombstones (privacy-safe operation)
-                cursor.execute(
-                    "DELETE FROM kv WHERE value = '' AND updated_at < ?",
-                    (thirty_days_ago,)
+            # Delete old tombstones in one set-based statement (privacy-safe operation);
+            # the cutoff is computed by SQLite so it shares updated_at's UTC text format.
+            # The connection is shared, so commit or roll back right here.
+            conn = get_conn(DB_PATH)
+            with conn:
+                cursor = conn.execute(
+                    "DELETE FROM kv WHERE value = '' AND updated_at < datetime('now', '-30 days')"
                 )
 
-                deleted_rows = cursor.rowcount
-                conn.commit()
+            deleted_rows = cursor.rowcount
 
-                if deleted_rows > 0:
-                    report.issues_resolved += deleted_rows
-                    report.actions_taken.append(f"Removed {deleted_rows} old tombstone records")
-                    report.metadata["tombstones_cleaned"] = deleted_rows
-
-            conn.close()
+            if deleted_rows > 0:
+                report.issues_resolved += deleted_rows
+                report.actions_taken.append(f"Removed {deleted_rows} old tombstone records")
+                report.metadata["tombstones_cleaned"] = deleted_rows
 
         except Exception as e:
             report.errors.append(f"Tombstone cleanup failed: {e}")
@@ -490,7 +508,6 @@ def rebuild_vector_index(force: bool = False, backup_first: bool = True) -> Main
 
         # Proceed with rebuild
         from .config import get_vector_store, get_embedding_provider
-        from .dao import list_keys
 
         vector_store = get_vector_store()
         embedding_provider = get_embedding_provider()
@@ -505,7 +522,7 @@ def rebuild_vector_index(force: bool = False, backup_first: bool = True) -> Main
         report.actions_taken.append("Cleared existing vector index")
 
         # Rebuild from current KV data (only non-sensitive records)
-        kv_records = list_keys()
+        kv_records = list_all_keys()
         rebuild_count = 0
 
         for record in kv_records:
@@ -568,6 +585,55 @@ def rebuild_vector_index(force: bool = False, backup_first: bool = True) -> Main
     return report
 
 
+def optimize_database() -> MaintenanceReport:
+    """
+    Refresh query planner statistics with PRAGMA optimize.
+
+    SQLite only re-runs ANALYZE on tables whose statistics are missing or
+    stale (0x10000 extends the check to every table, not just ones queried
+    on this connection), so this is cheap to run routinely.
+
+    Returns:
+        MaintenanceReport: Optimization results
+    """
+    if not MAINTENANCE_ENABLED:
+        raise MaintenanceError("Maintenance system is disabled. Enable with MAINTENANCE_ENABLED=true")
+
+    report = MaintenanceReport(
+        operation="database_optimize",
+        started_at=datetime.now()
+    )
+
+    try:
+        if not Path(DB_PATH).exists():
+            report.errors.append(f"Database file not found: {DB_PATH}")
+            report.completed_at = datetime.now()
+            return report
+
+        get_conn(DB_PATH).execute("PRAGMA optimize=0x10002")
+        report.actions_taken.append("Ran PRAGMA optimize")
+
+    except Exception as e:
+        report.errors.append(f"Database optimize failed: {e}")
+
+    report.completed_at = datetime.now()
+    return report
+
+
+def _run_maintenance_operation(operation) -> MaintenanceReport:
+    """Run one maintenance operation, turning an exception into an error report."""
+    try:
+        return operation()
+    except Exception as e:
+        # Create error report for failed operation
+        return MaintenanceReport(
+            operation=f"{operation.__name__}_failed",
+            started_at=datetime.now(),
+            completed_at=datetime.now(),
+            errors=[str(e)]
+        )
+
+
 def perform_full_maintenance() -> List[MaintenanceReport]:
     """
     Perform comprehensive maintenance operations.
@@ -578,28 +644,17 @@ def perform_full_maintenance() -> List[MaintenanceReport]:
     if not MAINTENANCE_ENABLED:
         raise MaintenanceError("Maintenance system is disabled. Enable with MAINTENANCE_ENABLED=true")
 
-    reports = []
+    # Read-only checks overlap: the integrity scan is disk-bound while vector
+    # validation is CPU-bound, and each opens its own connection (safe under WAL).
+    # map() keeps the reports in submission order.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        reports = list(executor.map(_run_maintenance_operation, [
+            check_database_integrity,
+            validate_vector_index,
+        ]))
 
-    # Run all maintenance operations
-    operations = [
-        check_database_integrity,
-        validate_vector_index,
-        cleanup_orphaned_data,
-    ]
-
-    for operation in operations:
-        try:
-            report = operation()
-            reports.append(report)
-        except Exception as e:
-            # Create error report for failed operation
-            error_report = MaintenanceReport(
-                operation=f"{operation.__name__}_failed",
-                started_at=datetime.now(),
-                completed_at=datetime.now(),
-                errors=[str(e)]
-            )
-            reports.append(error_report)
+    # Destructive phases stay serialized after the checks
+    reports.append(_run_maintenance_operation(cleanup_orphaned_data))
 
     # Decide if vector rebuild is needed
     db_report = next((r for r in reports if r.operation == "database_integrity_check"), None)
@@ -623,6 +678,9 @@ def perform_full_maintenance() -> List[MaintenanceReport]:
             )
             reports.append(rebuild_error_report)
 
+    # Optimize last, so ANALYZE sees the post-cleanup table statistics
+    reports.append(_run_maintenance_operation(optimize_database))
+
     return reports
 
 
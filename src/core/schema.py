@@ -8,7 +8,7 @@ from datetime import datetime
 from typing import Dict, List
 
 
-@dataclass
+@dataclass(slots=True)
 class KVRecord:
     key: str
     value: str
@@ -26,7 +26,7 @@ class VectorRecord:
     updated_at: datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class EpisodicEvent:
     id: int
     ts: datetime
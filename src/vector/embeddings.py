@@ -11,6 +11,10 @@ from sentence_transformers import SentenceTransformer
 
 class IEmbeddingProvider(ABC):
     """Abstract interface for embedding providers."""
+
+    # True for network-bound providers (e.g. HTTP/Ollama); bulk callers may then
+    # keep several embed_texts requests in flight at once
+    is_remote = False
     
     @abstractmethod
     def embed_text(self, text: str) -> list[float]:
@@ -22,6 +26,10 @@ class IEmbeddingProvider(ABC):
         """Get the dimension of the embedding vectors."""  
         pass
 
+    def embed_texts(self, texts: list[str]) -> np.ndarray:
+        """Generate embeddings for many texts; providers with a batched model path override this."""
+        return np.array([self.embed_text(text) for text in texts], dtype=np.float32)
+
 class DeterministicHashEmbedding(IEmbeddingProvider):
     """Deterministic hash-based embedding provider for testing purposes.
     
@@ -84,6 +92,10 @@ class SentenceTransformerEmbedding(IEmbeddingProvider):
         embedding = self.model.encode(text, convert_to_tensor=False)
         return embedding.tolist()
 
+    def embed_texts(self, texts: list[str], batch_size: int = 32) -> np.ndarray:
+        """Generate embeddings for many texts in a single batched encode call."""
+        return self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+
     def get_dimension(self) -> int:
         """Get the dimension of the embedding vectors."""
         if self._dimension is None:
@@ -121,17 +133,19 @@ class EmbeddingsService:
         """
         Embed multiple texts into vectors.
 
+        Texts are encoded as one batch, so per-call model overhead (tokenizer
+        dispatch, attention mask setup) is paid once. Prefer one call with many
+        texts over many calls with one text each.
+
         Args:
             texts: List of text strings to embed
 
         Returns:
             Numpy array of shape (len(texts), embedding_dim)
         """
-        embeddings = []
-        for text in texts:
-            embedding = self.provider.embed_text(text)
-            embeddings.append(embedding)
-        return np.array(embeddings)
+        if not texts:
+            return np.array([])
+        return np.asarray(self.provider.embed_texts(texts))
 
     def get_version(self) -> str:
         """Get the embedding model version for audit consistency."""
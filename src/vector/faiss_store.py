@@ -11,24 +11,39 @@ import numpy as np
 from .types import VectorRecord, QueryResult
 from .index import IVectorStore
 
+# HNSW graph degree and search beam width; ef=64 keeps recall around 99% for
+# sentence embeddings while still visiting only a small part of the graph
+HNSW_M = 32
+HNSW_EF_SEARCH = 64
+
 
 class FaissVectorStore(IVectorStore, ABC):
     """FAISS-backed implementation of IVectorStore."""
     
-    def __init__(self, dimension: int = 384):
+    def __init__(self, dimension: int = 384, index_type: Optional[str] = None):
         """
         Initialize FAISS vector store.
         
         Args:
             dimension: Dimension of the vectors (default: 384 for hash embeddings)
+            index_type: "flat" (float32), "fp16" (half precision), "sq8"
+                (int8 scalar quantized) or "hnsw" (approximate graph search);
+                defaults to FAISS_INDEX_TYPE from config
         """
         try:
             import faiss
             self.faiss = faiss
             self.dimension = dimension
-            
-            # Create a flat index (inner product metric for cosine similarity)
-            self.index = faiss.IndexFlatIP(dimension)
+
+            if index_type is None:
+                from ..core.config import FAISS_INDEX_TYPE
+                index_type = FAISS_INDEX_TYPE
+            if index_type not in ("flat", "fp16", "sq8", "hnsw"):
+                raise ValueError(f"Unsupported FAISS index type: {index_type}")
+            self.index_type = index_type
+
+            # Inner product metric over normalized vectors gives cosine similarity
+            self.index = self._create_index(dimension)
             
             # Keep track of record IDs and their corresponding vector indices
             self.id_to_vector_index = {}
@@ -38,6 +53,31 @@ class FaissVectorStore(IVectorStore, ABC):
             
         except ImportError:
             raise ImportError("FAISS not installed. Please install faiss-cpu package.")
+
+    def _create_index(self, dimension: int):
+        """Create an empty inner-product index of the configured type."""
+        if self.index_type == "sq8":
+            # int8 codes: 1 byte per component instead of 4. Stored vectors are
+            # L2-normalized so every component lies in [-1, 1]; training on the
+            # two corner vectors fixes that range without needing real data.
+            index = self.faiss.IndexScalarQuantizer(
+                dimension, self.faiss.ScalarQuantizer.QT_8bit_uniform, self.faiss.METRIC_INNER_PRODUCT
+            )
+            bounds = np.vstack([-np.ones(dimension), np.ones(dimension)]).astype(np.float32)
+            index.train(bounds)
+            return index
+        if self.index_type == "fp16":
+            # Half-precision codes: 2 bytes per component, no training needed
+            return self.faiss.IndexScalarQuantizer(
+                dimension, self.faiss.ScalarQuantizer.QT_fp16, self.faiss.METRIC_INNER_PRODUCT
+            )
+        if self.index_type == "hnsw":
+            # Graph index: search visits O(log n) vectors instead of all of them,
+            # at the cost of exactness and ~HNSW_M links of memory per vector
+            index = self.faiss.IndexHNSWFlat(dimension, HNSW_M, self.faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efSearch = HNSW_EF_SEARCH
+            return index
+        return self.faiss.IndexFlatIP(dimension)
     
     def add(self, record: VectorRecord) -> None:
         """Add a single vector record to the FAISS store."""
@@ -67,45 +107,35 @@ class FaissVectorStore(IVectorStore, ABC):
         self.next_vector_index += 1
     
     def batch_add(self, records: List[VectorRecord]) -> None:
-        """Add multiple vector records to the FAISS store."""
+        """Add multiple vector records to the FAISS store with a single index.add call."""
+        records = [record for record in records if record.vector is not None and len(record.vector) > 0]
         if not records:
             return
-            
-        # Prepare all vectors for batch addition  
-        vectors_to_add = []
-        valid_records = []
-        
+
+        # Check dimension match before stacking into one (n, dim) float32 array
         for record in records:
-            if record.vector is not None and len(record.vector) > 0:
-                # Check dimension match and normalize vector for cosine similarity
-                if len(record.vector) != self.dimension:
-                    raise ValueError(f"Vector dimension {len(record.vector)} does not match expected dimension {self.dimension}")
-                
-                norm = np.linalg.norm(record.vector)
-                if norm == 0:  # Handle zero vectors to prevent division by zero
-                    continue
-                
-                normalized_vector = record.vector / norm
-                vector_array = np.array(normalized_vector, dtype=np.float32)
-                vectors_to_add.append(vector_array)
-                valid_records.append(record)
-        
-        if not vectors_to_add:
+            if len(record.vector) != self.dimension:
+                raise ValueError(f"Vector dimension {len(record.vector)} does not match expected dimension {self.dimension}")
+        batch_vectors = np.asarray([record.vector for record in records], dtype=np.float32)
+
+        # Normalize all rows at once for cosine similarity, dropping zero vectors
+        norms = np.linalg.norm(batch_vectors, axis=1)
+        keep = norms > 0
+        if not keep.any():
             return
-            
-        # Convert to numpy array of correct shape and dtype
-        batch_vectors = np.vstack(vectors_to_add).astype(np.float32)
-        
-        # Add to FAISS index 
+        batch_vectors = np.ascontiguousarray(batch_vectors[keep] / norms[keep, None])
+        valid_records = [record for record, kept in zip(records, keep) if kept]
+
+        # Add to FAISS index
         self.index.add(batch_vectors)
-        
+
         # Store mappings for each record
         for i, record in enumerate(valid_records):
             self.id_to_vector_index[record.id] = self.next_vector_index + i
             self.vector_id_map[self.next_vector_index + i] = record.id
             self.id_to_metadata[record.id] = record.metadata or {}
 
-        self.next_vector_index += len(vectors_to_add)
+        self.next_vector_index += len(valid_records)
     
     def search(self, query_vector: np.ndarray, top_k: int = 5) -> List[QueryResult]:
         """Search for similar vectors and return ranked results."""
@@ -162,7 +192,7 @@ class FaissVectorStore(IVectorStore, ABC):
     def clear(self) -> None:
         """Clear all records from the FAISS store."""
         # Create a new index with same parameters
-        self.index = self.faiss.IndexFlatIP(self.dimension)
+        self.index = self._create_index(self.dimension)
         self.id_to_vector_index.clear()
         self.vector_id_map.clear()
         self.id_to_metadata.clear()
@@ -182,7 +212,7 @@ class FaissVectorStore(IVectorStore, ABC):
                     "dimension": self.dimension,
                     "vectors": [v.tolist() for v in vectors],
                     "metadata": {
-                        "metric": "inner_product",  # FAISS IndexFlatIP uses inner product
+                        "metric": "inner_product",  # flat and sq8 indexes both use inner product
                         "total_vectors": self.index.ntotal
                     }
                 }
@@ -221,7 +251,7 @@ class FaissVectorStore(IVectorStore, ABC):
             try:
                 # Recreate index with restored vectors
                 self.dimension = dimension
-                self.index = self.faiss.IndexFlatIP(dimension)
+                self.index = self._create_index(dimension)
 
                 vectors = [np.array(v, dtype=np.float32) for v in index_data.get("vectors", [])]
                 if vectors:
@@ -53,26 +53,59 @@ class IVectorStore(ABC):
 class SimpleInMemoryVectorStore(IVectorStore):
     """Simple in-memory implementation of IVectorStore using cosine similarity."""
     
-    def __init__(self):
-        self._vectors = {}  # record_id -> VectorRecord
+    def __init__(self, dtype: str = "fp32"):
+        """
+        Args:
+            dtype: storage precision of the search index: "fp32", "fp16" (half the
+                bytes scanned per search) or "int8" (a quarter, with a per-vector scale).
+                Reduced precisions keep only the quantized copy, so exported
+                records carry the unit-length vector decoded from it
+        """
+        if dtype not in ("fp32", "fp16", "int8"):
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        self.dtype = dtype
+        self._vectors = {}  # record_id -> VectorRecord (vector dropped for fp16/int8)
         self._index = {}    # record_id -> normalized_vector (for fast lookup)
-        
+        self._scales = {}   # record_id -> int8 quantization scale (int8 only)
+
+    def _encode(self, record_id: str, vector: np.ndarray) -> np.ndarray:
+        """Convert a normalized vector to the configured storage precision."""
+        if self.dtype == "fp16":
+            return np.asarray(vector, dtype=np.float16)
+        if self.dtype == "int8":
+            vector = np.asarray(vector, dtype=np.float32)
+            peak = np.max(np.abs(vector)) if vector.size else 0.0
+            scale = 127.0 / peak if peak > 0 else 1.0
+            self._scales[record_id] = scale
+            return np.round(vector * scale).astype(np.int8)
+        return vector
+
+    def _decode(self, record_id: str) -> Optional[np.ndarray]:
+        """Rebuild a float32 unit-length vector from its stored (possibly quantized) copy."""
+        stored = self._index.get(record_id)
+        if stored is None:
+            return None
+        vector = np.asarray(stored, dtype=np.float32)
+        if record_id in self._scales:
+            vector = vector / self._scales[record_id]
+        return vector
+
     def add(self, record: VectorRecord) -> None:
         """Add a single vector record to the store."""
-        if record.id in self._vectors:
-            # Update existing record
+        if self.dtype == "fp32":
             self._vectors[record.id] = record
         else:
-            # Add new record
-            self._vectors[record.id] = record
-            
+            # Only the quantized copy in _index is kept; holding the float32
+            # vector as well would cost more memory than fp32 storage
+            self._vectors[record.id] = VectorRecord(id=record.id, vector=None, metadata=record.metadata)
+
         # Store normalized vector for similarity calculations 
         if record.vector is not None:
             norm = np.linalg.norm(record.vector)
             if norm > 0:
-                self._index[record.id] = record.vector / norm
+                self._index[record.id] = self._encode(record.id, record.vector / norm)
             else:
-                self._index[record.id] = record.vector
+                self._index[record.id] = self._encode(record.id, record.vector)
     
     def batch_add(self, records: List[VectorRecord]) -> None:
         """Add multiple vector records to the store."""
@@ -94,8 +127,11 @@ class SimpleInMemoryVectorStore(IVectorStore):
         
         # Calculate cosine similarities
         similarities = {}
+        scales = self._scales
         for record_id, stored_vector in self._index.items():
             similarity = np.dot(normalized_query, stored_vector)
+            if record_id in scales:
+                similarity /= scales[record_id]
             similarities[record_id] = similarity
             
         # Sort by similarity (descending) and return top_k results  
@@ -121,25 +157,43 @@ class SimpleInMemoryVectorStore(IVectorStore):
             del self._vectors[record_id]
         if record_id in self._index:
             del self._index[record_id]
+        self._scales.pop(record_id, None)
     
     def clear(self) -> None:
         """Clear all records from the store."""
         self._vectors.clear()
         self._index.clear()
+        self._scales.clear()
 
     def export_data(self) -> dict:
         """Export vector store data for backup purposes."""
+        if self.dtype == "fp32":
+            vectors = self._vectors.copy()
+        else:
+            vectors = {
+                record_id: VectorRecord(id=record.id, vector=self._decode(record_id), metadata=record.metadata)
+                for record_id, record in self._vectors.items()
+            }
         return {
-            "vectors": self._vectors.copy(),
-            "index": {k: v.tolist() if hasattr(v, 'tolist') else v for k, v in self._index.items()}
+            "vectors": vectors,
+            "index": {k: v.tolist() if hasattr(v, 'tolist') else v for k, v in self._index.items()},
+            "dtype": self.dtype,
+            "scales": dict(self._scales)
         }
 
     def import_data(self, data: dict) -> None:
         """Import vector store data from backup."""
         self._vectors = data.get("vectors", {}).copy()
+        if self.dtype != "fp32":
+            self._vectors = {
+                record_id: VectorRecord(id=record.id, vector=None, metadata=record.metadata)
+                for record_id, record in self._vectors.items()
+            }
         self._index = {}
+        self._scales = dict(data.get("scales", {}))
+        storage_dtype = {"fp16": np.float16, "int8": np.int8}.get(data.get("dtype"))
         for k, v in data.get("index", {}).items():
             if isinstance(v, list):
-                self._index[k] = np.array(v)
+                self._index[k] = np.array(v, dtype=storage_dtype)
             else:
                 self._index[k] = v
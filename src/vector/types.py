@@ -8,9 +8,9 @@ import numpy as np
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class VectorRecord:
-    """Represents a vector record with metadata."""
+    """Represents a vector record with metadata (slotted: one is built per embedded key)."""
     
     id: str
     """Unique identifier for the vector record"""
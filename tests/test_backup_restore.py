@@ -20,7 +20,9 @@ from src.core.backup import (
     BackupManifest,
     _calculate_checksum,
     _encrypt_data,
-    _decrypt_data
+    _decrypt_data,
+    _read_sqlite_db,
+    _write_sqlite_db
 )
 from src.core.config import BACKUP_ENABLED
 
@@ -57,6 +59,28 @@ class TestBackupCore:
         with pytest.raises(RestoreError):
             _decrypt_data(encrypted, key2)
 
+    @pytest.mark.parametrize("vacuum_max_mb", [1024, 0])
+    def test_sqlite_snapshot_paths(self, vacuum_max_mb):
+        """Test VACUUM INTO and the paged online backup both yield a readable copy."""
+        import sqlite3
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_file = os.path.join(tmpdir, "source.db")
+            conn = sqlite3.connect(db_file)
+            conn.execute("CREATE TABLE kv (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("INSERT INTO kv VALUES ('a', '1')")
+            conn.commit()
+            conn.close()
+
+            with patch('src.core.backup.BACKUP_VACUUM_MAX_MB', vacuum_max_mb):
+                data = _read_sqlite_db(db_file)
+
+            copy_file = os.path.join(tmpdir, "copy.db")
+            Path(copy_file).write_bytes(data)
+            conn = sqlite3.connect(copy_file)
+            assert conn.execute("SELECT value FROM kv WHERE key = 'a'").fetchone() == ('1',)
+            conn.close()
+
     def test_backup_manifest_serialization(self):
         """Test backup manifest JSON serialization."""
         manifest = BackupManifest(
@@ -157,6 +181,39 @@ class TestRestoreCore:
             with pytest.raises(RestoreError, match="requires admin confirmation"):
                 restore_backup(backup_path, manifest_path, admin_confirmed=False, dry_run=False)
 
+    def test_sqlite_restore_with_open_wal_connection(self):
+        """Test restoring under an open WAL connection is not undone by its -wal file."""
+        import sqlite3
+        from src.core.db import close_cached_connections
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            snapshot_file = os.path.join(tmpdir, "snapshot.db")
+            conn = sqlite3.connect(snapshot_file)
+            conn.execute("CREATE TABLE kv (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("INSERT INTO kv VALUES ('a', 'restored')")
+            conn.commit()
+            conn.close()
+
+            db_file = os.path.join(tmpdir, "memory.db")
+            live = sqlite3.connect(db_file)
+            live.execute("PRAGMA journal_mode=WAL")
+            live.execute("PRAGMA wal_autocheckpoint=0")
+            live.execute("CREATE TABLE kv (key TEXT PRIMARY KEY, value TEXT)")
+            live.execute("INSERT INTO kv VALUES ('a', 'stale')")
+            live.commit()
+            assert os.path.getsize(db_file + "-wal") > 0
+
+            try:
+                _write_sqlite_db(db_file, Path(snapshot_file).read_bytes())
+                assert live.execute("SELECT value FROM kv WHERE key = 'a'").fetchone() == ('restored',)
+            finally:
+                live.close()
+                close_cached_connections()
+
+            conn = sqlite3.connect(db_file)
+            assert conn.execute("SELECT value FROM kv WHERE key = 'a'").fetchone() == ('restored',)
+            conn.close()
+
 
 @pytest.mark.skipif(not BACKUP_ENABLED, reason="Backup system disabled")
 class TestVectorBackupIntegration:
@@ -0,0 +1,118 @@
+"""
+Stage 2: Test the FaissRetriever embedding worker loop.
+Runs _embed_worker in a thread with plain queues and a fake model.
+"""
+
+import itertools
+import queue
+import threading
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+from src.agents.embed_worker import _embed_worker, EmbeddingWorker, EmbeddingWorkerDied
+
+
+def _fake_model():
+    """Model whose vectors encode each text's length, so replies can be checked per request."""
+    model = MagicMock()
+    model.encode.side_effect = lambda texts, **kwargs: np.array([[len(t), 1.0] for t in texts])
+    return model
+
+
+def _run_worker(requests, window=0.05):
+    """Feed requests (then a stop marker) to the worker loop and collect its replies."""
+    in_q, out_q = queue.Queue(), queue.Queue()
+    model = _fake_model()
+    for request in requests:
+        in_q.put(request)
+    in_q.put(None)
+
+    with patch('src.agents.embed_worker._load_worker_model', return_value=model):
+        worker = threading.Thread(target=_embed_worker, args=(in_q, out_q, "test-model", window))
+        worker.start()
+        worker.join(timeout=5)
+
+    replies = {}
+    while not out_q.empty():
+        request_id, vectors, error = out_q.get()
+        replies[request_id] = (vectors, error)
+    return model, replies
+
+
+def test_requests_in_window_share_one_encode():
+    """Test queued requests are coalesced into a single encode and split back per request."""
+    model, replies = _run_worker([(1, ["a", "bb"], 16), (2, ["ccc"], 64)])
+
+    assert model.encode.call_count == 1
+    assert model.encode.call_args[0][0] == ["a", "bb", "ccc"]
+    assert model.encode.call_args[1]["batch_size"] == 64  # largest requested batch size
+    assert replies[1][0][:, 0].tolist() == [1.0, 2.0]
+    assert replies[2][0][:, 0].tolist() == [3.0]
+    assert replies[1][0].dtype == np.float32
+
+
+def test_encode_failure_reported_to_every_request():
+    """Test an encode error is sent back to each request in the failed batch."""
+    in_q, out_q = queue.Queue(), queue.Queue()
+    model = MagicMock()
+    model.encode.side_effect = RuntimeError("out of memory")
+    in_q.put((1, ["a"], 64))
+    in_q.put((2, ["b"], 64))
+    in_q.put(None)
+
+    with patch('src.agents.embed_worker._load_worker_model', return_value=model):
+        _embed_worker(in_q, out_q, "test-model", 0.05)
+
+    errors = [out_q.get() for _ in range(2)]
+    assert {request_id for request_id, _, _ in errors} == {1, 2}
+    assert all(vectors is None and "out of memory" in error for _, vectors, error in errors)
+
+
+def _client(process):
+    """EmbeddingWorker client wired to plain queues and a fake process, without spawning."""
+    worker = EmbeddingWorker.__new__(EmbeddingWorker)
+    worker._process = process
+    worker._in_q, worker._out_q = queue.Queue(), queue.Queue()
+    worker._pending = {}
+    worker._pending_lock = threading.Lock()
+    worker._stopped = False
+    worker._request_ids = itertools.count()
+    return worker
+
+
+def test_worker_exit_fails_pending_and_later_requests():
+    """Test a dead worker process fails waiting requests at once and rejects new ones."""
+    process = MagicMock(exitcode=1)
+    process.name = "embedding-worker-test"
+    process.is_alive.return_value = True
+    worker = _client(process)
+    future = worker.submit(["a"])
+    assert worker._in_q.get_nowait() == (0, ["a"], 64)
+
+    process.is_alive.return_value = False
+    with patch('src.agents.embed_worker.LIVENESS_POLL_SEC', 0.01):
+        worker._read_results()
+
+    with pytest.raises(EmbeddingWorkerDied, match="exited with code 1"):
+        future.result(timeout=1)
+    assert not worker.alive
+    with pytest.raises(EmbeddingWorkerDied):
+        worker.encode(["b"])
+    assert worker._in_q.empty()
+
+
+def test_timed_out_request_is_forgotten():
+    """Test a request that times out is dropped from the pending map and its late reply ignored."""
+    from concurrent.futures import TimeoutError as FutureTimeoutError
+    process = MagicMock()
+    process.is_alive.return_value = True
+    worker = _client(process)
+
+    with patch('src.agents.embed_worker.RESULT_TIMEOUT_SEC', 0.01):
+        with pytest.raises(FutureTimeoutError):
+            worker.encode(["a"])
+    assert worker._pending == {}
+
+    worker._out_q.put((0, np.zeros((1, 2), dtype=np.float32), None))
+    worker._out_q.put(None)
+    worker._read_results()
@@ -8,8 +8,9 @@ import os
 import tempfile
 import numpy as np
 from unittest.mock import MagicMock, patch
-from src.agents.faiss_adapter import FaissRetriever
+from src.agents.faiss_adapter import FaissRetriever, _load_embedding_model
 from src.agents.agent import AgentMessage
+from src.core.db import close_cached_connections
 
 
 class TestFaissAdapter:
@@ -21,11 +22,17 @@ class TestFaissAdapter:
         self.temp_dir = tempfile.mkdtemp()
         self.index_file = os.path.join(self.temp_dir, "test_index.idx")
         self.metadata_file = os.path.join(self.temp_dir, "test_metadata.pkl")
+        self.metadata_db = os.path.join(self.temp_dir, "test_metadata.db")
+        # Tests patch SentenceTransformer, so don't reuse a model loaded by another test
+        _load_embedding_model.cache_clear()
 
     def teardown_method(self):
         """Cleanup after each test."""
         # Clean up test files
-        for f in [self.index_file, self.metadata_file]:
+        close_cached_connections()
+        _load_embedding_model.cache_clear()
+        for f in [self.index_file, self.metadata_file, self.metadata_db,
+                  self.metadata_db + "-wal", self.metadata_db + "-shm"]:
             if os.path.exists(f):
                 os.remove(f)
         os.rmdir(self.temp_dir)
@@ -40,6 +47,17 @@ class TestFaissAdapter:
             assert retriever.embedding_model is None
             assert retriever.embedding_dim == 384  # Default dimension
 
+    def test_embedding_model_shared_between_retrievers(self):
+        """Test retrievers for the same model name share one loaded SentenceTransformer."""
+        with patch('src.agents.faiss_adapter.SentenceTransformer') as mock_model:
+            mock_model.return_value.get_sentence_embedding_dimension.return_value = 8
+
+            first = FaissRetriever("first_agent")
+            second = FaissRetriever("second_agent")
+
+            assert first.embedding_model is second.embedding_model
+            assert mock_model.call_count == 1
+
     def test_ingest_chunk_basic(self):
         """Test basic chunk ingestion functionality."""
         retriever = FaissRetriever("test_agent")
@@ -69,6 +87,206 @@ class TestFaissAdapter:
         # Verify no chunks were added
         assert len(retriever.metadata_store) == 0
 
+    def test_ingest_chunks_batch(self):
+        """Test batched ingestion adds one vector and metadata entry per non-empty chunk."""
+        retriever = FaissRetriever("test_agent")
+        start_vectors = retriever.index.ntotal if retriever.index else 0
+        start_metadata = len(retriever.metadata_store)
+
+        ingested = retriever.ingest_chunks(
+            ["First batched chunk", "   ", "Second batched chunk"],
+            [{"id": 1}, {"id": 2}, {"id": 3}]
+        )
+
+        assert ingested == 2
+        assert retriever.index.ntotal == start_vectors + 2
+        new_entries = retriever.metadata_store[start_metadata:]
+        assert [m["id"] for m in new_entries] == [1, 3]
+        assert new_entries[1]["text"] == "Second batched chunk"
+        assert retriever.ingest_chunks([]) == 0
+
+    def test_metadata_columns(self):
+        """Test chunk fields land in parallel columns and the row view reassembles them."""
+        retriever = FaissRetriever("test_agent")
+        retriever.metadata_store = []
+
+        retriever.ingest_chunks(["Column one", "Column two"], [{"source": "a"}, {"source": "b", "text": "ignored"}])
+
+        assert retriever._texts == ["Column one", "Column two"]
+        assert list(retriever._text_lengths) == [10, 10]
+        assert retriever._meta_extra == [{"source": "a"}, {"source": "b"}]
+        assert retriever.get_index_stats()['last_ingested'] == retriever._ingested_at[-1]
+
+        rows = retriever.metadata_store
+        assert rows[1]["text"] == "Column two"
+        assert rows[1]["source"] == "b"
+        assert rows[1]["vector_norm"] == pytest.approx(1.0, rel=1e-5)
+
+        retriever.metadata_store = rows[:1]
+        assert retriever._texts == ["Column one"]
+        assert retriever.metadata_store == rows[:1]
+
+    def test_search_caches_query_embeddings(self):
+        """Test repeat queries reuse the cached embedding instead of re-encoding."""
+        with patch('src.agents.faiss_adapter.SentenceTransformer') as mock_model:
+            model = mock_model.return_value
+            model.get_sentence_embedding_dimension.return_value = 8
+            model.encode.side_effect = lambda text, **kwargs: np.ones(8, dtype=np.float32)
+
+            retriever = FaissRetriever("test_agent")
+            retriever.index_file = self.index_file
+            retriever.metadata_file = self.metadata_file
+            retriever.metadata_db = self.metadata_db
+            retriever.index = None
+            retriever.metadata_store = []
+            retriever.ingest_chunk("Cached query target")
+            encodes_after_ingest = model.encode.call_count
+
+            first = retriever.search("cached query")
+            second = retriever.search("  cached query ")
+
+            assert first[0]['index'] == second[0]['index']
+            assert model.encode.call_count == encodes_after_ingest + 1
+
+    def test_float64_embeddings_stored_as_float32(self):
+        """Test float64 model output is converted to contiguous float32 before reaching FAISS."""
+        with patch('src.agents.faiss_adapter.SentenceTransformer') as mock_model:
+            model = mock_model.return_value
+            model.get_sentence_embedding_dimension.return_value = 4
+            model.encode.side_effect = lambda text, **kwargs: np.array([0.5, 0.5, 0.5, 0.5], dtype=np.float64)
+
+            retriever = FaissRetriever("test_agent")
+            retriever.index = MagicMock(ntotal=0)
+            retriever.metadata_store = []
+
+            assert retriever.ingest_chunk("Double precision chunk") is True
+            added = retriever.index.add.call_args[0][0]
+            assert added.dtype == np.float32
+            assert added.flags['C_CONTIGUOUS']
+
+            query_vector = retriever._embed_query("double precision query")
+            assert query_vector.dtype == np.float32
+
+    def test_dead_embedding_worker_falls_back_to_in_process(self):
+        """Test the worker starts on the first ingest, and a dead worker hands encoding back in-process."""
+        from src.agents.embed_worker import EmbeddingWorkerDied
+        with patch('src.agents.faiss_adapter.SentenceTransformer') as mock_model, \
+                patch('src.agents.faiss_adapter.EMBED_WORKER_ENABLED', True), \
+                patch('src.agents.embed_worker.get_embedding_worker') as get_worker:
+            model = mock_model.return_value
+            model.get_sentence_embedding_dimension.return_value = 4
+            model.encode.side_effect = lambda texts, **kwargs: np.full((len(texts), 4), 0.5, dtype=np.float32)
+            get_worker.return_value.encode.side_effect = EmbeddingWorkerDied("exited with code 1")
+
+            retriever = FaissRetriever("test_agent")
+            retriever.index = MagicMock(ntotal=0)
+            retriever.metadata_store = []
+            get_worker.assert_not_called()
+
+            assert retriever.ingest_chunks(["First", "Second"], batch_size=8) == 2
+            get_worker.return_value.encode.assert_called_once_with(["First", "Second"], 8)
+            assert model.encode.call_args[1]["batch_size"] == 8
+
+            assert retriever.ingest_chunks(["Third"]) == 1
+            assert get_worker.return_value.encode.call_count == 1
+
+    def test_failed_worker_request_falls_back_for_that_batch(self):
+        """Test a timed-out or failed worker batch is encoded in-process without retiring the worker."""
+        from concurrent.futures import TimeoutError as FutureTimeoutError
+        with patch('src.agents.faiss_adapter.SentenceTransformer') as mock_model, \
+                patch('src.agents.faiss_adapter.EMBED_WORKER_ENABLED', True), \
+                patch('src.agents.embed_worker.get_embedding_worker') as get_worker:
+            model = mock_model.return_value
+            model.get_sentence_embedding_dimension.return_value = 4
+            model.encode.side_effect = lambda texts, **kwargs: np.full((len(texts), 4), 0.5, dtype=np.float32)
+            get_worker.return_value.encode.side_effect = [
+                FutureTimeoutError(), RuntimeError("Embedding worker failed: out of memory")
+            ]
+
+            retriever = FaissRetriever("test_agent")
+            retriever.index = MagicMock(ntotal=0)
+            retriever.metadata_store = []
+
+            assert retriever.ingest_chunks(["First"]) == 1
+            assert retriever.ingest_chunks(["Second"]) == 1
+            assert get_worker.return_value.encode.call_count == 2
+            assert model.encode.call_count == 2
+
+    def test_metadata_saved_incrementally(self):
+        """Test metadata is persisted to SQLite a chunk at a time and reloaded in order."""
+        retriever = FaissRetriever("test_agent")
+        retriever.index_file = self.index_file
+        retriever.metadata_file = self.metadata_file
+        retriever.metadata_db = self.metadata_db
+        retriever.index = None
+        retriever.metadata_store = []
+        retriever._persisted_count = 0
+
+        retriever.ingest_chunks(["Saved first", "Saved second"], [{"id": 1}, {"id": 2}])
+        retriever._save_index()
+        retriever.ingest_chunk("Saved third", {"id": 3})
+        retriever._save_index()
+        assert retriever._persisted_count == 3
+
+        reloaded = FaissRetriever("test_agent")
+        reloaded.index_file = self.index_file
+        reloaded.metadata_file = self.metadata_file
+        reloaded.metadata_db = self.metadata_db
+        reloaded._load_index()
+
+        assert reloaded.index.ntotal == 3
+        assert [m["text"] for m in reloaded.metadata_store] == ["Saved first", "Saved second", "Saved third"]
+        assert [m["id"] for m in reloaded.metadata_store] == [1, 2, 3]
+
+    def test_close_saves_only_when_dirty(self):
+        """Test close() writes the index after an ingest and is a no-op once saved."""
+        retriever = FaissRetriever("test_agent")
+        retriever.index_file = self.index_file
+        retriever.metadata_file = self.metadata_file
+        retriever.metadata_db = self.metadata_db
+        retriever.index = None
+        retriever.metadata_store = []
+        retriever._persisted_count = 0
+
+        retriever.ingest_chunk("Saved on close")
+        assert retriever._dirty is True
+        retriever.close()
+        assert retriever._dirty is False
+        assert os.path.exists(self.index_file)
+
+        with patch.object(retriever, '_save_index') as save:
+            retriever.close()
+            save.assert_not_called()
+
+    def test_search_scores_are_cosine_similarity(self):
+        """Test search returns inner-product scores of unit vectors, best match first."""
+        vectors = {
+            "north": np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32),
+            "east": np.array([0.0, 1.0, 0.0, 0.0], dtype=np.float32),
+            "query": np.array([0.6, 0.8, 0.0, 0.0], dtype=np.float32),
+        }
+        with patch('src.agents.faiss_adapter.SentenceTransformer') as mock_model:
+            model = mock_model.return_value
+            model.get_sentence_embedding_dimension.return_value = 4
+            model.encode.side_effect = lambda texts, **kwargs: (
+                np.stack([vectors[t] for t in texts]) if isinstance(texts, list) else vectors[texts]
+            )
+
+            retriever = FaissRetriever("test_agent")
+            retriever.index_file = self.index_file
+            retriever.metadata_file = self.metadata_file
+            retriever.metadata_db = self.metadata_db
+            retriever.index = None
+            retriever.metadata_store = []
+            retriever.ingest_chunks(["north", "east"])
+
+            results = retriever.search("query", top_k=2)
+
+            assert [r['text'] for r in results] == ["east", "north"]
+            assert results[0]['score'] == pytest.approx(0.8)
+            assert results[1]['score'] == pytest.approx(0.6)
+            assert all(kwargs.get('normalize_embeddings') for _, kwargs in model.encode.call_args_list)
+
     def test_search_empty_index(self):
         """Test search on empty FAISS index."""
         retriever = FaissRetriever("test_agent")
@@ -153,6 +371,11 @@ class TestFaissAdapter:
         assert 'vector_count' in stats
         assert 'dimensions' in stats
         assert stats['embedding_model'] == 'sentence-transformers'
+        assert stats['index_file_exists'] == os.path.exists(retriever.index_file)
+
+        # Each call returns a fresh snapshot; the shared constants aren't exposed
+        stats['stage'] = 'mutated'
+        assert retriever.get_index_stats()['stage'] == 'stage_2_complete'
 
     def test_rebuild_index(self):
         """Test index rebuild functionality."""
@@ -166,6 +389,53 @@ class TestFaissAdapter:
         success = retriever.rebuild_index()
         assert success is True
 
+    def test_rebuild_index_saves_once(self):
+        """Test a rebuild crossing the 100-chunk checkpoint still saves only once, at the end."""
+        retriever = FaissRetriever("test_agent")
+        retriever.index_file = self.index_file
+        retriever.metadata_file = self.metadata_file
+        retriever.metadata_db = self.metadata_db
+        retriever.index = None
+        retriever.metadata_store = []
+        retriever._persisted_count = 0
+        retriever.ingest_chunks([f"Rebuild chunk {i}" for i in range(150)], autosave=False)
+
+        with patch.object(retriever, '_save_index', wraps=retriever._save_index) as save:
+            assert retriever.rebuild_index() is True
+            assert save.call_count == 1
+
+        assert retriever.index.ntotal == 150
+        assert retriever._persisted_count == 150
+
+    def test_ivfpq_retrains_into_ivf_tiers(self):
+        """Test ivfpq starts flat and retrains into each IVF tier the corpus grows into."""
+        tiers = ((600, 8, "IVF8,SQ8"), (300, 4, "IVF4,SQ8"))
+        with patch('src.agents.faiss_adapter.SentenceTransformer') as mock_model, \
+                patch('src.agents.faiss_adapter.FAISS_INDEX_TYPE', "ivfpq"), \
+                patch('src.agents.faiss_adapter.IVF_INDEX_TIERS', tiers):
+            mock_model.side_effect = Exception("Model load failed")
+            retriever = FaissRetriever("test_agent")
+            retriever.index_file = self.index_file
+            retriever.metadata_file = self.metadata_file
+            retriever.metadata_db = self.metadata_db
+            retriever.index = None
+            retriever.metadata_store = []
+
+            retriever.ingest_chunks([f"Chunk {i}" for i in range(299)], autosave=False)
+            assert getattr(retriever.index, 'nlist', 0) == 0
+
+            retriever.ingest_chunk("Chunk 299")
+            assert retriever.index.nlist == 4
+            assert retriever.index.nprobe == 8
+
+            retriever.ingest_chunks([f"Chunk {i}" for i in range(300, 650)], autosave=False)
+            assert retriever.index.nlist == 8
+            assert retriever.index.ntotal == 650
+
+            results = retriever.search("Chunk 5", top_k=3)
+            assert 0 < len(results) <= 3
+            assert all(r['text'] == retriever._texts[r['index']] for r in results)
+
     def test_error_handling(self):
         """Test error handling in various operations."""
         retriever = FaissRetriever("test_agent")
@@ -128,6 +128,71 @@ def test_faiss_store_empty_search():
     assert len(results) == 0
 
 
+def test_faiss_store_sq8_matches_flat_scores():
+    """Test int8 scalar-quantized index ranks like the float32 index with near-identical cosine scores."""
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(50, 384)).astype(np.float32)
+    records = [VectorRecord(id=f"rec_{i}", vector=v, metadata={}) for i, v in enumerate(vectors)]
+
+    flat_store = FaissVectorStore(dimension=384, index_type="flat")
+    sq8_store = FaissVectorStore(dimension=384, index_type="sq8")
+    flat_store.batch_add(records)
+    sq8_store.batch_add(records)
+
+    query = vectors[7]
+    flat_results = flat_store.search(query, top_k=3)
+    sq8_results = sq8_store.search(query, top_k=3)
+
+    assert sq8_results[0].id == "rec_7"
+    assert sq8_results[0].score >= 0.99
+    assert abs(sq8_results[0].score - flat_results[0].score) < 0.01
+
+
+def test_faiss_store_fp16_matches_flat_scores():
+    """Test half-precision index ranks like the float32 index with near-identical cosine scores."""
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(50, 384)).astype(np.float32)
+    records = [VectorRecord(id=f"rec_{i}", vector=v, metadata={}) for i, v in enumerate(vectors)]
+
+    flat_store = FaissVectorStore(dimension=384, index_type="flat")
+    fp16_store = FaissVectorStore(dimension=384, index_type="fp16")
+    flat_store.batch_add(records)
+    fp16_store.batch_add(records)
+
+    query = vectors[7]
+    flat_results = flat_store.search(query, top_k=3)
+    fp16_results = fp16_store.search(query, top_k=3)
+
+    assert fp16_results[0].id == "rec_7"
+    assert abs(fp16_results[0].score - flat_results[0].score) < 0.001
+
+
+def test_faiss_store_hnsw_matches_flat_ranking():
+    """Test the HNSW index finds the same nearest neighbours as the exact index."""
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(200, 384)).astype(np.float32)
+    records = [VectorRecord(id=f"rec_{i}", vector=v, metadata={}) for i, v in enumerate(vectors)]
+
+    flat_store = FaissVectorStore(dimension=384, index_type="flat")
+    hnsw_store = FaissVectorStore(dimension=384, index_type="hnsw")
+    flat_store.batch_add(records)
+    hnsw_store.batch_add(records)
+
+    query = vectors[7]
+    flat_results = flat_store.search(query, top_k=3)
+    hnsw_results = hnsw_store.search(query, top_k=3)
+
+    assert hnsw_results[0].id == "rec_7"
+    assert [r.id for r in hnsw_results] == [r.id for r in flat_results]
+    assert abs(hnsw_results[0].score - flat_results[0].score) < 1e-4
+
+
+def test_faiss_store_rejects_unknown_index_type():
+    """Test that an unsupported index type is rejected."""
+    with pytest.raises(ValueError):
+        FaissVectorStore(dimension=384, index_type="ivfpq")
+
+
 if __name__ == "__main__":
     # Run the tests directly if needed
     test_faiss_store_initialization()
@@ -137,5 +202,9 @@ if __name__ == "__main__":
     test_faiss_store_clear()
     test_faiss_store_delete_not_implemented()
     test_faiss_store_empty_search()
+    test_faiss_store_sq8_matches_flat_scores()
+    test_faiss_store_fp16_matches_flat_scores()
+    test_faiss_store_hnsw_matches_flat_ranking()
+    test_faiss_store_rejects_unknown_index_type()
     
     print("All FaissVectorStore tests passed!")
@@ -553,3 +553,21 @@ class TestSchemaValidationIntegration:
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
+
+
+class TestHealthEndpoint:
+    """Test the /health probe endpoint."""
+
+    def test_health_kv_count_cached_within_ttl(self, test_client):
+        """Test repeated probes within the TTL share one KV count query."""
+        from src.api import main as api_main
+
+        with patch.object(api_main, "_kv_count_cache", {"at": float("-inf"), "value": 0}), \
+             patch.object(api_main, "HEALTH_COUNT_TTL_SECONDS", 60.0), \
+             patch.object(api_main, "get_kv_count", return_value=7) as mock_count:
+            first = test_client.get("/health")
+            second = test_client.get("/health")
+
+        assert first.json()["kv_count"] == 7
+        assert second.json()["kv_count"] == 7
+        mock_count.assert_called_once()
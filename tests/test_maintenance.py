@@ -19,6 +19,7 @@ from src.core.maintenance import (
     validate_vector_index,
     cleanup_orphaned_data,
     rebuild_vector_index,
+    optimize_database,
     perform_full_maintenance,
     MaintenanceError
 )
@@ -106,6 +107,36 @@ class TestDatabaseIntegrity:
                 assert "empty" in report.errors[0].lower()
 
 
+@pytest.mark.skipif(not MAINTENANCE_ENABLED, reason="Maintenance system disabled")
+class TestDatabaseOptimize:
+    """Test query planner optimization."""
+
+    @patch('src.core.maintenance.MAINTENANCE_ENABLED', True)
+    def test_optimize_database(self):
+        """Test optimize runs against a real database."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_file = os.path.join(tmpdir, "opt.db")
+            conn = sqlite3.connect(db_file)
+            conn.execute("CREATE TABLE kv (key TEXT PRIMARY KEY, value TEXT)")
+            conn.commit()
+            conn.close()
+
+            with patch('src.core.maintenance.DB_PATH', db_file):
+                report = optimize_database()
+
+            assert report.operation == "database_optimize"
+            assert report.errors == []
+            assert report.completed_at is not None
+
+    @patch('src.core.maintenance.MAINTENANCE_ENABLED', True)
+    def test_optimize_database_file_not_found(self):
+        """Test optimize with missing database file."""
+        with patch('src.core.maintenance.DB_PATH', '/nonexistent/path.db'):
+            report = optimize_database()
+
+            assert "not found" in report.errors[0].lower()
+
+
 @pytest.mark.skipif(not MAINTENANCE_ENABLED, reason="Maintenance system disabled")
 class TestVectorValidation:
     """Test vector index validation."""
@@ -165,7 +196,7 @@ class TestCleanupOperations:
         assert "cleanup_successful" in report.metadata
 
     @patch('src.core.maintenance.MAINTENANCE_ENABLED', True)
-    @patch('src.core.maintenance.list_keys')
+    @patch('src.core.maintenance.list_all_keys')
     @patch('src.core.maintenance.are_vector_features_enabled')
     def test_cleanup_with_kv_data(self, mock_vector_enabled, mock_list_keys):
         """Test cleanup with mock KV data."""
@@ -180,6 +211,33 @@ class TestCleanupOperations:
         assert report.operation == "orphaned_data_cleanup"
         assert report.completed_at is not None
 
+    @patch('src.core.maintenance.MAINTENANCE_ENABLED', True)
+    @patch('src.core.maintenance._create_backup_for_maintenance', return_value=None)
+    @patch('src.core.maintenance.are_vector_features_enabled', return_value=False)
+    def test_cleanup_removes_only_old_tombstones(self, mock_vector_enabled, mock_backup):
+        """Test old tombstones are purged in one statement while recent ones and live rows stay."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_file = os.path.join(tmpdir, "cleanup.db")
+            conn = sqlite3.connect(db_file)
+            conn.execute("CREATE TABLE kv (user_id TEXT, key TEXT, value TEXT, updated_at TIMESTAMP)")
+            conn.executemany("INSERT INTO kv VALUES (?, ?, ?, ?)", [
+                ("default", "old_tombstone", "", "2000-01-01 00:00:00"),
+                ("default", "new_tombstone", "", datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")),
+                ("default", "old_live", "kept", "2000-01-01 00:00:00"),
+            ])
+            conn.commit()
+            conn.close()
+
+            with patch('src.core.maintenance.DB_PATH', db_file):
+                report = cleanup_orphaned_data()
+
+            conn = sqlite3.connect(db_file)
+            remaining = {row[0] for row in conn.execute("SELECT key FROM kv")}
+            conn.close()
+
+            assert remaining == {"new_tombstone", "old_live"}
+            assert report.metadata["tombstones_cleaned"] == 1
+
 
 @pytest.mark.skipif(not MAINTENANCE_ENABLED, reason="Maintenance system disabled")
 class TestIndexRebuild:
@@ -201,7 +259,7 @@ class TestIndexRebuild:
     @patch('src.core.maintenance.are_vector_features_enabled')
     @patch('src.core.maintenance.get_vector_store')
     @patch('src.core.maintenance.get_embedding_provider')
-    @patch('src.core.maintenance.list_keys')
+    @patch('src.core.maintenance.list_all_keys')
     def test_rebuild_vector_unavailable(self, mock_list_keys, mock_embed, mock_store, mock_enabled):
         """Test vector rebuild with unavailable components."""
         mock_enabled.return_value = True
@@ -232,6 +290,7 @@ class TestFullMaintenance:
         assert "database_integrity_check" in operations
         assert "vector_index_validation" in operations
         assert "orphaned_data_cleanup" in operations
+        assert operations[-1] == "database_optimize"
 
     @patch('src.core.maintenance.MAINTENANCE_ENABLED', True)
     def test_full_maintenance_report_structure(self):
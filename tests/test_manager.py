@@ -0,0 +1,146 @@
+"""
+Stage 3: Test Planning Agent (Manager)
+Tests for query intent analysis and execution plan construction.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+from src.agents.manager import PlanningAgent, ExecutionStep, _QueryFeatures
+
+
+@pytest.fixture
+def planner():
+    """Create a planning agent."""
+    return PlanningAgent()
+
+
+@pytest.mark.parametrize("query,intent", [
+    ("Who am I?", "identity_recall"),
+    ("What's my name", "identity_recall"),
+    ("What is my favorite color", "preference_recall"),
+    ("I'd likely want tea", "preference_recall"),  # keywords match as substrings
+    ("Remember that I moved", "memory_update"),
+    ("Compare my moods", "analysis"),
+    ("What happened yesterday?", "complex_multi"),
+    ("hello there", "simple_recall"),
+])
+def test_analyze_intent(planner, query, intent):
+    """Test intent keywords are checked in priority order."""
+    assert planner._analyze_intent(_QueryFeatures.from_query(query))[0] == intent
+
+
+@pytest.mark.parametrize("query", [
+    "who am i and what do i like",
+    "please update my timezone",
+    "remember to compare trends",
+    "nothing to see",
+])
+def test_match_intent_automaton_agrees_with_regex(query):
+    """Test the Aho-Corasick matcher picks the same intent as the per-intent regex scan."""
+    pytest.importorskip("ahocorasick")
+    from src.agents import manager
+
+    with patch.object(manager, "_INTENT_AUTOMATON", None):
+        expected = manager._match_intent(query)
+    assert manager._INTENT_AUTOMATON is not None
+    assert manager._match_intent(query) == expected
+
+
+def test_analyze_intent_complexity(planner):
+    """Test complexity follows word count, question count and tool estimate."""
+    assert planner._analyze_intent(_QueryFeatures.from_query("hi"))[1] == "simple"
+    assert planner._analyze_intent(_QueryFeatures.from_query("Who am I?"))[1] == "complex"
+    assert planner._analyze_intent(_QueryFeatures.from_query("remember my pet"))[1] == "medium"
+
+
+def test_create_plan_identity(planner):
+    """Test an identity query gets the KV-first identity plan."""
+    plan = planner.create_plan("What is my name?")
+
+    assert plan.intent == "identity_recall"
+    assert [step.tool for step in plan.steps] == ["kv.get", "semantic.query", "consolidate"]
+    assert plan.rationale.startswith("This complex identity_recall query requires 3 tools")
+    assert plan.confidence == pytest.approx(1.0)
+
+
+def test_health_check(planner):
+    """Test the planner reports itself healthy, building its test plan only once."""
+    with patch.object(planner, "create_plan", wraps=planner.create_plan) as create_plan:
+        assert asyncio.run(planner.health_check()) is True
+        assert asyncio.run(planner.health_check()) is True
+        assert create_plan.call_count == 1
+
+
+def test_query_features():
+    """Test a query is lowercased, tokenized and scanned for questions once up front."""
+    features = _QueryFeatures.from_query("What time is it? Really?")
+
+    assert features.lower == "what time is it? really?"
+    assert features.word_count == 5
+    assert features.question_count == 2
+
+
+def test_plans_share_static_steps(planner):
+    """Test query-independent steps are reused across plans while query steps are rebuilt."""
+    first = planner.create_plan("Compare my moods")
+    second = planner.create_plan("Compare my habits")
+
+    assert first.steps[0].parameters["text"] == "Compare my moods"
+    assert second.steps[0].parameters["text"] == "Compare my habits"
+    assert all(a is b for a, b in zip(first.steps[1:], second.steps[1:]))
+    assert first.steps is not second.steps
+
+
+def test_plan_objects_have_no_instance_dict(planner):
+    """Test plans and steps are slotted (no per-instance __dict__)."""
+    plan = planner.create_plan("hello there")
+
+    assert not hasattr(plan, "__dict__")
+    assert not hasattr(plan.steps[0], "__dict__")
+
+
+@pytest.mark.parametrize("query,confidence", [
+    ("hello there", 0.9),                 # 2 distinct supported tools
+    ("Compare my moods", 0.9),            # 4 steps, 4 distinct tools
+    ("What happened yesterday?", 0.8),    # reason.analyze repeats: no availability bonus
+])
+def test_calculate_confidence(planner, query, confidence):
+    """Test confidence adjustments for step count, tool diversity and tool support."""
+    plan = planner.create_plan(query)
+    assert plan.confidence == pytest.approx(confidence)
+
+
+def test_calculate_confidence_unsupported_tool(planner):
+    """Test an unknown tool forfeits the all-supported bonus."""
+    steps = [
+        ExecutionStep(tool="semantic.query", parameters={}, description=""),
+        ExecutionStep(tool="web.search", parameters={}, description=""),
+    ]
+    assert planner._calculate_confidence(steps, "q") == pytest.approx(0.8)
+
+
+@pytest.mark.parametrize("query,suffix", [
+    ("Remember that I moved", "Memory updates require careful validation before canonical changes."),
+    ("hello there", "Plan uses 2 tools to safely retrieve and synthesize information."),
+])
+def test_generate_rationale(planner, query, suffix):
+    """Test the rationale lists the plan's tools and closes with the intent's sentence."""
+    plan = planner.create_plan(query)
+
+    tools = ", ".join(step.tool for step in plan.steps)
+    assert plan.rationale == (
+        f"This {plan.complexity} {plan.intent} query requires {len(plan.steps)} tools ({tools}). {suffix}"
+    )
+
+
+def test_rationale_and_confidence_are_lazy(planner):
+    """Test creating a plan skips rationale/confidence until first read, then memoizes them."""
+    with patch.object(planner, "_generate_rationale", wraps=planner._generate_rationale) as rationale, \
+            patch.object(planner, "_calculate_confidence", wraps=planner._calculate_confidence) as confidence:
+        plan = planner.create_plan("Compare my moods")
+        assert rationale.call_count == 0 and confidence.call_count == 0
+
+        assert plan.rationale == plan.rationale
+        assert plan.confidence == plan.confidence
+        assert rationale.call_count == 1 and confidence.call_count == 1
@@ -3,6 +3,7 @@ Stage 2 scope only. Do not implement beyond this file's responsibilities.
 Vector memory overlay - non-canonical, advisory layer over SQLite canonical truth.
 """
 
+import numpy as np
 import pytest
 from unittest.mock import MagicMock, patch
 from scripts.rebuild_index import main
@@ -14,10 +15,14 @@ import sys
 def mock_deps():
     """Mock dependencies for rebuild index testing."""
     with patch('scripts.rebuild_index.are_vector_features_enabled') as mock_enabled, \
-         patch('scripts.rebuild_index.list_keys') as mock_list_keys, \
+         patch('scripts.rebuild_index.iter_kv_records') as mock_iter_records, \
          patch('scripts.rebuild_index.get_vector_store') as mock_get_store, \
          patch('scripts.rebuild_index.get_embedding_provider') as mock_get_embed, \
-         patch('scripts.rebuild_index.init_db') as mock_init_db:
+         patch('scripts.rebuild_index.init_db') as mock_init_db, \
+         patch('scripts.rebuild_index.get_vector_meta') as mock_get_meta, \
+         patch('scripts.rebuild_index.set_vector_meta') as mock_set_meta, \
+         patch('scripts.rebuild_index.list_keys_updated_since') as mock_updated_since, \
+         patch('scripts.rebuild_index.get_kv_count') as mock_kv_count:
 
         # Mock enabled
         mock_enabled.return_value = True
@@ -29,7 +34,10 @@ def mock_deps():
             MagicMock(key="sensitive_key", value="secret_value", source="test", casing="upper",
                      sensitive=True, updated_at=MagicMock(isoformat=lambda: "2025-01-26")),
         ]
-        mock_list_keys.return_value = mock_kv_pairs
+        # Sensitive rows are filtered in SQL by iter_kv_records
+        mock_iter_records.side_effect = lambda user_id, include_sensitive=False: iter(
+            [kv for kv in mock_kv_pairs if include_sensitive or not kv.sensitive]
+        )
 
         # Mock providers
         mock_vector_store = MagicMock()
@@ -38,13 +46,26 @@ def mock_deps():
         mock_get_store.return_value = mock_vector_store
         mock_get_embed.return_value = mock_embedding_provider
 
+        # Local provider by default (serial embedding)
+        mock_embedding_provider.is_remote = False
+
         # Mock embedding
         mock_embedding_provider.embed_text.return_value = [0.1] * 384
+        mock_embedding_provider.embed_texts.side_effect = lambda texts: [[0.1] * 384 for _ in texts]
+
+        # No previous rebuild recorded by default
+        mock_get_meta.return_value = None
+        mock_updated_since.return_value = []
+        mock_kv_count.side_effect = lambda user_id=None: len(mock_kv_pairs)
 
         yield {
             'vector_store': mock_vector_store,
             'embedding_provider': mock_embedding_provider,
             'kv_pairs': mock_kv_pairs,
+            'get_meta': mock_get_meta,
+            'set_meta': mock_set_meta,
+            'updated_since': mock_updated_since,
+            'kv_count': mock_kv_count,
         }
 
 
@@ -58,7 +79,7 @@ def test_rebuild_index_successful(capfd, mock_deps):
     assert "Starting vector index rebuild..." in captured.out
     assert "✓ Cleared existing vector index" in captured.out
     assert "Found 2 KV pairs in canonical store" in captured.out
-    assert "Re-embedding 1 non-sensitive KV pairs" in captured.out
+    assert "Re-embedding non-sensitive KV pairs" in captured.out
     assert "✓ Successfully rebuilt index with 1 vectors" in captured.out
     assert "✓ Verification search returned" in captured.out
     assert "Index rebuild complete!" in captured.out
@@ -66,20 +87,19 @@ def test_rebuild_index_successful(capfd, mock_deps):
     # Verify interactions
     mock_deps['vector_store'].clear.assert_called_once()
 
-    # Should embed for content and verification
-    assert mock_deps['embedding_provider'].embed_text.call_count == 2
+    # Content is embedded in one batched call
+    mock_deps['embedding_provider'].embed_texts.assert_called_once_with(["normal_key: normal_value"])
+    # Verification reuses the last embedding instead of embedding a probe query
+    mock_deps['embedding_provider'].embed_text.assert_not_called()
 
-    # First call: content embedding
-    calls = mock_deps['embedding_provider'].embed_text.call_args_list
-    assert "normal_key: normal_value" == calls[0][0][0]
-    # Second call: verification
-    assert "test" == calls[1][0][0]
-
-    # Verify add called once
-    mock_deps['vector_store'].add.assert_called_once()
+    # Verify the batch was added in one call
+    mock_deps['vector_store'].batch_add.assert_called_once()
+    mock_deps['vector_store'].add.assert_not_called()
 
     # Verify verification search
-    mock_deps['vector_store'].search.assert_called_once_with([0.1] * 384, k=1)
+    search_args = mock_deps['vector_store'].search.call_args
+    assert list(search_args.args[0]) == pytest.approx([0.1] * 384)
+    assert search_args.kwargs == {"top_k": 1}
 
 
 def test_rebuild_index_no_vector_features(capfd):
@@ -95,7 +115,6 @@ def test_rebuild_index_no_vector_features(capfd):
 def test_rebuild_index_no_providers(capfd):
     """Test rebuild exits when providers unavailable."""
     with patch('scripts.rebuild_index.are_vector_features_enabled', return_value=True), \
-         patch('scripts.rebuild_index.list_keys', return_value=[]), \
          patch('scripts.rebuild_index.get_vector_store', return_value=None), \
          patch('scripts.rebuild_index.get_embedding_provider', return_value=None):
 
@@ -121,7 +140,8 @@ def test_rebuild_index_clear_failure(capfd, mock_deps):
 def test_rebuild_index_empty_kv(capfd):
     """Test rebuild with empty KV store."""
     with patch('scripts.rebuild_index.are_vector_features_enabled', return_value=True), \
-         patch('scripts.rebuild_index.list_keys', return_value=[]), \
+         patch('scripts.rebuild_index.get_kv_count', return_value=0), \
+         patch('scripts.rebuild_index.set_vector_meta'), \
          patch('scripts.rebuild_index.get_vector_store') as mock_get_store, \
          patch('scripts.rebuild_index.get_embedding_provider') as mock_get_embed:
 
@@ -139,17 +159,105 @@ def test_rebuild_index_empty_kv(capfd):
 
 def test_rebuild_index_embed_failure(capfd, mock_deps):
     """Test rebuild continues despite embedding failure."""
-    # Make embedding fail on first call
-    mock_deps['embedding_provider'].embed_text.side_effect = [Exception("Embed failed"), [0.1] * 384]
+    # Make the batched content embedding fail
+    mock_deps['embedding_provider'].embed_texts.side_effect = Exception("Embed failed")
 
     main()
 
     captured = capfd.readouterr()
-    assert "ERROR: Failed to embed KV pair normal_key: Embed failed" in captured.out
+    assert "ERROR: Failed to embed batch of 1 KV pairs starting at normal_key: Embed failed" in captured.out
     # Should still succeed with 0 entries (since processing fails)
     assert "✓ Successfully rebuilt index with 0 vectors" in captured.out
 
 
+def test_rebuild_index_batches_embeddings(capfd, mock_deps):
+    """Test content is embedded in REBUILD_BATCH_SIZE chunks."""
+    mock_deps['kv_pairs'][:] = [
+        MagicMock(key=f"key_{i}", value=f"value_{i}", source="test", casing="lower",
+                  sensitive=False, updated_at=MagicMock(isoformat=lambda: "2025-01-26"))
+        for i in range(5)
+    ]
+
+    with patch('scripts.rebuild_index.REBUILD_BATCH_SIZE', 2):
+        main()
+
+    batch_sizes = [len(c[0][0]) for c in mock_deps['embedding_provider'].embed_texts.call_args_list]
+    assert batch_sizes == [2, 2, 1]
+    added_sizes = [len(c[0][0]) for c in mock_deps['vector_store'].batch_add.call_args_list]
+    assert added_sizes == [2, 2, 1]
+
+    captured = capfd.readouterr()
+    assert "✓ Successfully rebuilt index with 5 vectors" in captured.out
+
+
+def test_rebuild_index_records_watermark(mock_deps):
+    """Test a full rebuild stores the last-rebuild watermark."""
+    main()
+
+    name, value = mock_deps['set_meta'].call_args[0]
+    assert name == "last_rebuild_ts"
+    assert len(value) == len("2025-01-26 12:00:00")
+
+
+def test_rebuild_index_incremental_upserts_changed_keys(capfd, mock_deps):
+    """Test incremental rebuild re-embeds changed keys and drops tombstones without clearing."""
+    mock_deps['get_meta'].return_value = "2025-01-26 00:00:00"
+    mock_deps['kv_count'].side_effect = None
+    mock_deps['kv_count'].return_value = 10
+    mock_deps['updated_since'].return_value = [
+        MagicMock(key="changed_key", value="new_value", source="test", casing="lower",
+                  sensitive=False, updated_at="2025-01-26 01:00:00"),
+        MagicMock(key="deleted_key", value="", source="test", casing="lower",
+                  sensitive=False, updated_at="2025-01-26 01:00:00"),
+    ]
+
+    main(incremental=True)
+
+    mock_deps['vector_store'].clear.assert_not_called()
+    deleted = [c[0][0] for c in mock_deps['vector_store'].delete.call_args_list]
+    assert deleted == ["changed_key", "deleted_key"]
+    mock_deps['embedding_provider'].embed_texts.assert_called_once_with(["changed_key: new_value"])
+    mock_deps['set_meta'].assert_called_once()
+
+    captured = capfd.readouterr()
+    assert "1 re-embedded, 1 removed" in captured.out
+
+
+def test_rebuild_index_incremental_large_delta_falls_back(capfd, mock_deps):
+    """Test incremental rebuild falls back to full rebuild when too many keys changed."""
+    mock_deps['get_meta'].return_value = "2025-01-26 00:00:00"
+    mock_deps['updated_since'].return_value = [
+        MagicMock(key=f"key_{i}", value="v", source="test", casing="lower",
+                  sensitive=False, updated_at="2025-01-26 01:00:00")
+        for i in range(5)
+    ]
+
+    main(incremental=True)
+
+    mock_deps['vector_store'].clear.assert_called_once()
+    captured = capfd.readouterr()
+    assert "falling back to full rebuild" in captured.out
+    assert "✓ Successfully rebuilt index with 1 vectors" in captured.out
+
+
+def test_rebuild_index_incremental_without_deletion_falls_back(capfd, mock_deps):
+    """Test incremental rebuild falls back when the store cannot delete (FAISS)."""
+    mock_deps['get_meta'].return_value = "2025-01-26 00:00:00"
+    mock_deps['kv_count'].side_effect = None
+    mock_deps['kv_count'].return_value = 10
+    mock_deps['updated_since'].return_value = [
+        MagicMock(key="changed_key", value="v", source="test", casing="lower",
+                  sensitive=False, updated_at="2025-01-26 01:00:00"),
+    ]
+    mock_deps['vector_store'].delete.side_effect = NotImplementedError
+
+    main(incremental=True)
+
+    mock_deps['vector_store'].clear.assert_called_once()
+    captured = capfd.readouterr()
+    assert "does not support deletion" in captured.out
+
+
 def test_rebuild_index_verification_failure(capfd, mock_deps):
     """Test rebuild completes despite verification failure."""
     mock_deps['vector_store'].search.side_effect = Exception("Search failed")
@@ -159,3 +267,133 @@ def test_rebuild_index_verification_failure(capfd, mock_deps):
     captured = capfd.readouterr()
     assert "✓ Successfully rebuilt index with 1 vectors" in captured.out
     assert "WARNING: Verification search failed: Search failed" in captured.out
+
+
+def test_rebuild_index_skips_when_validation_passes(capfd, mock_deps):
+    """Test full rebuild is skipped when the index validates cleanly."""
+    mock_deps['get_meta'].return_value = "2025-01-26 00:00:00"
+    healthy = MagicMock(issues_found=0, errors=[])
+
+    with patch('src.core.maintenance.validate_vector_index', return_value=healthy):
+        main()
+
+    mock_deps['vector_store'].clear.assert_not_called()
+    captured = capfd.readouterr()
+    assert "skipping rebuild" in captured.out
+
+
+def test_rebuild_index_skips_healthy_index_unmocked_validation(capfd, mock_deps, tmp_path):
+    """Test a healthy saved store takes the early exit through the real validation."""
+    from src.core import db
+    from src.core.dao import set_key
+    from src.vector.index import SimpleInMemoryVectorStore
+    from src.vector.types import VectorRecord
+
+    mock_deps['get_meta'].return_value = "2025-01-26 00:00:00"
+    store = SimpleInMemoryVectorStore()
+    store.add(VectorRecord(id="displayName", vector=np.full(384, 0.1), metadata={}))
+
+    with patch.object(db, 'DB_PATH', str(tmp_path / "memory.db")), \
+         patch('src.core.maintenance.MAINTENANCE_ENABLED', True), \
+         patch('src.core.maintenance.are_vector_features_enabled', return_value=True), \
+         patch('scripts.rebuild_index.get_vector_store', return_value=store):
+        db.init_db()
+        # Keys from a non-default user must be readable by validation too
+        set_key("alice", "displayName", "Alice", "test", "preserve")
+        main()
+        db.close_cached_connections()
+
+    captured = capfd.readouterr()
+    assert "skipping rebuild" in captured.out
+    assert len(store.export_data()["vectors"]) == 1
+
+
+def test_rebuild_index_rebuilds_empty_index_with_live_keys(capfd, mock_deps, tmp_path):
+    """Test an empty saved store with live KV entries fails validation and is rebuilt."""
+    from src.core import db
+    from src.core.dao import set_key
+    from src.vector.index import SimpleInMemoryVectorStore
+
+    mock_deps['get_meta'].return_value = "2025-01-26 00:00:00"
+    store = SimpleInMemoryVectorStore()
+
+    with patch.object(db, 'DB_PATH', str(tmp_path / "memory.db")), \
+         patch('src.core.maintenance.MAINTENANCE_ENABLED', True), \
+         patch('src.core.maintenance.are_vector_features_enabled', return_value=True), \
+         patch('scripts.rebuild_index.get_vector_store', return_value=store):
+        db.init_db()
+        for i in range(5):
+            set_key("default", f"key{i}", f"value{i}", "test", "preserve")
+        main()
+        db.close_cached_connections()
+
+    captured = capfd.readouterr()
+    assert "Vector count mismatch: 0 indexed vs 5 live KV entries" in captured.out
+    assert "skipping rebuild" not in captured.out
+
+
+def test_rebuild_index_force_ignores_validation(capfd, mock_deps):
+    """Test --force rebuilds without consulting validation."""
+    mock_deps['get_meta'].return_value = "2025-01-26 00:00:00"
+
+    with patch('src.core.maintenance.validate_vector_index') as mock_validate:
+        main(force=True)
+
+    mock_validate.assert_not_called()
+    mock_deps['vector_store'].clear.assert_called_once()
+
+
+def test_rebuild_index_rebuilds_when_validation_finds_issues(capfd, mock_deps):
+    """Test a failing validation still triggers the full rebuild."""
+    mock_deps['get_meta'].return_value = "2025-01-26 00:00:00"
+    unhealthy = MagicMock(issues_found=2, errors=["Vector data inconsistency"])
+
+    with patch('src.core.maintenance.validate_vector_index', return_value=unhealthy):
+        main()
+
+    mock_deps['vector_store'].clear.assert_called_once()
+    captured = capfd.readouterr()
+    assert "found 2 issues" in captured.out
+
+
+def test_rebuild_index_remote_provider_embeds_concurrently_in_order(capfd, mock_deps):
+    """Test remote providers embed batches concurrently while keeping key/vector alignment."""
+    mock_deps['embedding_provider'].is_remote = True
+    mock_deps['embedding_provider'].embed_texts.side_effect = lambda texts: [
+        [float(text.split(":")[0].split("_")[1])] * 384 for text in texts
+    ]
+    pairs = [
+        MagicMock(key=f"key_{i}", value="v", source="test", casing="lower",
+                  sensitive=False, updated_at="2025-01-26 00:00:00")
+        for i in range(10)
+    ]
+
+    with patch('scripts.rebuild_index.REBUILD_BATCH_SIZE', 2), \
+         patch('scripts.rebuild_index.EMBED_CONCURRENCY', 3):
+        from scripts.rebuild_index import embed_and_add
+        count, _ = embed_and_add(mock_deps['vector_store'], mock_deps['embedding_provider'], pairs)
+
+    assert count == 10
+    added = [record for call in mock_deps['vector_store'].batch_add.call_args_list for record in call.args[0]]
+    assert [record.id for record in added] == [f"key_{i}" for i in range(10)]
+    assert all(record.vector[0] == int(record.id.split("_")[1]) for record in added)
+
+
+def test_rebuild_index_summarizes_errors_after_progress(capfd, mock_deps):
+    """Test batch failures are reported once, capped, after embedding finishes."""
+    mock_deps['embedding_provider'].embed_texts.side_effect = Exception("Embed failed")
+    pairs = [
+        MagicMock(key=f"key_{i}", value="v", source="test", casing="lower",
+                  sensitive=False, updated_at="2025-01-26 00:00:00")
+        for i in range(5)
+    ]
+
+    with patch('scripts.rebuild_index.REBUILD_BATCH_SIZE', 1), \
+         patch('scripts.rebuild_index.MAX_REPORTED_ERRORS', 2):
+        from scripts.rebuild_index import embed_and_add
+        count, _ = embed_and_add(mock_deps['vector_store'], mock_deps['embedding_provider'], pairs)
+
+    assert count == 0
+    captured = capfd.readouterr()
+    assert captured.out.count("ERROR: Failed to embed batch") == 2
+    assert "ERROR: ... and 3 more failed batches" in captured.out
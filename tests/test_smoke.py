@@ -5,6 +5,7 @@ DO NOT IMPLEMENT BEYOND STAGE 1 SCOPE
 import os
 import tempfile
 import pytest
+from unittest.mock import patch
 from datetime import datetime
 
 # Set up test environment with temporary database
@@ -12,13 +13,24 @@ TEST_DB_PATH = tempfile.mkstemp(suffix='.db')[1]
 os.environ['DB_PATH'] = TEST_DB_PATH
 
 from src.core.config import DB_PATH, DEBUG
-from src.core.db import init_db, health_check, get_db
+from src.core.db import init_db, health_check, get_db, write_transaction, get_conn, close_cached_connections, call_after_commit
 from src.core.dao import (
     get_key,
     set_key,
     list_keys,
     delete_key,
+    delete_keys,
+    delete_keys_like,
+    iter_keys,
+    iter_kv_records,
+    list_keys_updated_since,
+    list_keys_redacted,
+    list_keys_page,
+    get_vector_meta,
+    set_vector_meta,
     add_event,
+    add_events_bulk,
+    dump_payload,
     list_events,
     get_kv_count
 )
@@ -127,6 +139,99 @@ def test_kv_list():
     assert "list_test_1" not in key_names, "Tombstoned key should be excluded"
     assert "list_test_2" in key_names, "Non-tombstone key should be included"
 
+    # Rows unpack positionally into KVRecord; every field must land in the right slot
+    record = next(k for k in keys if k.key == "list_test_2")
+    assert (record.value, record.source, record.casing, record.sensitive) == ("value2", "test", "lowercase", False)
+    assert record.updated_at
+    assert not hasattr(record, "__dict__")
+
+def test_kv_iter_keys():
+    """Test streaming key names with optional prefix filter."""
+    set_key(user_id="iter_user", key="iter_a", value="1", source="test", casing="lowercase")
+    set_key(user_id="iter_user", key="iter_b", value="2", source="test", casing="lowercase")
+    set_key(user_id="iter_user", key="other*", value="3", source="test", casing="lowercase")
+    set_key(user_id="iter_user", key="otherwise", value="4", source="test", casing="lowercase")
+    delete_key("iter_user", "iter_b")
+
+    assert sorted(iter_keys("iter_user", batch_size=1)) == ["iter_a", "other*", "otherwise"]
+    assert list(iter_keys("iter_user", prefix="iter_")) == ["iter_a"]
+    assert list(iter_keys("iter_user", prefix="other*")) == ["other*"], "Prefix should match literally"
+    assert list(iter_keys("")) == []
+
+def test_kv_iter_kv_records():
+    """Test record streaming skips tombstones and, by default, sensitive rows."""
+    set_key(user_id="iter_records_user", key="plain_1", value="v1", source="test", casing="lowercase")
+    set_key(user_id="iter_records_user", key="plain_2", value="v2", source="test", casing="lowercase")
+    set_key(user_id="iter_records_user", key="secret", value="s", source="test", casing="lowercase", sensitive=True)
+    delete_key("iter_records_user", "plain_2")
+
+    records = list(iter_kv_records("iter_records_user", batch_size=1))
+    assert [r.key for r in records] == ["plain_1"]
+    assert records[0].value == "v1"
+
+    with_sensitive = {r.key for r in iter_kv_records("iter_records_user", include_sensitive=True)}
+    assert "secret" in with_sensitive
+
+def test_kv_list_keys_redacted():
+    """Test redacted listing hides sensitive values and skips tombstones."""
+    set_key(user_id="redacted_user", key="plain", value="visible", source="test", casing="lowercase")
+    set_key(user_id="redacted_user", key="secret", value="hunter2", source="test", casing="lowercase", sensitive=True)
+    set_key(user_id="redacted_user", key="gone", value="v", source="test", casing="lowercase")
+    delete_key("redacted_user", "gone")
+
+    records = {r.key: r for r in list_keys_redacted("redacted_user")}
+    assert set(records) == {"plain", "secret"}
+    assert records["plain"].value == "visible"
+    assert records["secret"].value == "***REDACTED***"
+    assert records["secret"].sensitive
+
+def test_kv_list_keys_keyset_pages():
+    """Test keyset paging walks every live key once, in key order."""
+    for key in ("page_c", "page_a", "page_d", "page_b"):
+        set_key(user_id="page_user", key=key, value="v", source="test", casing="lowercase")
+    delete_key("page_user", "page_b")
+
+    for list_fn in (list_keys, list_keys_redacted):
+        first = list_fn("page_user", limit=2)
+        assert [r.key for r in first] == ["page_a", "page_c"]
+        rest = list_fn("page_user", after=first[-1].key, limit=2)
+        assert [r.key for r in rest] == ["page_d"]
+
+def test_kv_list_keys_page_continues_past_denied_sensitive_keys():
+    """Test a page shortened by privacy-denied rows still hands back a cursor to the next page."""
+    from src.core import dao
+    set_key(user_id="denied_user", key="denied_a", value="secret", source="test", casing="lowercase", sensitive=True)
+    for key in ("denied_b", "denied_c"):
+        set_key(user_id="denied_user", key=key, value="v", source="test", casing="lowercase")
+
+    with patch.object(dao, "PRIVACY_ENFORCEMENT_ENABLED", True), \
+            patch.object(dao, "validate_sensitive_access", return_value=False):
+        first, next_after = list_keys_page("denied_user", limit=2)
+        assert [r.key for r in first] == ["denied_b"]
+        assert next_after == "denied_b"
+        rest, next_after = list_keys_page("denied_user", after=next_after, limit=2)
+        assert [r.key for r in rest] == ["denied_c"]
+        assert next_after is None
+
+def test_kv_nonsensitive_scan_uses_partial_index():
+    """Test the non-sensitive record scan is served by the partial index."""
+    with get_db() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT key, value, casing, source, updated_at, sensitive "
+            "FROM kv WHERE user_id = ? AND +value != '' AND NOT sensitive",
+            ("default",)
+        ).fetchall()
+    assert any("idx_kv_user_nonsensitive" in row[-1] for row in plan)
+
+def test_kv_user_count_uses_live_index():
+    """Test the per-user live count is served by the tombstone-excluding partial index."""
+    with get_db() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM kv WHERE user_id = ? AND value != ''",
+            ("default",)
+        ).fetchall()
+    assert any("idx_kv_user_live" in row[-1] for row in plan)
+
 def test_kv_delete():
     """Test tombstone delete functionality."""
     set_key(
@@ -149,6 +254,138 @@ def test_kv_delete():
     assert result is not None  # Key still exists but with empty value
     assert result.value == "", "Value should be empty after deletion"
 
+def test_kv_delete_keys_batch():
+    """Test batched tombstone delete only counts live keys."""
+    set_key(user_id="default", key="batch_delete_1", value="v1", source="test", casing="lowercase")
+    set_key(user_id="default", key="batch_delete_2", value="v2", source="test", casing="lowercase")
+    set_key(user_id="default", key="batch_keep", value="v3", source="test", casing="lowercase")
+    delete_key("default", "batch_delete_2")
+
+    removed = delete_keys("default", ["batch_delete_1", "batch_delete_2", "batch_missing", "batch_delete_1"])
+    assert removed == 1, "Only live keys should be counted as removed"
+
+    assert get_key("default", "batch_delete_1").value == ""
+    assert get_key("default", "batch_keep").value == "v3"
+    assert delete_keys("default", []) == 0
+
+def test_kv_delete_keys_like_pattern():
+    """Test pattern tombstone delete matches by prefix, case-sensitively."""
+    set_key(user_id="default", key="lose_mode_key_1", value="v1", source="test", casing="lowercase")
+    set_key(user_id="default", key="lose_mode_key_2", value="v2", source="test", casing="lowercase")
+    set_key(user_id="default", key="LOSE_MODE_KEY_3", value="v3", source="test", casing="lowercase")
+
+    removed = delete_keys_like("default", "lose_mode_key_*")
+    assert removed == 2
+
+    key_names = [k.key for k in list_keys("default")]
+    assert "lose_mode_key_1" not in key_names
+    assert "LOSE_MODE_KEY_3" in key_names, "GLOB match should be case-sensitive"
+
+    set_key(user_id="default", key="scaffold_a", value="v4", source="test", casing="lowercase")
+    set_key(user_id="default", key="fixture_b", value="v5", source="test", casing="lowercase")
+    assert delete_keys_like("default", ["scaffold_*", "fixture_*", ""]) == 2
+
+def test_kv_delete_keys_executemany_fallback():
+    """Test the pre-RETURNING executemany path tombstones and counts the same keys."""
+    from src.core import dao
+    set_key(user_id="default", key="fallback_1", value="v1", source="test", casing="lowercase")
+    set_key(user_id="default", key="fallback_2", value="v2", source="test", casing="lowercase")
+    set_key(user_id="default", key="fallback_glob_1", value="v3", source="test", casing="lowercase")
+    delete_key("default", "fallback_2")
+
+    original = dao._SQLITE_HAS_RETURNING
+    dao._SQLITE_HAS_RETURNING = False
+    try:
+        assert delete_keys("default", ["fallback_1", "fallback_2", "fallback_missing"]) == 1
+        assert delete_keys_like("default", "fallback_glob_*") == 1
+    finally:
+        dao._SQLITE_HAS_RETURNING = original
+
+    assert get_key("default", "fallback_1").value == ""
+    assert get_key("default", "fallback_glob_1").value == ""
+
+def test_kv_list_keys_updated_since():
+    """Test change listing includes tombstones and hides sensitive values."""
+    with get_db() as conn:
+        since = conn.execute("SELECT CURRENT_TIMESTAMP").fetchone()[0]
+    set_key(user_id="default", key="changed_plain", value="v1", source="test", casing="lowercase")
+    set_key(user_id="default", key="changed_secret", value="s1", source="test", casing="lowercase", sensitive=True)
+    delete_key("default", "changed_plain")
+
+    changed = {kv.key: kv for kv in list_keys_updated_since("default", since)}
+    assert changed["changed_plain"].value == "", "Tombstone should be listed as changed"
+    assert changed["changed_secret"].value == "", "Sensitive values should not be returned"
+    assert list_keys_updated_since("default", "9999-12-31 00:00:00") == []
+
+def test_vector_meta_roundtrip():
+    """Test vector bookkeeping values can be written and overwritten."""
+    name = f"smoke_meta_{datetime.now().timestamp()}"
+    assert get_vector_meta(name) is None
+    assert set_vector_meta(name, "a")
+    assert set_vector_meta(name, "b")
+    assert get_vector_meta(name) == "b"
+
+def test_kv_delete_in_shared_transaction():
+    """Test batched deletes share one transaction and roll back together."""
+    set_key(user_id="default", key="txn_literal", value="v1", source="test", casing="lowercase")
+    set_key(user_id="default", key="txn_prefix_1", value="v2", source="test", casing="lowercase")
+
+    with pytest.raises(RuntimeError):
+        with write_transaction() as conn:
+            assert delete_keys("default", ["txn_literal"], conn=conn) == 1
+            raise RuntimeError("abort")
+    assert get_key("default", "txn_literal").value == "v1", "Rolled back delete should keep value"
+
+    with write_transaction() as conn:
+        removed = delete_keys("default", ["txn_literal"], conn=conn)
+        removed += delete_keys_like("default", "txn_prefix_*", conn=conn)
+    assert removed == 2
+    assert get_key("default", "txn_prefix_1").value == ""
+
+def test_kv_cache_cleared_after_shared_transaction_commits():
+    """Test a get_key racing an uncommitted delete cannot leave the old value cached."""
+    set_key(user_id="default", key="txn_cached", value="v1", source="test", casing="lowercase")
+
+    with write_transaction() as conn:
+        assert delete_keys("default", ["txn_cached"], conn=conn) == 1
+        # Another connection still sees (and may cache) the committed row
+        assert get_key("default", "txn_cached").value == "v1"
+    assert get_key("default", "txn_cached").value == ""
+
+def test_kv_delete_vectors_removed_only_after_commit():
+    """Test tombstoned keys lose their vectors after COMMIT, and keep them on rollback."""
+    from src.core import dao
+    set_key(user_id="default", key="txn_vector", value="v1", source="test", casing="lowercase")
+
+    with patch.object(dao, "_remove_key_vectors") as remove_vectors:
+        with pytest.raises(RuntimeError):
+            with write_transaction() as conn:
+                delete_keys("default", ["txn_vector"], conn=conn)
+                raise RuntimeError("abort")
+        remove_vectors.assert_not_called()
+
+        with write_transaction() as conn:
+            delete_key("default", "txn_vector", conn=conn)
+            remove_vectors.assert_not_called()
+        remove_vectors.assert_called_once_with("default", ["txn_vector"])
+
+def test_call_after_commit_skips_rolled_back_transactions():
+    """Test after-commit callbacks run on COMMIT only, and need an open write_transaction."""
+    calls = []
+    with write_transaction() as conn:
+        assert call_after_commit(conn, lambda: calls.append("committed"))
+        assert calls == []
+    assert calls == ["committed"]
+
+    with pytest.raises(RuntimeError):
+        with write_transaction() as conn:
+            call_after_commit(conn, lambda: calls.append("rolled back"))
+            raise RuntimeError("abort")
+    assert calls == ["committed"]
+
+    with get_db() as conn:
+        assert call_after_commit(conn, lambda: None) is False
+
 def test_episodic_add_and_list():
     """Test episodic event logging."""
     # Add events
@@ -170,6 +407,63 @@ def test_episodic_add_and_list():
     events = list_events("default")
     assert len(events) >= 2, "Should have at least two events"
 
+def test_episodic_compact_payload_roundtrip():
+    """Test dump_payload emits whitespace-free JSON that list_events parses back."""
+    payload = dump_payload({"query": "weather", "tools": ["search", "memory"], "count": 2})
+    assert " " not in payload
+
+    add_event(user_id="payload_user", actor="test_actor", action="compact", payload=payload)
+
+    events = list_events("payload_user")
+    assert events[0].payload == {"query": "weather", "tools": ["search", "memory"], "count": 2}
+
+def test_episodic_add_events_bulk_in_shared_transaction():
+    """Test bulk episodic inserts in a caller-owned transaction."""
+    with write_transaction() as conn:
+        added = add_events_bulk("bulk_user", [
+            ("heartbeat", "drift_detected", '{"kv_key": "a"}'),
+            ("heartbeat", "drift_detected", '{"kv_key": "b"}'),
+        ], conn=conn)
+        assert added == 2
+
+    events = list_events("bulk_user")
+    assert len(events) == 2
+    assert {e.action for e in events} == {"drift_detected"}
+
+    assert add_events_bulk("bulk_user", []) == 0
+
+def test_episodic_batched_writes_flush_before_reads():
+    """Test queued add_event writes land in one batch and are visible to list_events."""
+    from src.core import dao
+
+    dao.EPISODIC_WRITE_BATCHING = True
+    try:
+        for i in range(5):
+            assert add_event("queued_user", "user", "queued", f"payload {i}") is True
+        events = list_events("queued_user")
+    finally:
+        dao.EPISODIC_WRITE_BATCHING = False
+
+    assert len(events) == 5
+    assert {e.action for e in events} == {"queued"}
+    assert dao._event_queue.unfinished_tasks == 0
+
+def test_get_key_cache_invalidated_by_writes():
+    """Test cached get_key results are returned as copies and dropped on DAO writes."""
+    from src.core import dao
+
+    set_key("cache_user", "cached", "one", "test", "lowercase")
+    first = get_key("cache_user", "cached")
+    first.value = "mutated"
+    assert get_key("cache_user", "cached").value == "one"
+    assert ("cache_user", "cached", dao.config_module.KEY_NORMALIZATION_STRICT) in dao._kv_cache
+
+    set_key("cache_user", "cached", "two", "test", "lowercase")
+    assert get_key("cache_user", "cached").value == "two"
+
+    delete_key("cache_user", "cached")
+    assert get_key("cache_user", "cached").value == ""
+
 def test_kv_count():
     """Test KV count functionality."""
     # Clear existing data to ensure clean test state
@@ -189,6 +483,127 @@ def test_kv_count():
     count = get_kv_count()
     assert count == 1, "Should only count non-tombstone entries"
 
+def test_kv_count_counter_tracks_writes():
+    """Test the trigger-maintained kv_stats counter matches a full count through every write path."""
+    def scanned():
+        with get_db() as conn:
+            return conn.execute("SELECT COUNT(*) FROM kv WHERE value != ''").fetchone()[0]
+
+    set_key("stats_user", "stats_a", "1", "test", "lowercase")
+    set_key("stats_user", "stats_b", "2", "test", "lowercase")
+    assert get_kv_count() == scanned()
+
+    set_key("stats_user", "stats_a", "updated", "test", "lowercase")  # live -> live
+    delete_key("stats_user", "stats_a")  # live -> tombstone
+    delete_key("stats_user", "stats_a")  # already tombstoned
+    assert get_kv_count() == scanned()
+
+    set_key("stats_user", "stats_a", "revived", "test", "lowercase")  # tombstone -> live
+    with get_db() as conn:
+        conn.execute("DELETE FROM kv WHERE user_id = 'stats_user' AND key = 'stats_b'")
+        conn.commit()
+    assert get_kv_count() == scanned()
+
+def test_cached_connection_reused_per_thread():
+    """Test get_conn returns one connection per thread until the cache is closed."""
+    import threading
+
+    conn = get_conn()
+    assert get_conn() is conn
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+    assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+    assert conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0] == 1000
+
+    other = []
+    worker = threading.Thread(target=lambda: other.append(get_conn()))
+    worker.start()
+    worker.join()
+    assert other[0] is not conn
+
+    close_cached_connections()
+    assert get_conn() is not conn
+    close_cached_connections()
+
+def test_get_db_pools_connections():
+    """Test get_db reuses connections, isolates nested blocks and drops uncommitted work."""
+    with get_db() as conn:
+        pass
+    with get_db() as again:
+        assert again is conn
+        # Nested blocks must not share the outer block's transaction
+        with get_db() as nested:
+            assert nested is not again
+
+    with get_db() as conn:
+        conn.execute("INSERT INTO vector_meta (name, value) VALUES ('pool_uncommitted', 'x')")
+    assert get_vector_meta("pool_uncommitted") is None
+
+    close_cached_connections()
+    with get_db() as fresh:
+        assert fresh is not conn
+
+def test_close_cached_connections_closes_other_threads():
+    """Test close_cached_connections retires connections cached and pooled by other threads."""
+    import sqlite3
+    import threading
+    opened = []
+
+    def open_connections():
+        opened.append(get_conn())
+        with get_db() as conn:
+            opened.append(conn)
+
+    worker = threading.Thread(target=open_connections)
+    worker.start()
+    worker.join()
+
+    close_cached_connections()
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+def _create_pre_scoping_db(path, with_episodic=True):
+    """Create a database with the old global (no user_id) schema."""
+    import sqlite3
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE kv (key TEXT PRIMARY KEY, value TEXT, casing TEXT, source TEXT, "
+                 "updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, sensitive BOOLEAN DEFAULT FALSE)")
+    conn.execute("INSERT INTO kv (key, value, casing, source) VALUES ('legacy', 'v', 'lowercase', 'test')")
+    if with_episodic:
+        conn.execute("CREATE TABLE episodic (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                     "ts TIMESTAMP DEFAULT CURRENT_TIMESTAMP, actor TEXT, action TEXT, payload TEXT)")
+        conn.execute("INSERT INTO episodic (actor, action, payload) VALUES ('user', 'legacy', '{}')")
+    conn.commit()
+    conn.close()
+
+def test_migrate_to_user_scoping_single_transaction():
+    """Test migration moves both tables to user 'default', and rolls back entirely on failure."""
+    import sqlite3
+    from unittest.mock import patch
+    from src.core.db import migrate_to_user_scoping
+
+    ok_path = tempfile.mkstemp(suffix='.db')[1]
+    _create_pre_scoping_db(ok_path)
+    with patch('src.core.db.DB_PATH', ok_path):
+        assert migrate_to_user_scoping() is True
+    conn = sqlite3.connect(ok_path)
+    assert conn.execute("SELECT user_id, key FROM kv").fetchall() == [("default", "legacy")]
+    assert conn.execute("SELECT user_id, action FROM episodic").fetchall() == [("default", "legacy")]
+    assert conn.execute("SELECT live_count FROM kv_stats").fetchone()[0] == 1
+    conn.close()
+
+    # Missing episodic table makes the second step fail after kv was rebuilt
+    bad_path = tempfile.mkstemp(suffix='.db')[1]
+    _create_pre_scoping_db(bad_path, with_episodic=False)
+    with patch('src.core.db.DB_PATH', bad_path):
+        assert migrate_to_user_scoping() is False
+    conn = sqlite3.connect(bad_path)
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    kv_columns = [row[1] for row in conn.execute("PRAGMA table_info(kv)")]
+    conn.close()
+    assert "kv_new" not in tables and "episodic_new" not in tables
+    assert "user_id" not in kv_columns
+
 def test_database_schema():
     """Test database schema integrity."""
     # Ensure tables exist
@@ -214,9 +629,28 @@ if __name__ == "__main__":
     test_kv_update_timestamp()
     test_kv_sensitive_flag()
     test_kv_list()
+    test_kv_iter_keys()
+    test_kv_iter_kv_records()
+    test_kv_list_keys_redacted()
+    test_kv_list_keys_keyset_pages()
+    test_kv_nonsensitive_scan_uses_partial_index()
+    test_kv_user_count_uses_live_index()
     test_kv_delete()
+    test_kv_delete_keys_batch()
+    test_kv_delete_keys_like_pattern()
+    test_kv_delete_keys_executemany_fallback()
+    test_kv_list_keys_updated_since()
+    test_vector_meta_roundtrip()
+    test_kv_delete_in_shared_transaction()
     test_episodic_add_and_list() 
+    test_episodic_add_events_bulk_in_shared_transaction()
+    test_episodic_batched_writes_flush_before_reads()
+    test_get_key_cache_invalidated_by_writes()
     test_kv_count()
+    test_kv_count_counter_tracks_writes()
+    test_cached_connection_reused_per_thread()
+    test_get_db_pools_connections()
+    test_migrate_to_user_scoping_single_transaction()
     test_database_schema()
     
     print("All smoke tests passed!")
@@ -146,6 +146,34 @@ class TestStage3Integration:
 
         print("✓ 'propose' mode correctly logs proposals without executing changes")
 
+    def test_correction_events_written_in_one_batch(self):
+        """Test a correction run logs all its audit events with one bulk insert."""
+        from src.core.drift_rules import CorrectionPlan, CorrectionAction
+        plan = CorrectionPlan(
+            id="batch-test-plan",
+            finding_id="test-finding",
+            actions=[CorrectionAction(type="ADD_VECTOR", key="batch_a", metadata={}),
+                     CorrectionAction(type="REMOVE_VECTOR", key="batch_b", metadata={})],
+            preview={}
+        )
+
+        with patch('src.core.corrections.get_correction_mode', return_value='propose'), \
+             patch('src.core.corrections.are_vector_features_enabled', return_value=True), \
+             patch('src.core.corrections.get_vector_store', return_value=MagicMock()), \
+             patch('src.core.corrections.get_embedding_provider', return_value=MagicMock()), \
+             patch('src.core.corrections.add_event') as mock_add_event, \
+             patch('src.core.corrections.add_events_bulk') as mock_bulk:
+
+            apply_corrections([plan])
+
+        mock_add_event.assert_not_called()
+        mock_bulk.assert_called_once()
+        user_id, events = mock_bulk.call_args.args
+        assert user_id == "system"
+        assert [action for _, action, _ in events] == [
+            "correction_plan_started", "correction_proposed", "correction_proposed"
+        ]
+
     @patch('src.core.drift_rules.are_vector_features_enabled', return_value=True)
     @patch('src.core.drift_rules.get_drift_ruleset', return_value='lenient')
     def test_drift_ruleset_differentiation(self, mock_ruleset, mock_enabled):
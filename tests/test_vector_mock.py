@@ -179,5 +179,49 @@ def test_empty_search():
     assert len(results) == 0
 
 
+
+@pytest.mark.parametrize("dtype", ["fp16", "int8"])
+def test_reduced_precision_matches_fp32(dtype):
+    """Test fp16/int8 storage ranks like fp32 with near-identical cosine scores."""
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(50, 64)).astype(np.float32)
+    records = [VectorRecord(id=f"rec_{i}", vector=v, metadata={}) for i, v in enumerate(vectors)]
+
+    full_store = SimpleInMemoryVectorStore()
+    reduced_store = SimpleInMemoryVectorStore(dtype=dtype)
+    full_store.batch_add(records)
+    reduced_store.batch_add(records)
+
+    full_results = full_store.search(vectors[7], top_k=3)
+    reduced_results = reduced_store.search(vectors[7], top_k=3)
+
+    assert reduced_results[0].id == "rec_7"
+    assert abs(reduced_results[0].score - full_results[0].score) < 0.01
+
+
+@pytest.mark.parametrize("dtype", ["fp16", "int8"])
+def test_reduced_precision_keeps_only_quantized_copy(dtype):
+    """Test fp16/int8 stores drop the float32 vector and export one decoded from the index."""
+    vector = np.array([3.0, 4.0, 0.0], dtype=np.float32)
+    store = SimpleInMemoryVectorStore(dtype=dtype)
+    store.add(VectorRecord(id="rec", vector=vector, metadata={"k": "v"}))
+
+    assert store._vectors["rec"].vector is None
+    exported = store.export_data()["vectors"]["rec"]
+    assert exported.metadata == {"k": "v"}
+    assert np.allclose(exported.vector, vector / 5.0, atol=0.01)
+
+    restored = SimpleInMemoryVectorStore(dtype=dtype)
+    restored.import_data(store.export_data())
+    assert restored._vectors["rec"].vector is None
+    assert restored.search(vector, top_k=1)[0].id == "rec"
+
+
+def test_unknown_dtype_rejected():
+    """Test that an unsupported storage dtype is rejected."""
+    with pytest.raises(ValueError):
+        SimpleInMemoryVectorStore(dtype="int4")
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])